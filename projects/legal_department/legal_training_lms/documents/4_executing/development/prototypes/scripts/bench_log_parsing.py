@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+実行ログの取得・解析の処理時間とメモリ使用量のベンチマーク
+
+合成したApps Scriptの実行ログ（10KB / 1MB / 50MB、✅・❌・⚠️・警告を実際のログに近い割合で含む）で
+tokenize_log・parse_test_results・save_logを、scripts/bench_fixtures/*.html（実行ログパネルのDOM）を
+ローカルのヘッドレスページに読み込んで extract_execution_logs・read_log_panel_text のJSを計測する。
+スループット（MB/秒）とピークメモリ（tracemalloc）を表示し、保存したベースラインと比較する。
+ベースラインよりスループットが許容範囲を超えて下がった場合は終了コード1を返す（解析の書き換えの確認用）。
+
+使い方:
+    python3 scripts/bench_log_parsing.py                        # すべてのサイズで計測してベースラインと比較
+    python3 scripts/bench_log_parsing.py --sizes 10KB,1MB       # 一部のサイズだけ計測
+    python3 scripts/bench_log_parsing.py --save-baseline        # 計測結果をベースラインとして保存
+    python3 scripts/bench_log_parsing.py --record editor_log_panel   # エディタの実行ログパネルのDOMを記録
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from log_parser import default_rules, default_test_functions, parse_test_results
+from log_tokenizer import tokenize_log
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'bench_fixtures')
+BASELINE_FILE = os.path.join(FIXTURES_DIR, 'baseline.json')
+
+SIZES = {'10KB': 10 * 1024, '1MB': 1024 * 1024, '50MB': 50 * 1024 * 1024}
+DEFAULT_SIZES = ['10KB', '1MB', '50MB']
+
+# サイズごとの計測回数（中央値を使う。小さいログは1回が短いので多めに計測する）
+REPEATS = {'10KB': 200, '1MB': 5, '50MB': 1}
+DOM_REPEATS = 50
+
+# ベースラインからのスループットの低下をこの割合まで許容する
+DEFAULT_TOLERANCE = 0.1
+
+SEED = 20260113
+
+# 記録したページをset_contentで読み込んだときに外部へ通信しないよう、スクリプトを除いたHTMLを返す
+RECORD_FIXTURE_JS = '''
+() => {
+    const root = document.documentElement.cloneNode(true);
+    root.querySelectorAll('script, link[rel="preload"], iframe').forEach(el => el.remove());
+    return '<!DOCTYPE html>' + root.outerHTML;
+}
+'''
+
+# 手順の結果の出現割合（実際のログに近い割合）
+STEP_OUTCOMES = [
+    ('✅ {fn}()成功', 0.70),
+    ('⚠️ {fn}()でイベントが見つかりませんでした: test_event_id', 0.12),
+    ('警告: {fn}()の実行に時間がかかっています', 0.05),
+    ('❌ {fn}()失敗: TypeError: Cannot read properties of null', 0.05),
+    ('{fn}()の結果: null（期待値通り）', 0.08),
+]
+TESTED_FUNCTIONS = [
+    'getUtils', 'getConfig', 'getCalendarId', 'findEventInfoByEventId', 'cancelReservation',
+    'changeReservation', 'markAttendeeAsReserved', 'refreshAttendeeStatus', 'checkEventCapacity',
+    'form_getFormConfig', 'form_getScheduledCourses',
+]
+
+
+def generate_log(size: int, seed: int = SEED) -> str:
+    """エディタの表示と同じ「時刻 + レベル + メッセージ」が改行なしで連結された実行ログを合成（size バイト以上）"""
+    rng = random.Random(seed)
+    test_functions = default_test_functions() or ['testSheetFunctions']
+    outcomes = [text for text, _ in STEP_OUTCOMES]
+    weights = [weight for _, weight in STEP_OUTCOMES]
+    seconds = 17 * 3600 + 50 * 60
+    parts: List[str] = []
+    length = 0
+
+    def emit(level: str, message: str) -> None:
+        nonlocal seconds, length
+        seconds = (seconds + rng.choice((0, 0, 0, 1, 1, 2))) % (24 * 3600)
+        part = f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}{level}{message}"
+        parts.append(part)
+        length += len(part.encode('utf-8'))
+
+    emit('お知らせ', '実行開始')
+    while length < size:
+        test_function = rng.choice(test_functions)
+        emit('情報', f'=== {test_function}: 開始 ===')
+        for number in range(1, rng.randint(3, 8)):
+            fn = rng.choice(TESTED_FUNCTIONS)
+            emit('情報', f'{number}. {fn}()のテスト...')
+            outcome = rng.choices(outcomes, weights)[0].format(fn=fn)
+            emit('エラー' if outcome.startswith('❌') else '情報', outcome)
+            if rng.random() < 0.3:
+                emit('情報', 'コンテキスト: {"email":"tester@example.com","eventId":"hvqdc7k9t1d96clvbq5nvk6jks"}')
+        emit('情報', f'=== {test_function}: 完了 ===')
+    emit('お知らせ', '実行完了')
+    return ''.join(parts)
+
+
+def measure(func: Callable[[], object], repeats: int) -> Dict:
+    """中央値の実行時間（秒）とピークメモリ（バイト、tracemalloc下での別の1回）"""
+    func()  # 初回の正規表現のコンパイルやファイルキャッシュの影響を除く
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': statistics.median(timings), 'peak_memory': peak}
+
+
+def bench_python(sizes: List[str]) -> Dict[str, Dict]:
+    """tokenize_log・parse_test_results・save_logを計測"""
+    results = {}
+    default_rules()  # 判定ルールの読み込みは計測に含めない
+    try:
+        from run_all_tests import save_log
+    except ImportError as e:
+        save_log = None
+        print(f"⚠️  save_logを読み込めないため計測しません: {e}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_file = os.path.join(tmp_dir, 'playwright_test_bench.log')
+        for size_name in sizes:
+            log_content = generate_log(SIZES[size_name])
+            size = len(log_content.encode('utf-8'))
+            repeats = REPEATS[size_name]
+            cases = {
+                'tokenize_log': lambda: tokenize_log(log_content),
+                'parse_test_results': lambda: parse_test_results(log_content),
+            }
+            if save_log is not None:
+                cases['save_log'] = lambda: save_log('bench', log_content, log_file)
+            for case, func in cases.items():
+                print(f"⏱️  {case} / {size_name}...")
+                measured = measure(func, repeats)
+                measured['bytes'] = size
+                measured['throughput'] = size / measured['seconds'] / (1024 * 1024)
+                results[f'{case}/{size_name}'] = measured
+    return results
+
+
+async def bench_dom(fixtures: List[str]) -> Dict[str, Dict]:
+    """実行ログパネルのDOMをヘッドレスのページに読み込んで、ログを取得するJSを計測"""
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError as e:
+        print(f"⚠️  Playwrightを読み込めないためDOMの計測を行いません: {e}")
+        return {}
+    from editor_session import extract_execution_logs, read_log_panel_text
+
+    results = {}
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            page = await browser.new_page()
+            for fixture in fixtures:
+                name = os.path.splitext(os.path.basename(fixture))[0]
+                with open(fixture, 'r', encoding='utf-8') as f:
+                    html = f.read()
+                await page.set_content(html)
+                size = len(html.encode('utf-8'))
+                for case, func in (('extract_execution_logs', extract_execution_logs),
+                                   ('read_log_panel_text', read_log_panel_text)):
+                    print(f"⏱️  {case} / {name}...")
+                    await func(page)
+                    timings = []
+                    for _ in range(DOM_REPEATS):
+                        started = time.perf_counter()
+                        await func(page)
+                        timings.append(time.perf_counter() - started)
+                    seconds = statistics.median(timings)
+                    results[f'{case}/{name}'] = {
+                        'seconds': seconds,
+                        'bytes': size,
+                        'throughput': size / seconds / (1024 * 1024),
+                        'peak_memory': None,  # ブラウザ内のメモリはtracemallocで計測できない
+                    }
+        finally:
+            await browser.close()
+    return results
+
+
+async def record_fixture(name: str) -> Optional[str]:
+    """ログイン済みのブラウザでエディタを開き、実行ログパネルのDOMをフィクスチャとして保存"""
+    from playwright.async_api import async_playwright
+    from browser_profile import launch_context
+    from editor_session import SPREADSHEET_SCRIPT_URL, open_log_panel
+
+    async with async_playwright() as p:
+        context = await launch_context(p)
+        try:
+            page = context.pages[0] if context.pages else await context.new_page()
+            await page.goto(SPREADSHEET_SCRIPT_URL, wait_until='domcontentloaded', timeout=60000)
+            await open_log_panel(page)
+            await asyncio.sleep(3)
+            html = await page.evaluate(RECORD_FIXTURE_JS)
+        finally:
+            await context.close()
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    path = os.path.join(FIXTURES_DIR, f'{name}.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    return path
+
+
+def load_baseline(path: str = BASELINE_FILE) -> Dict[str, Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('results', {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def current_revision() -> Optional[str]:
+    """計測したコードのgitのリビジョン（gitが使えない場合はNone）"""
+    proc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                          cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+
+def save_baseline(results: Dict[str, Dict], path: str = BASELINE_FILE) -> None:
+    """計測結果をベースラインとして保存（計測していないケースは前回の値を残す）
+
+    ベースラインは解析を書き換える前のコードで計測する（書き換え後に保存すると遅くなっても検出できない）。
+    どのコードで計測したかをrevisionに記録する。
+    """
+    merged = {**load_baseline(path), **results}
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'revision': current_revision(),
+            'python': platform.python_version(),
+            'machine': f'{platform.system()} {platform.machine()}',
+            'results': merged,
+        }, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """計測結果を表示し、ベースラインよりスループットが許容範囲を超えて下がったケースを返す"""
+    print("\n" + "="*96)
+    print(f"{'ケース':<40}{'サイズ':>10}{'時間':>12}{'MB/秒':>10}{'ピークMB':>10}{'ベースライン比':>14}")
+    print("="*96)
+    regressions = []
+    for key, measured in results.items():
+        peak = measured.get('peak_memory')
+        peak_text = f"{peak / (1024 * 1024):.1f}" if peak is not None else '-'
+        ratio_text = '-'
+        base = baseline.get(key)
+        if base and base.get('throughput'):
+            ratio = measured['throughput'] / base['throughput']
+            ratio_text = f"{ratio:.2f}x"
+            if ratio < 1 - tolerance:
+                ratio_text += ' ⚠️'
+                regressions.append(key)
+        print(f"{key:<40}{measured['bytes'] / 1024:>9.0f}K{measured['seconds'] * 1000:>10.2f}ms"
+              f"{measured['throughput']:>10.1f}{peak_text:>10}{ratio_text:>14}")
+    return regressions
+
+
+def parse_size_list(value: str) -> List[str]:
+    """--sizes を解析（例: 10KB,1MB）"""
+    sizes = [size.strip().upper() for size in value.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"--sizes には {', '.join(SIZES)} を指定してください（{', '.join(unknown)}）")
+    return sizes
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='実行ログの取得・解析の処理時間とメモリ使用量を計測します')
+    parser.add_argument('--sizes', type=parse_size_list, default=DEFAULT_SIZES,
+                        help=f"合成するログのサイズ（カンマ区切り、デフォルト: {','.join(DEFAULT_SIZES)}）")
+    parser.add_argument('--no-dom', dest='dom', action='store_false',
+                        help='実行ログパネルのDOMからの取得（ブラウザが必要）を計測しない')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='計測結果をベースライン（scripts/bench_fixtures/baseline.json）として保存')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'ベースラインからのスループットの低下の許容割合（デフォルト: {DEFAULT_TOLERANCE}）')
+    parser.add_argument('--record', metavar='NAME',
+                        help='計測せず、エディタの実行ログパネルのDOMを bench_fixtures/NAME.html に記録する')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.record:
+        print(f"📝 フィクスチャを保存しました: {asyncio.run(record_fixture(args.record))}")
+        sys.exit(0)
+    results = bench_python(args.sizes)
+    if args.dom:
+        results.update(asyncio.run(bench_dom(sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))))))
+    regressions = compare(results, load_baseline(), args.tolerance)
+    if args.save_baseline:
+        save_baseline(results)
+        print(f"\n📝 ベースラインを保存しました: {BASELINE_FILE}")
+    elif regressions:
+        print(f"\n⚠️  ベースラインより{args.tolerance:.0%}以上遅くなったケース: {', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+ログイン済みのブラウザを常駐させ、CDP（Chrome DevTools Protocol）で各スクリプトから共有する
+
+起動中は接続先を .cache/browser_daemon.json に書き込む。browser_profile.launch_context()はこのファイルがあれば
+ブラウザを起動せずに connect_over_cdp で接続し、スクリプトごとに専用のページを開く。
+プロファイルのロックを1つのブラウザだけが持つため、複数のスクリプトを同時に実行できる。
+
+使い方:
+    python3 scripts/browser_daemon.py start      # 常駐ブラウザを起動（Ctrl+Cまたはstopで終了）
+    python3 scripts/browser_daemon.py status     # 状態を表示
+    python3 scripts/browser_daemon.py stop       # 終了
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import urllib.request
+from datetime import datetime
+from playwright.async_api import async_playwright
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from browser_profile import (
+    DAEMON_ENDPOINT_FILE,
+    DAEMON_PORT,
+    is_headed,
+    launch_context,
+    read_daemon_endpoint,
+    write_daemon_endpoint,
+)
+from editor_session import SPREADSHEET_SCRIPT_URL
+
+
+async def serve(port: int = DAEMON_PORT, headed: Optional[bool] = None,
+                warm_url: Optional[str] = SPREADSHEET_SCRIPT_URL) -> None:
+    """ブラウザを起動して終了シグナルまで待機（接続先ファイルは終了時に削除）"""
+    if read_daemon_endpoint():
+        print("⚠️  常駐ブラウザはすでに起動しています（python3 scripts/browser_daemon.py status で確認）")
+        return
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    async with async_playwright() as p:
+        # リモートデバッグはローカルホストからの接続のみ受け付ける
+        context = await launch_context(p, headed=headed, attach=False,
+                                       args=[f'--remote-debugging-port={port}'])
+        try:
+            if warm_url:
+                # エディタを開いたままにしてキャッシュとログインセッションを維持する
+                page = context.pages[0] if context.pages else await context.new_page()
+                await page.goto(warm_url, wait_until='domcontentloaded', timeout=60000)
+            write_daemon_endpoint({
+                'endpoint': f'http://127.0.0.1:{port}',
+                'pid': os.getpid(),
+                'headed': is_headed(headed),
+                'started_at': datetime.now().isoformat(timespec='seconds'),
+            })
+            print(f"🛰️  常駐ブラウザを起動しました（http://127.0.0.1:{port}、pid {os.getpid()}）")
+            print("   各スクリプトは自動的にこのブラウザに接続します。終了するには Ctrl+C または stop を実行してください")
+            await stop.wait()
+        finally:
+            try:
+                os.remove(DAEMON_ENDPOINT_FILE)
+            except OSError:
+                pass
+            await context.close()
+    print("👋 常駐ブラウザを終了しました")
+
+
+def status() -> int:
+    """常駐ブラウザの状態を表示（起動していない場合は1を返す）"""
+    info = read_daemon_endpoint()
+    if not info:
+        print("⏹️  常駐ブラウザは起動していません")
+        return 1
+    try:
+        with urllib.request.urlopen(f"{info['endpoint']}/json/version", timeout=5) as response:
+            version = json.load(response).get('Browser', '')
+    except (OSError, ValueError) as e:
+        print(f"⚠️  常駐ブラウザ（pid {info['pid']}）が応答しません: {e}")
+        return 1
+    mode = "表示モード" if info.get('headed') else "軽量モード"
+    print(f"🛰️  常駐ブラウザ: {info['endpoint']}（{version}、{mode}、pid {info['pid']}、{info.get('started_at')}から）")
+    return 0
+
+
+def stop_daemon() -> int:
+    """常駐ブラウザに終了シグナルを送る"""
+    info = read_daemon_endpoint()
+    if not info:
+        print("⏹️  常駐ブラウザは起動していません")
+        return 1
+    os.kill(int(info['pid']), signal.SIGTERM)
+    print(f"🛑 常駐ブラウザ（pid {info['pid']}）に終了を指示しました")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='ログイン済みのブラウザを常駐させ、各スクリプトから共有します')
+    parser.add_argument('command', choices=['start', 'status', 'stop'])
+    parser.add_argument('--port', type=int, default=DAEMON_PORT,
+                        help=f'リモートデバッグのポート（デフォルト: {DAEMON_PORT}）')
+    parser.add_argument('--headed', action='store_true', default=None,
+                        help='ブラウザを表示して常駐させる（既定はヘッドレスの軽量モード）')
+    parser.add_argument('--no-warm', dest='warm', action='store_false',
+                        help='起動時にApps Scriptエディタを開かない')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == 'start':
+        asyncio.run(serve(port=args.port, headed=args.headed,
+                          warm_url=SPREADSHEET_SCRIPT_URL if args.warm else None))
+    elif args.command == 'status':
+        sys.exit(status())
+    else:
+        sys.exit(stop_daemon())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Playwrightのブラウザ起動設定（各スクリプト共通）
+
+既定は「軽量モード」：保存済みプロファイル（ログイン状態）を使ってヘッドレスで起動し、
+画像・フォント・メディアと計測用スクリプトの読み込みを遮断、ビューポートも小さくする。
+デバッグで画面を確認したい場合は --headed（対応スクリプトのみ）または
+環境変数 LMS_BROWSER_HEADED=1 で従来どおりの表示モードに戻す。
+
+scripts/browser_daemon.py でブラウザを常駐させている場合は、起動せずにCDPで接続し、
+スクリプトごとに専用のページを開く（ブラウザの起動とログイン状態を複数のスクリプトで共有できる）。
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+USER_DATA_DIR = os.path.join(os.path.expanduser("~"), ".playwright_chrome_profile")
+
+# 表示モードに切り替える環境変数
+HEADED_ENV = 'LMS_BROWSER_HEADED'
+# 0 にすると常駐ブラウザに接続せず、スクリプトごとにブラウザを起動する
+DAEMON_ENV = 'LMS_BROWSER_DAEMON'
+
+# 常駐ブラウザの接続先（browser_daemon.pyが起動時に書き込み、終了時に削除する）
+DAEMON_ENDPOINT_FILE = os.path.join(os.path.dirname(__file__), '..', '.cache', 'browser_daemon.json')
+DAEMON_PORT = 9222
+
+LEAN_VIEWPORT = {"width": 1280, "height": 800}
+HEADED_VIEWPORT = {"width": 1920, "height": 1080}
+
+BROWSER_ARGS = ['--disable-blink-features=AutomationControlled']
+
+# 軽量モードで読み込まないリソースの種類
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media'}
+
+# 軽量モードで読み込まない計測・広告系のホスト
+BLOCKED_URL_PARTS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'play.google.com/log',
+    'csp.withgoogle.com',
+]
+
+
+def is_headed(headed: Optional[bool] = None) -> bool:
+    """表示モードで起動するか（引数の指定がなければ環境変数で判定）"""
+    if headed is not None:
+        return headed
+    return os.environ.get(HEADED_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+async def block_unneeded_resources(route) -> None:
+    """テストに不要なリソースの読み込みを遮断"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+        return
+    if any(part in request.url for part in BLOCKED_URL_PARTS):
+        await route.abort()
+        return
+    await route.continue_()
+
+
+def is_process_alive(pid: int) -> bool:
+    """プロセスが実行中か"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def read_daemon_endpoint(path: str = DAEMON_ENDPOINT_FILE) -> Optional[Dict]:
+    """実行中の常駐ブラウザの接続先（{'endpoint', 'pid', 'headed', 'started_at'}）。ない場合はNone"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not info.get('endpoint') or not is_process_alive(int(info.get('pid', 0))):
+        return None
+    return info
+
+
+def write_daemon_endpoint(info: Dict, path: str = DAEMON_ENDPOINT_FILE) -> None:
+    """常駐ブラウザの接続先を保存"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def use_daemon(attach: Optional[bool] = None) -> bool:
+    """常駐ブラウザに接続するか（引数の指定がなければ環境変数で判定）"""
+    if attach is not None:
+        return attach
+    return os.environ.get(DAEMON_ENV, '').lower() not in ('0', 'false', 'no')
+
+
+class SharedContext:
+    """常駐ブラウザのコンテキストのうち、このスクリプトが開いたページだけを扱うラッパー
+
+    pagesは自分が開いたページだけを返し、close()は自分のページを閉じて切断するだけで、
+    常駐ブラウザや他のスクリプトのページには影響しない。その他の属性は元のコンテキストに委譲する。
+    """
+
+    def __init__(self, browser, context):
+        self._browser = browser
+        self._context = context
+        self._pages = []
+
+    @property
+    def pages(self) -> List:
+        return [page for page in self._pages if not page.is_closed()]
+
+    async def new_page(self):
+        page = await self._context.new_page()
+        self._pages.append(page)
+        return page
+
+    async def close(self) -> None:
+        for page in self.pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        # connect_over_cdpで接続したブラウザのclose()は切断のみ（ブラウザは終了しない）
+        await self._browser.close()
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+async def attach_context(p, endpoint: Dict) -> SharedContext:
+    """常駐ブラウザにCDPで接続し、ログイン済みのコンテキストを共有する"""
+    browser = await p.chromium.connect_over_cdp(endpoint['endpoint'])
+    # 新しいコンテキストはログイン状態を持たないため、プロファイルの既定のコンテキストを使う
+    return SharedContext(browser, browser.contexts[0])
+
+
+async def launch_context(p, headed: Optional[bool] = None, args: Optional[List[str]] = None,
+                         attach: Optional[bool] = None):
+    """保存済みプロファイルでブラウザを起動し、永続コンテキストを返す
+
+    常駐ブラウザ（scripts/browser_daemon.py）が実行中の場合は起動せずに接続し、SharedContextを返す。
+
+    Args:
+        p: async_playwright()のインスタンス
+        headed: Trueで表示モード、Falseで軽量モード（Noneは環境変数 LMS_BROWSER_HEADED に従う）
+        args: Chromiumの追加起動引数
+        attach: Falseで常駐ブラウザに接続しない（Noneは環境変数 LMS_BROWSER_DAEMON に従う）
+    """
+    endpoint = read_daemon_endpoint() if use_daemon(attach) else None
+    if endpoint:
+        try:
+            context = await attach_context(p, endpoint)
+        except Exception as e:
+            print(f"⚠️  常駐ブラウザに接続できませんでした。ブラウザを起動します: {e}")
+        else:
+            mode = "表示モード" if endpoint.get('headed') else "軽量モード"
+            print(f"🔗 常駐ブラウザ（{mode}、pid {endpoint.get('pid')}）に接続しました")
+            if headed is not None and headed != bool(endpoint.get('headed')):
+                print(f"   ⚠️  常駐ブラウザは{mode}で起動しているため、そのまま使用します")
+            return context
+
+    headed = is_headed(headed)
+    os.makedirs(USER_DATA_DIR, exist_ok=True)
+
+    context = await p.chromium.launch_persistent_context(
+        user_data_dir=USER_DATA_DIR,
+        headless=not headed,
+        viewport=HEADED_VIEWPORT if headed else LEAN_VIEWPORT,
+        args=BROWSER_ARGS + (args or [])
+    )
+
+    if not headed:
+        # コンテキスト単位で設定し、ワーカー用に後から開くページにも適用する
+        await context.route('**/*', block_unneeded_resources)
+        print("🪶 軽量モード（ヘッドレス・画像/フォント遮断）でブラウザを起動しました")
+    return context
@@ -5,6 +5,7 @@
 
 import asyncio
 from playwright.async_api import async_playwright
+from browser_profile import launch_context
 import json
 
 # 3つのスプレッドシートのURL
@@ -284,13 +285,7 @@ async def main():
     
     async with async_playwright() as p:
         # 永続的なコンテキストを使用（ログイン状態を維持）
-        user_data_dir = os.path.expanduser('~/.playwright_chrome_profile')
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir,
-            headless=False,
-            viewport={'width': 1920, 'height': 1080},
-            args=['--disable-blink-features=AutomationControlled']
-        )
+        context = await launch_context(p)
         
         page = await context.new_page()
         
@@ -323,6 +318,7 @@ if __name__ == '__main__':
 
 import asyncio
 from playwright.async_api import async_playwright
+from browser_profile import launch_context
 import json
 
 # 3つのスプレッドシートのURL
@@ -602,13 +598,7 @@ async def main():
     
     async with async_playwright() as p:
         # 永続的なコンテキストを使用（ログイン状態を維持）
-        user_data_dir = os.path.expanduser('~/.playwright_chrome_profile')
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir,
-            headless=False,
-            viewport={'width': 1920, 'height': 1080},
-            args=['--disable-blink-features=AutomationControlled']
-        )
+        context = await launch_context(p)
         
         page = await context.new_page()
         
@@ -641,6 +631,7 @@ if __name__ == '__main__':
 
 import asyncio
 from playwright.async_api import async_playwright
+from browser_profile import launch_context
 import json
 
 # 3つのスプレッドシートのURL
@@ -920,13 +911,7 @@ async def main():
     
     async with async_playwright() as p:
         # 永続的なコンテキストを使用（ログイン状態を維持）
-        user_data_dir = os.path.expanduser('~/.playwright_chrome_profile')
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir,
-            headless=False,
-            viewport={'width': 1920, 'height': 1080},
-            args=['--disable-blink-features=AutomationControlled']
-        )
+        context = await launch_context(p)
         
         page = await context.new_page()
         
@@ -959,6 +944,7 @@ if __name__ == '__main__':
 
 import asyncio
 from playwright.async_api import async_playwright
+from browser_profile import launch_context
 import json
 
 # 3つのスプレッドシートのURL
@@ -1238,13 +1224,7 @@ async def main():
     
     async with async_playwright() as p:
         # 永続的なコンテキストを使用（ログイン状態を維持）
-        user_data_dir = os.path.expanduser('~/.playwright_chrome_profile')
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir,
-            headless=False,
-            viewport={'width': 1920, 'height': 1080},
-            args=['--disable-blink-features=AutomationControlled']
-        )
+        context = await launch_context(p)
         
         page = await context.new_page()
         
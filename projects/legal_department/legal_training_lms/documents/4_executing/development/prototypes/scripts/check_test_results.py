@@ -6,22 +6,19 @@ Apps Scriptエディタの実行ログを取得して解析
 
 import asyncio
 from playwright.async_api import async_playwright
-import os
-import re
+from browser_profile import launch_context
+from log_tokenizer import log_lines
+from test_discovery import discover_test_functions
+
+# ログパネルの判定に使うテスト関数名（tests.gsから自動検出）
+TEST_FUNCTIONS = discover_test_functions()
 
 SPREADSHEET_SCRIPT_URL = "https://script.google.com/u/0/home/projects/1DiZUSkJU_Z4Yc0bBcNgOUH3iqHux8xnSS7qILL5YZMfKgw86QeMvx0S-/edit"
 
 async def get_execution_logs():
     """実行ログを取得"""
     async with async_playwright() as p:
-        home_dir = os.path.expanduser("~")
-        user_data_dir = os.path.join(home_dir, ".playwright_chrome_profile")
-        
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            headless=False,
-            viewport={"width": 1920, "height": 1080}
-        )
+        context = await launch_context(p)
         
         pages = context.pages
         page = pages[0] if pages else await context.new_page()
@@ -65,7 +62,7 @@ async def get_execution_logs():
         await asyncio.sleep(3)
         
         log_content = await page.evaluate('''
-            () => {
+            (testNames) => {
                 // 実行ログパネルを探す
                 const logSelectors = [
                     '[class*="log"]',
@@ -90,16 +87,7 @@ async def get_execution_logs():
                             const text = el.textContent || el.innerText || '';
                             // Logger.logの出力を含む要素を探す
                             if (text.length > maxLength && 
-                                (text.includes('testAllUntestedFunctions') || 
-                                 text.includes('testRefreshAttendeeStatus') ||
-                                 text.includes('testHandleReservationFormSubmit') ||
-                                 text.includes('testOnCreatingSchedule') ||
-                                 text.includes('testOnDashboardAction') ||
-                                 text.includes('testEditHandler') ||
-                                 text.includes('testEnhancedFunctions') ||
-                                 text.includes('testCalendarEnhancedFunctions') ||
-                                 text.includes('testReservationChangeFunctions') ||
-                                 text.includes('testChangeReservation') ||
+                                (testNames.some(name => text.includes(name)) ||
                                  text.includes('開始') ||
                                  text.includes('完了') ||
                                  text.includes('成功') ||
@@ -123,7 +111,7 @@ async def get_execution_logs():
                     for (const el of allElements) {
                         const text = el.textContent || el.innerText || '';
                         if (text.length > 200 && 
-                            (text.includes('testAllUntestedFunctions') || 
+                            (testNames.some(name => text.includes(name)) ||
                              text.includes('開始') || 
                              text.includes('完了'))) {
                             logText = text;
@@ -134,7 +122,7 @@ async def get_execution_logs():
                 
                 return logText || '';
             }
-        ''')
+        ''', TEST_FUNCTIONS)
         
         if log_content and len(log_content.strip()) > 0:
             print("\n" + "="*60)
@@ -147,23 +135,10 @@ async def get_execution_logs():
             print("テスト実行結果の解析")
             print("="*60)
             
-            lines = log_content.split('\n')
-            
-            # テスト関数の実行状況を確認
-            test_functions = [
-                'testRefreshAttendeeStatus',
-                'testHandleReservationFormSubmit',
-                'testOnCreatingSchedule',
-                'testOnDashboardAction',
-                'testEditHandler',
-                'testEnhancedFunctions',
-                'testCalendarEnhancedFunctions',
-                'testReservationChangeFunctions',
-                'testChangeReservation'
-            ]
+            lines = log_lines(log_content)
             
             print("\n📊 実行されたテスト関数:")
-            for test_func in test_functions:
+            for test_func in TEST_FUNCTIONS:
                 found = False
                 for line in lines:
                     if test_func in line:
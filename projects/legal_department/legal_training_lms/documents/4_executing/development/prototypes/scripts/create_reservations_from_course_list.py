@@ -5,7 +5,7 @@
 
 import asyncio
 from playwright.async_api import async_playwright
-import os
+from browser_profile import launch_context
 
 # スプレッドシートID
 SPREADSHEET_ID = '1ln9GGhT7wbhhsWPIeATGkAnfAkXFvH8CfUeuZqmgqpE'
@@ -151,12 +151,7 @@ async def create_reservations(page, courses):
 
 async def main():
     async with async_playwright() as p:
-        user_data_dir = os.path.expanduser('~/.playwright_chrome_profile')
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir,
-            headless=False,
-            viewport={'width': 1920, 'height': 1080}
-        )
+        context = await launch_context(p)
         page = await context.new_page()
         
         print('='*60)
@@ -200,7 +195,7 @@ if __name__ == '__main__':
 
 import asyncio
 from playwright.async_api import async_playwright
-import os
+from browser_profile import launch_context
 
 # スプレッドシートID
 SPREADSHEET_ID = '1ln9GGhT7wbhhsWPIeATGkAnfAkXFvH8CfUeuZqmgqpE'
@@ -346,12 +341,7 @@ async def create_reservations(page, courses):
 
 async def main():
     async with async_playwright() as p:
-        user_data_dir = os.path.expanduser('~/.playwright_chrome_profile')
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir,
-            headless=False,
-            viewport={'width': 1920, 'height': 1080}
-        )
+        context = await launch_context(p)
         page = await context.new_page()
         
         print('='*60)
@@ -394,7 +384,7 @@ if __name__ == '__main__':
 
 import asyncio
 from playwright.async_api import async_playwright
-import os
+from browser_profile import launch_context
 
 # スプレッドシートID
 SPREADSHEET_ID = '1ln9GGhT7wbhhsWPIeATGkAnfAkXFvH8CfUeuZqmgqpE'
@@ -540,12 +530,7 @@ async def create_reservations(page, courses):
 
 async def main():
     async with async_playwright() as p:
-        user_data_dir = os.path.expanduser('~/.playwright_chrome_profile')
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir,
-            headless=False,
-            viewport={'width': 1920, 'height': 1080}
-        )
+        context = await launch_context(p)
         page = await context.new_page()
         
         print('='*60)
@@ -589,7 +574,7 @@ if __name__ == '__main__':
 
 import asyncio
 from playwright.async_api import async_playwright
-import os
+from browser_profile import launch_context
 
 # スプレッドシートID
 SPREADSHEET_ID = '1ln9GGhT7wbhhsWPIeATGkAnfAkXFvH8CfUeuZqmgqpE'
@@ -735,12 +720,7 @@ async def create_reservations(page, courses):
 
 async def main():
     async with async_playwright() as p:
-        user_data_dir = os.path.expanduser('~/.playwright_chrome_profile')
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir,
-            headless=False,
-            viewport={'width': 1920, 'height': 1080}
-        )
+        context = await launch_context(p)
         page = await context.new_page()
         
         print('='*60)
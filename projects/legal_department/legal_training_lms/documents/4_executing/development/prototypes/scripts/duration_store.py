@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+テスト関数ごとの実行時間の履歴
+
+実行のたびに実測時間（wall_time）と実行ログ上の時間（最初と最後のタイムスタンプの差）を記録し、
+長いテストから順に実行するスケジューリングと、パーセンタイルに基づくタイムアウトの決定に使う。
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+DURATIONS_FILE = os.path.join(os.path.dirname(__file__), '..', '.cache', 'test_durations.json')
+
+# テストごとに保持する直近の記録数
+MAX_SAMPLES = 20
+# タイムアウト = 過去の実行時間のパーセンタイル × 余裕係数（下限あり）
+TIMEOUT_PERCENTILE = 95
+TIMEOUT_MARGIN = 2.0
+MIN_TIMEOUT = 60
+
+# 実行ログのタイムスタンプ（エディタの「17:50:49」、Logger.getLog()の「[26-01-13 17:50:49:123 JST]」）
+LOG_TIME_PATTERN = re.compile(r'(?<!\d)(\d{1,2}):(\d{2}):(\d{2})(?!\d)')
+
+
+def measure_log_duration(log_content: str) -> Optional[float]:
+    """実行ログの最初と最後のタイムスタンプの差（秒）。タイムスタンプが2つ未満の場合はNone"""
+    times = LOG_TIME_PATTERN.findall(log_content or '')
+    if len(times) < 2:
+        return None
+    first, last = [int(h) * 3600 + int(m) * 60 + int(s) for h, m, s in (times[0], times[-1])]
+    if last < first:
+        last += 24 * 3600  # 日付をまたいだ場合
+    return float(last - first)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """線形補間によるパーセンタイル"""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def _recorded_timestamp(sample: Dict) -> float:
+    """記録日時（recorded_at）のエポック秒。ない・読めない場合は最も古い記録とみなす"""
+    try:
+        return datetime.fromisoformat(sample['recorded_at']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return float('-inf')
+
+
+class DurationStore:
+    """テスト関数 → 直近の実行記録のリスト"""
+
+    def __init__(self, path: str = DURATIONS_FILE):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries: Dict[str, List[Dict]] = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def record(self, result: Dict) -> None:
+        """テスト結果（wall_time / execution_time）を記録"""
+        test_function = result.get('test_function')
+        wall_time = result.get('wall_time')
+        log_time = result.get('execution_time')
+        if not test_function or (wall_time is None and log_time is None):
+            return
+        samples = self.entries.setdefault(test_function, [])
+        samples.append({
+            'wall_time': wall_time,
+            'log_time': log_time,
+            'success': result.get('success') == True,
+            'timed_out': bool(result.get('timed_out')),
+            'derived_from': result.get('derived_from'),
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        del samples[:-MAX_SAMPLES]
+
+    def durations(self, test_function: str, include_timed_out: bool = False) -> List[float]:
+        """記録済みの実行時間（実測時間、なければログ上の時間）"""
+        values = []
+        for sample in self.entries.get(test_function, []):
+            if sample.get('timed_out') and not include_timed_out:
+                continue
+            value = sample.get('wall_time')
+            if value is None:
+                value = sample.get('log_time')
+            if value is not None:
+                values.append(value)
+        return values
+
+    def estimate(self, test_function: str) -> Optional[float]:
+        """予想実行時間（直近の記録の中央値）。記録がない場合はNone"""
+        values = self.durations(test_function)
+        return percentile(values, 50) if values else None
+
+    def suggest_timeout(self, test_function: str) -> Optional[float]:
+        """過去の実行時間から実行完了待ちのタイムアウトを決定。記録がない場合はNone
+
+        タイムアウトした記録しかない場合は、その時間を下限として延長する。
+        """
+        values = self.durations(test_function)
+        if values:
+            return max(MIN_TIMEOUT, percentile(values, TIMEOUT_PERCENTILE) * TIMEOUT_MARGIN)
+        timed_out = self.durations(test_function, include_timed_out=True)
+        if timed_out:
+            return max(MIN_TIMEOUT, max(timed_out) * TIMEOUT_MARGIN)
+        return None
+
+    def last_sample(self, test_function: str) -> Optional[Dict]:
+        """直近の実行記録。記録がない場合はNone"""
+        samples = self.entries.get(test_function)
+        return samples[-1] if samples else None
+
+    def priority_key(self, test_function: str) -> Tuple[int, float]:
+        """時間予算内で優先して実行する順のキー（直近で失敗したテスト（新しい失敗から） → 長く実行されていないテストの順）
+
+        記録がないテストは最も長く実行されていないテストとして扱う。
+        """
+        last = self.last_sample(test_function)
+        if last is None:
+            return (1, float('-inf'))
+        recorded_at = _recorded_timestamp(last)
+        if not last.get('success'):
+            return (0, -recorded_at)
+        return (1, recorded_at)
+
+    def order_longest_first(self, test_functions: List[str]) -> List[int]:
+        """予想実行時間の長い順のインデックス（記録がないテストは記録済みの中央値とみなす）
+
+        空いたワーカーが残りの最長のテストを取るため、並列実行時の負荷も均等になる（LPTスケジューリング）。
+        """
+        estimates = [self.estimate(t) for t in test_functions]
+        known = [e for e in estimates if e is not None]
+        if not known:
+            return list(range(len(test_functions)))
+        fallback = percentile(known, 50)
+        return sorted(range(len(test_functions)),
+                      key=lambda i: -(estimates[i] if estimates[i] is not None else fallback))
+
+    def partition(self, test_functions: List[str], count: int) -> List[List[str]]:
+        """予想実行時間の合計が均等になるようにcount個に分割（同じ履歴なら常に同じ結果になる）
+
+        長い順（同じ場合は名前順）に、合計が最も小さいグループへ割り当てる。
+        記録がないテストは記録済みの中央値（記録が1件もなければ1秒）とみなす。
+        各グループ内はtest_functionsの順序を保つ。
+        """
+        estimates = {t: self.estimate(t) for t in test_functions}
+        known = [e for e in estimates.values() if e is not None]
+        fallback = percentile(known, 50) if known else 1.0
+        weights = {t: (e if e is not None else fallback) for t, e in estimates.items()}
+
+        loads = [0.0] * count
+        assigned: Dict[str, int] = {}
+        for test_function in sorted(test_functions, key=lambda t: (-weights[t], t)):
+            target = min(range(count), key=lambda i: (loads[i], i))
+            assigned[test_function] = target
+            loads[target] += weights[test_function]
+        return [[t for t in test_functions if assigned[t] == i] for i in range(count)]
+
+    def save(self) -> None:
+        """履歴をファイルに保存"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"⚠️  実行時間の履歴を保存できませんでした: {e}")
@@ -0,0 +1,777 @@
+#!/usr/bin/env python3
+"""
+Apps Scriptエディタの操作（tests.gsを開く・関数選択・実行・実行ログ取得）をまとめたモジュール
+EditorSessionでエディタを1回だけ読み込み、テスト間で再利用する
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from log_capture import EXECUTION_START_NOTICES, ExecutionLogCapture
+from log_tail import LogTail
+from selector_cache import SelectorCache, get_editor_fingerprint
+
+SPREADSHEET_SCRIPT_URL = "https://script.google.com/u/0/home/projects/1DiZUSkJU_Z4Yc0bBcNgOUH3iqHux8xnSS7qILL5YZMfKgw86QeMvx0S-/edit"
+
+# エディタが操作可能になったことを確認するための要素（実行ボタン）
+RUN_BUTTON_SELECTORS = [
+    'button[aria-label*="実行"]',
+    'button[aria-label*="Run"]',
+    'button:has-text("実行")',
+    'button:has-text("Run")',
+]
+
+# 実行中に表示される停止ボタン（fail-fastで実行を打ち切る）
+STOP_BUTTON_SELECTORS = [
+    'button[aria-label*="停止"]',
+    'button[aria-label*="Stop"]',
+    'button:has-text("停止")',
+    'button:has-text("Stop")',
+]
+
+# タイムアウト後にログパネルを開き直して再確認する際の待機秒数
+COMPLETION_GRACE_PERIOD = 15
+
+TESTS_FILE_SELECTORS = [
+    'text="tests.gs"',
+    'div:has-text("tests.gs")',
+    '[aria-label*="tests.gs"]',
+    'button:has-text("tests.gs")',
+]
+
+# 関数選択ドロップダウン（aria-label付きのcombobox）
+FUNCTION_DROPDOWN_SELECTORS = [
+    'div[aria-label="実行する関数を選択"]',
+    'div[aria-label*="関数を選択"]',
+    'div[aria-label*="function"]',
+    '[role="combobox"][aria-label*="関数"]',
+    '[role="combobox"][aria-label*="function"]',
+]
+
+LOG_BUTTON_SELECTORS = [
+    'button[aria-label*="実行ログ"]',
+    'button[aria-label*="Execution log"]',
+    'button:has-text("実行ログ")',
+    'button:has-text("Execution log")',
+]
+
+# 実行ログパネルのテキストを取得するJS（完了検出で繰り返し評価するため対象を絞る）
+LOG_PANEL_TEXT_JS = '''
+    () => {
+        const selectors = [
+            '[role="log"]',
+            '[aria-label*="実行ログ"]',
+            '[aria-label*="Execution log"]',
+            '[class*="log-panel"]',
+            '[class*="execution-log"]'
+        ];
+        let text = '';
+        for (const selector of selectors) {
+            for (const el of document.querySelectorAll(selector)) {
+                const t = el.textContent || '';
+                if (t.length > text.length) {
+                    text = t;
+                }
+            }
+        }
+        return text;
+    }
+'''
+
+# 実行ログの最後の「実行開始」以降に「お知らせ 実行完了」またはエラー行があるかを判定するJS
+# テスト自身が出力する「〜()実行完了」（情報レベル）と区別するため、ログレベルまで照合する
+EXECUTION_STATUS_JS = '''
+    (baseline) => {
+        const getText = ''' + LOG_PANEL_TEXT_JS.strip() + ''';
+        const text = getText();
+        if (!text || text === baseline) {
+            return false;
+        }
+        const startPattern = /\\d{1,2}:\\d{2}:\\d{2}\\s*(お知らせ|Notice)\\s*(実行開始|Execution started)/g;
+        let start = -1;
+        let match;
+        while ((match = startPattern.exec(text)) !== null) {
+            start = match.index;
+        }
+        if (start < 0) {
+            return false;
+        }
+        const tail = text.slice(start);
+        if (/\\d{1,2}:\\d{2}:\\d{2}\\s*(お知らせ|Notice)\\s*(実行完了|Execution completed)/.test(tail)) {
+            return 'completed';
+        }
+        if (/\\d{1,2}:\\d{2}:\\d{2}\\s*(エラー|Error)/.test(tail)) {
+            return 'error';
+        }
+        return false;
+    }
+'''
+
+async def extract_execution_logs(page) -> str:
+    """実行ログを抽出（改善版）"""
+    # より確実な方法で実行ログを取得
+    log_content = await page.evaluate('''
+        () => {
+            // 方法1: 実行ログパネル内のテキスト要素を探す
+            const logPanelSelectors = [
+                '[class*="log-panel"]',
+                '[class*="execution-log"]',
+                '[aria-label*="実行ログ"]',
+                '[aria-label*="Execution log"]',
+                '[role="dialog"]',
+                '[role="complementary"]'
+            ];
+            
+            let logText = '';
+            let maxLength = 0;
+            
+            // 実行ログパネル内の要素を探す
+            for (const panelSelector of logPanelSelectors) {
+                try {
+                    const panels = document.querySelectorAll(panelSelector);
+                    for (const panel of panels) {
+                        const textElements = panel.querySelectorAll('pre, code, textarea, [role="textbox"], [role="log"], div');
+                        for (const el of textElements) {
+                            const text = el.textContent || el.innerText || '';
+                            // window.WIZ_global_dataを含むものは除外
+                            if (text.length > maxLength && 
+                                text.length > 50 &&
+                                !text.includes('window.WIZ_global_data') &&
+                                !text.includes('AF_initDataCallback') &&
+                                (text.includes('test') ||
+                                 text.includes('開始') ||
+                                 text.includes('完了') ||
+                                 text.includes('✅') ||
+                                 text.includes('❌') ||
+                                 text.includes('Logger') ||
+                                 text.includes('エラー'))) {
+                                logText = text;
+                                maxLength = text.length;
+                            }
+                        }
+                    }
+                } catch (e) {}
+            }
+            
+            // 方法2: 通常のログ要素を探す
+            if (!logText || logText.length < 100) {
+                const logSelectors = [
+                    '[class*="log"]',
+                    '[class*="execution"]',
+                    '[aria-label*="ログ"]',
+                    '[aria-label*="log"]',
+                    '[role="log"]',
+                    '[role="textbox"][readonly]',
+                    'pre',
+                    'code',
+                    'textarea[readonly]'
+                ];
+                
+                for (const selector of logSelectors) {
+                    try {
+                        const elements = document.querySelectorAll(selector);
+                        for (const el of elements) {
+                            const text = el.textContent || el.innerText || '';
+                            if (text.length > maxLength && 
+                                text.length > 50 &&
+                                !text.includes('window.WIZ_global_data') &&
+                                !text.includes('AF_initDataCallback') &&
+                                (text.includes('test') ||
+                                 text.includes('開始') ||
+                                 text.includes('完了') ||
+                                 text.includes('✅') ||
+                                 text.includes('❌'))) {
+                                logText = text;
+                                maxLength = text.length;
+                            }
+                        }
+                    } catch (e) {}
+                }
+            }
+            
+            // 方法3: すべての要素を確認（最後の手段）
+            if (!logText || logText.length < 100) {
+                const allElements = document.querySelectorAll('pre, code, textarea, [role="textbox"]');
+                for (const el of allElements) {
+                    const text = el.textContent || el.innerText || '';
+                    if (text.length > 200 && 
+                        !text.includes('window.WIZ_global_data') &&
+                        !text.includes('AF_initDataCallback') &&
+                        (text.includes('test') ||
+                         text.includes('開始') ||
+                         text.includes('完了') ||
+                         text.includes('✅') ||
+                         text.includes('❌'))) {
+                        logText = text;
+                        break;
+                    }
+                }
+            }
+            
+            return logText || '';
+        }
+    ''')
+    
+    return log_content
+
+async def read_log_panel_text(page) -> str:
+    """実行ログパネルのテキストを取得（完了検出用の軽量版）"""
+    try:
+        return await page.evaluate(LOG_PANEL_TEXT_JS)
+    except Exception:
+        return ''
+
+async def open_log_panel(page) -> bool:
+    """実行ログパネルを開く"""
+    for selector in LOG_BUTTON_SELECTORS:
+        try:
+            log_button = await page.wait_for_selector(selector, timeout=3000)
+            if log_button:
+                await log_button.click()
+                print(f"   ✅ 実行ログボタンをクリックしました")
+                return True
+        except:
+            continue
+    return False
+
+async def wait_for_execution_complete(page, baseline: str, timeout: float) -> Optional[str]:
+    """実行ログに「実行完了」またはエラーが表示されるまで待機
+    
+    Returns:
+        'completed' / 'error'、タイムアウトした場合はNone
+    """
+    try:
+        handle = await page.wait_for_function(
+            EXECUTION_STATUS_JS, arg=baseline, polling='mutation', timeout=timeout * 1000
+        )
+        return await handle.json_value()
+    except Exception as e:
+        if 'Timeout' not in type(e).__name__ and 'Timeout' not in str(e):
+            print(f"   ⚠️  実行完了の監視でエラー: {e}")
+        return None
+
+async def wait_for_completion_or_failure(page, baseline: str, timeout: float,
+                                         failed: Optional[asyncio.Event] = None) -> Optional[str]:
+    """実行完了を待つ。failedが先に立った場合（fail-fast）は'failed_fast'を返す"""
+    if failed is None:
+        return await wait_for_execution_complete(page, baseline, timeout)
+    completion = asyncio.ensure_future(wait_for_execution_complete(page, baseline, timeout))
+    failure = asyncio.ensure_future(failed.wait())
+    try:
+        await asyncio.wait({completion, failure}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        failure.cancel()
+    if completion.done():
+        return completion.result()
+    completion.cancel()
+    return 'failed_fast'
+
+class EditorSession:
+    """tests.gsを開いたApps Scriptエディタの状態を保持し、テスト間で再利用する
+    
+    エディタの読み込みとtests.gsタブの選択は初回（またはヘルスチェックで
+    エディタが古くなったと判定された場合）のみ行い、テストごとには関数の選択だけを変更する。
+    関数の選択に成功した方法はSelectorCacheに保存し、次回はその方法から試す。
+    実行ログはエディタのネットワーク応答から取得し（ExecutionLogCapture）、取得できない場合はDOMから取得する。
+    liveまたはfail_fastを指定した場合は実行中のログを1行ずつ表示し（LogTail）、
+    fail_fastでは「❌」の行が出た時点で実行を停止する。
+    """
+    
+    # 関数の選択方法（キャッシュのキー → メソッド名）。キャッシュがない場合はこの順に試す
+    SELECT_STRATEGIES = {
+        'select_element': '_select_via_select_element',
+        'aria_combobox': '_select_via_aria_combobox',
+        'combobox_scan': '_select_via_combobox_scan',
+        'javascript': '_select_via_javascript',
+    }
+    
+    def __init__(self, page, url: str = SPREADSHEET_SCRIPT_URL, selector_cache: Optional[SelectorCache] = None,
+                 live: bool = False, fail_fast: bool = False):
+        self.page = page
+        self.url = url
+        self.loaded = False
+        self.tests_file_opened = False
+        self.selected_function: Optional[str] = None
+        self.load_count = 0
+        self.selector_cache = selector_cache if selector_cache is not None else SelectorCache()
+        self.fingerprint: Optional[str] = None
+        self.log_capture = ExecutionLogCapture()
+        self.log_capture.attach(page)
+        self.log_tail = LogTail(page, LOG_PANEL_TEXT_JS, fail_fast=fail_fast) if live or fail_fast else None
+    
+    def invalidate(self) -> None:
+        """次回のensure_ready()でエディタを読み込み直す"""
+        self.loaded = False
+        self.selected_function = None
+    
+    async def is_healthy(self) -> bool:
+        """エディタが操作可能な状態かを確認（ページが閉じていない・URLが変わっていない・実行ボタンがある）"""
+        if not self.loaded or self.page.is_closed():
+            return False
+        if not self.page.url.startswith(self.url.split('/edit')[0]):
+            return False
+        try:
+            for selector in RUN_BUTTON_SELECTORS:
+                if await self.page.query_selector(selector):
+                    return True
+        except Exception:
+            return False
+        return False
+    
+    async def ensure_ready(self) -> None:
+        """エディタが読み込まれていない、または古くなっている場合のみ読み込む"""
+        if await self.is_healthy():
+            return
+        if self.loaded:
+            print("   ⚠️  エディタの状態が古くなっています。再読み込みします...")
+        await self.load()
+    
+    async def load(self) -> None:
+        """エディタを開いてtests.gsを選択"""
+        page = self.page
+        print("📂 Apps Scriptエディタを開いています...")
+        await page.goto(self.url, wait_until="domcontentloaded", timeout=60000)
+        self.load_count += 1
+        self.selected_function = None
+        self.fingerprint = None
+        
+        # 実行ボタンが表示されるまで待機（表示されない場合は従来どおり少し待つ）
+        try:
+            await page.wait_for_selector(', '.join(RUN_BUTTON_SELECTORS[:2]), timeout=30000)
+        except Exception:
+            await asyncio.sleep(5)
+        
+        self.tests_file_opened = await self.open_tests_file()
+        self.loaded = True
+    
+    async def open_tests_file(self) -> bool:
+        """tests.gsファイルを開く（重要！）"""
+        page = self.page
+        print("📄 tests.gsファイルを開いています...")
+        tests_file_opened = False
+        try:
+            # ファイルタブを探してクリック
+            for selector in TESTS_FILE_SELECTORS:
+                try:
+                    file_tab = await page.wait_for_selector(selector, timeout=5000)
+                    if file_tab:
+                        await file_tab.click()
+                        print(f"   ✅ tests.gsファイルを開きました: {selector}")
+                        tests_file_opened = True
+                        await asyncio.sleep(3)  # ファイルが開くまで待機
+                        break
+                except:
+                    continue
+            
+            if not tests_file_opened:
+                print("   ⚠️  tests.gsファイルタブが見つかりませんでした（既に開いている可能性があります）")
+                # 既に開いている可能性があるので続行
+        except Exception as e:
+            print(f"   ⚠️  tests.gsファイルを開く際にエラー: {e}")
+            # エラーが発生しても続行（既に開いている可能性がある）
+        return tests_file_opened
+    
+    async def select_function(self, test_function: str) -> bool:
+        """関数選択ドロップダウンでテスト関数を選択（キャッシュ済みの選択方法を優先）"""
+        page = self.page
+        if self.selected_function == test_function:
+            print(f"   ✅ 関数は選択済みです: {test_function}")
+            return True
+        
+        if self.fingerprint is None:
+            self.fingerprint = await get_editor_fingerprint(page)
+        
+        # キャッシュ済みの選択方法を短いタイムアウトで試す
+        cached = self.selector_cache.get(self.fingerprint)
+        function_selected = False
+        if cached and cached.get('strategy') in self.SELECT_STRATEGIES:
+            strategy = cached['strategy']
+            print(f"⚡ キャッシュ済みの方法で関数を選択します: {strategy}")
+            method = getattr(self, self.SELECT_STRATEGIES[strategy])
+            try:
+                hint = await method(test_function, hint=cached.get('hint'), cached=True)
+            except Exception as e:
+                print(f"   ⚠️  キャッシュ済みの方法でエラー: {e}")
+                hint = None
+            if hint is not None:
+                function_selected = True
+            else:
+                print("   ⚠️  キャッシュ済みの方法では選択できませんでした。すべての方法を試します")
+                self.selector_cache.forget(self.fingerprint)
+        
+        if not function_selected:
+            function_selected = await self._select_with_cascade(test_function)
+        
+        # 選択の確認
+        if function_selected:
+            # 選択が正しく反映されたか確認
+            selected_value = await page.evaluate('''
+                () => {
+                    const selects = document.querySelectorAll('select');
+                    for (const select of selects) {
+                        if (select.value && select.value.includes('test')) {
+                            return select.value;
+                        }
+                    }
+                    return null;
+                }
+            ''')
+            if selected_value:
+                print(f"   ✅ 選択を確認しました: {selected_value}")
+            else:
+                print(f"   ⚠️  選択の確認に失敗しました")
+            self.selected_function = test_function
+        
+        return function_selected
+    
+    async def _select_with_cascade(self, test_function: str) -> bool:
+        """すべての選択方法を順に試し、成功した方法をキャッシュに保存"""
+        page = self.page
+        
+        # 関数選択ドロップダウンを探す（改善版）
+        print("🔍 関数選択ドロップダウンを探しています...")
+        
+        # デバッグ: ページの構造を確認
+        debug_info = await page.evaluate('''
+            () => {
+                const info = {
+                    selects: document.querySelectorAll('select').length,
+                    comboboxes: document.querySelectorAll('[role="combobox"]').length,
+                    listboxes: document.querySelectorAll('[aria-haspopup="listbox"]').length,
+                    functionSelectors: []
+                };
+                
+                // select要素の情報を取得
+                const selects = document.querySelectorAll('select');
+                selects.forEach((select, idx) => {
+                    const options = Array.from(select.options);
+                    const testOptions = options.filter(opt => opt.textContent.includes('test'));
+                    if (testOptions.length > 0) {
+                        info.functionSelectors.push({
+                            index: idx,
+                            optionCount: options.length,
+                            testOptionCount: testOptions.length,
+                            firstTestOption: testOptions[0]?.textContent
+                        });
+                    }
+                });
+                
+                return info;
+            }
+        ''')
+        print(f"   📊 デバッグ情報: select要素={debug_info['selects']}, combobox={debug_info['comboboxes']}, listbox={debug_info['listboxes']}")
+        if debug_info['functionSelectors']:
+            print(f"   📊 テスト関数を含むselect要素: {len(debug_info['functionSelectors'])}個")
+        
+        for strategy, method_name in self.SELECT_STRATEGIES.items():
+            hint = await getattr(self, method_name)(test_function)
+            if hint is not None:
+                self.selector_cache.put(self.fingerprint, strategy, hint)
+                return True
+        return False
+    
+    async def _select_via_select_element(self, test_function: str, hint=None, cached: bool = False):
+        """方法1: select要素を探す（Playwrightのselect_optionを使用）
+
+        Returns:
+            成功した場合はselect要素のインデックス、失敗した場合はNone
+        """
+        page = self.page
+        settle = 0.3 if cached else 2
+        try:
+            selects = await page.query_selector_all('select')
+            print(f"   🔍 select要素を{len(selects)}個発見")
+            
+            candidates = list(enumerate(selects))
+            if hint is not None:
+                candidates = [(idx, select) for idx, select in candidates if idx == hint]
+            
+            for idx, select in candidates:
+                try:
+                    # オプションを取得
+                    options = await select.query_selector_all('option')
+                    print(f"   🔍 select[{idx}]: {len(options)}個のオプション")
+                    
+                    # テスト関数名を含むオプションを探す
+                    for option in options:
+                        text = await option.text_content()
+                        value = await option.get_attribute('value')
+                        
+                        if text and (test_function in text or test_function == value):
+                            print(f"   ✅ オプションを発見: {text} (value: {value})")
+                            try:
+                                # Playwrightのselect_optionメソッドを使用
+                                await select.select_option(value)
+                                print(f"   ✅ select要素から関数を選択しました: {test_function}")
+                            except Exception as e:
+                                print(f"   ⚠️  select_optionでエラー: {e}")
+                                # フォールバック: JavaScriptで直接設定
+                                await page.evaluate(f'''
+                                    (selectIndex, optionValue) => {{
+                                        const selects = document.querySelectorAll('select');
+                                        if (selects[selectIndex]) {{
+                                            selects[selectIndex].value = optionValue;
+                                            selects[selectIndex].dispatchEvent(new Event('change', {{ bubbles: true }}));
+                                            selects[selectIndex].dispatchEvent(new Event('input', {{ bubbles: true }}));
+                                        }}
+                                    }}
+                                ''', idx, value)
+                            await asyncio.sleep(settle)  # 選択が反映されるまで待機
+                            return idx
+                except Exception as e:
+                    print(f"   ⚠️  select[{idx}]の処理でエラー: {e}")
+                    continue
+        except Exception as e:
+            print(f"   ⚠️  select要素の検索でエラー: {e}")
+        return None
+    
+    async def _select_via_aria_combobox(self, test_function: str, hint=None, cached: bool = False):
+        """方法2: 関数選択ドロップダウンをクリック（run_create_test_event_only.pyの方法）
+
+        Returns:
+            成功した場合は使用したセレクタ、失敗した場合はNone
+        """
+        page = self.page
+        function_dropdown_selectors = [hint] if hint else FUNCTION_DROPDOWN_SELECTORS
+        # キャッシュ済みのセレクタは存在するはずなので待機を短くする
+        wait_timeout = 1000 if cached else 5000
+        settle = 0.3 if cached else 1
+        
+        for selector in function_dropdown_selectors:
+            try:
+                dropdown = await page.wait_for_selector(selector, timeout=wait_timeout)
+                if dropdown:
+                    print(f"   ✅ 関数選択ドロップダウンを発見: {selector}")
+                    # クリックしてフォーカス
+                    await dropdown.click()
+                    await asyncio.sleep(settle)
+                    
+                    # 既存のテキストをクリア
+                    await page.keyboard.press('Control+A')
+                    
+                    # 関数名を入力
+                    await page.keyboard.type(test_function, delay=10 if cached else 50)
+                    await asyncio.sleep(settle)
+                    
+                    # Enterキーで選択
+                    await page.keyboard.press('Enter')
+                    print(f"   ✅ 関数名を入力しました: {test_function}")
+                    await asyncio.sleep(settle)
+                    return selector
+            except Exception as e:
+                print(f"   ⚠️  セレクタ {selector} でエラー: {e}")
+                continue
+        return None
+    
+    async def _select_via_combobox_scan(self, test_function: str, hint=None, cached: bool = False):
+        """方法3: 通常のドロップダウンを探してクリック
+
+        Returns:
+            成功した場合はドロップダウンのインデックス、失敗した場合はNone
+        """
+        page = self.page
+        settle = 0.5 if cached else 2
+        try:
+            dropdowns = await page.query_selector_all('[role="combobox"], [aria-haspopup="listbox"]')
+            print(f"   🔍 ドロップダウンを{len(dropdowns)}個発見")
+            
+            candidates = list(enumerate(dropdowns))
+            if hint is not None:
+                candidates = [(idx, dropdown) for idx, dropdown in candidates if idx == hint]
+            
+            for idx, dropdown in candidates:
+                try:
+                    await dropdown.click()
+                    await asyncio.sleep(settle)  # オプションが表示されるまで待機
+                    
+                    # オプションを探す
+                    options = await page.query_selector_all('[role="option"]')
+                    print(f"   🔍 ドロップダウン[{idx}]: {len(options)}個のオプション")
+                    
+                    for option in options:
+                        text = await option.text_content()
+                        if text and test_function in text:
+                            await option.click()
+                            print(f"   ✅ ドロップダウンから関数を選択しました: {test_function}")
+                            await asyncio.sleep(settle)
+                            return idx
+                except Exception as e:
+                    print(f"   ⚠️  ドロップダウン[{idx}]の処理でエラー: {e}")
+                    continue
+        except Exception as e:
+            print(f"   ⚠️  ドロップダウンの検索でエラー: {e}")
+        return None
+    
+    async def _select_via_javascript(self, test_function: str, hint=None, cached: bool = False):
+        """方法4: JavaScriptで直接選択を試みる（同期版）
+
+        Returns:
+            成功した場合は空文字列、失敗した場合はNone
+        """
+        print("   🔍 JavaScriptで直接選択を試みます...")
+        function_selected = await self.page.evaluate(f'''
+            (functionName) => {{
+                // select要素を探す
+                const selects = document.querySelectorAll('select');
+                for (const select of selects) {{
+                    const options = Array.from(select.options);
+                    const found = options.find(opt => 
+                        opt.textContent.trim() === functionName || 
+                        opt.textContent.includes(functionName) ||
+                        opt.value === functionName
+                    );
+                    if (found) {{
+                        select.value = found.value;
+                        select.dispatchEvent(new Event('change', {{ bubbles: true }}));
+                        select.dispatchEvent(new Event('input', {{ bubbles: true }}));
+                        return true;
+                    }}
+                }}
+                return false;
+            }}
+        ''', test_function)
+        
+        if not function_selected:
+            return None
+        print(f"   ✅ JavaScriptで関数を選択しました: {test_function}")
+        await asyncio.sleep(0.3 if cached else 2)
+        return ''
+    
+
+    async def click_run(self) -> bool:
+        """実行ボタンを探してクリック"""
+        print("▶️  実行ボタンを探しています...")
+        for selector in RUN_BUTTON_SELECTORS:
+            try:
+                run_button = await self.page.wait_for_selector(selector, timeout=3000)
+                if run_button:
+                    await run_button.click()
+                    print(f"   ✅ 実行ボタンをクリックしました")
+                    await asyncio.sleep(2)
+                    return True
+            except:
+                continue
+        return False
+    
+    async def click_stop(self) -> bool:
+        """実行中の停止ボタンをクリック"""
+        for selector in STOP_BUTTON_SELECTORS:
+            try:
+                stop_button = await self.page.wait_for_selector(selector, timeout=2000)
+                if stop_button:
+                    await stop_button.click()
+                    print("   ⏹️  停止ボタンをクリックしました")
+                    return True
+            except:
+                continue
+        return False
+    
+    async def execute(self, test_function: str, timeout: float, deadline: Optional[float] = None) -> Dict:
+        """テスト関数を選択・実行して実行ログを取得（成否の判定は呼び出し側で行う）
+        
+        deadline（time.monotonic()の値）を渡した場合、タイムアウト後のログパネルの再確認は
+        deadlineまでに制限し、過ぎていれば行わない。
+        
+        Returns:
+            {'status': 'completed' / 'error' / None, 'log_content': str, 'log_source': 'network' / 'dom' / 'live'}
+            実行前に失敗した場合やタイムアウトした場合は'error'キーにメッセージを設定する。
+            ライブ表示中はログファイルを'live_log_file'、fail-fastで打ち切った場合は'fail_fast'をTrueにする
+        """
+        page = self.page
+        try:
+            await self.ensure_ready()
+            
+            if not await self.select_function(test_function):
+                print(f"   ❌ 関数選択に失敗しました: {test_function}")
+                self.invalidate()
+                # スクリーンショットを保存（デバッグ用）
+                screenshot_path = os.path.join(os.path.dirname(__file__), '..', 'logs', f'function_select_failed_{test_function}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png')
+                await page.screenshot(path=screenshot_path, full_page=True)
+                print(f"   📸 スクリーンショットを保存しました: {screenshot_path}")
+                return {'status': None, 'log_content': '', 'error': '関数選択に失敗', 'screenshot': screenshot_path}
+            
+            # 実行前のログパネルの内容を記録（前回の実行ログと区別するため）
+            baseline_log = await read_log_panel_text(page)
+            
+            # 実行ボタンを探してクリック（ここからのネットワーク応答の実行ログを集める）
+            self.log_capture.start()
+            if not await self.click_run():
+                print("   ⚠️  実行ボタンが見つかりませんでした")
+                self.invalidate()
+                return {'status': None, 'log_content': '', 'error': '実行ボタンが見つからない'}
+            
+            # 実行ログパネルを開く
+            print("📋 実行ログパネルを開いています...")
+            if not await open_log_panel(page):
+                print("   ⚠️  実行ログボタンが見つかりませんでした")
+            
+            # 実行中のログを1行ずつ表示
+            failed = None
+            if self.log_tail:
+                await self.log_tail.start(test_function, baseline_log)
+                failed = self.log_tail.failed if self.log_tail.fail_fast else None
+            
+            # 実行完了をページ上のログから検出（固定待機ではなくMutationObserverで監視）
+            print(f"⏳ 実行完了を待機しています...（最大{timeout:g}秒）")
+            try:
+                status = await wait_for_completion_or_failure(page, baseline_log, timeout, failed)
+                grace = COMPLETION_GRACE_PERIOD
+                if deadline is not None:
+                    grace = min(grace, deadline - time.monotonic())
+                if status is None and grace <= 0:
+                    print(f"   ⚠️  {timeout:g}秒以内に実行完了を検出できませんでした（時間予算が残っていないため再確認しません）")
+                elif status is None:
+                    print(f"   ⚠️  {timeout:g}秒以内に実行完了を検出できませんでした。ログパネルを開き直して再確認します...")
+                    await open_log_panel(page)
+                    status = await wait_for_completion_or_failure(page, baseline_log, grace, failed)
+            finally:
+                if self.log_tail:
+                    await self.log_tail.stop()
+            failed_fast = status == 'failed_fast'
+            if failed_fast:
+                print(f"   ❌ 失敗の行を検出したため実行を打ち切ります（fail-fast）: {self.log_tail.failed_line}")
+                if not await self.click_stop():
+                    print("   ⚠️  停止ボタンが見つかりませんでした。エディタを読み込み直します")
+                    self.invalidate()
+                status = 'error'
+            elif status == 'completed':
+                print("   ✅ 実行完了を検出しました")
+            elif status == 'error':
+                print("   ⚠️  実行エラーを検出しました")
+            
+            # 実行ログを取得（ネットワーク応答から取得できなければDOMから取得）
+            print("📋 実行ログを取得しています...")
+            await self.log_capture.flush()
+            log_content = self.log_capture.text()
+            log_source = 'network'
+            if not log_content:
+                if self.log_capture.records:
+                    print(f"   ⚠️  ネットワーク応答のレコード（{len(self.log_capture.records)}件）に今回の実行の実行開始〜実行完了がないため、DOMから取得します")
+                log_content = await extract_execution_logs(page)
+                log_source = 'dom'
+            if not log_content and self.log_tail:
+                log_content = self.log_tail.text()
+                log_source = 'live'
+            if log_content:
+                print(f"   ✅ 実行ログを取得しました（{len(log_content)}文字、{log_source}）")
+            
+            execution = {'status': status, 'log_content': log_content, 'log_source': log_source}
+            if self.log_tail and self.log_tail.log_file:
+                execution['live_log_file'] = self.log_tail.log_file
+            if failed_fast:
+                execution['fail_fast'] = True
+            if status is None:
+                self.invalidate()
+                execution['error'] = f'実行完了を検出できませんでした（タイムアウト: {timeout:g}秒）'
+                execution['timed_out'] = True
+                # ログに実行開始がなければ、実行が始まる前に止まっている（リトライしても二重に実行されない）
+                if not any(notice in log_content for notice in EXECUTION_START_NOTICES):
+                    execution['not_started'] = True
+            return execution
+        except (Exception, asyncio.CancelledError):
+            # 時間予算で打ち切られた場合（CancelledError）も実行中のエディタの状態は不明になる
+            self.invalidate()
+            raise
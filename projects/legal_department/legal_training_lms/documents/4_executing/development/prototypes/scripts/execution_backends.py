@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+テスト関数の実行バックエンド
+
+- "api": Apps Script API（scripts.run）で実行する。ブラウザ不要で数秒で完了する
+- "playwright": Apps Scriptエディタをブラウザで操作して実行する（APIが使えない場合のフォールバック）
+
+どちらも run(function_name, timeout) で同じ形式の実行結果（実行ログ）を返し、
+成否の判定は run_all_tests.py の finalize_execution() で共通に行う。
+"""
+
+import asyncio
+import json
+import os
+import sys
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from editor_session import EditorSession
+
+BACKEND_CHOICES = ['auto', 'api', 'playwright']
+
+# tests.gs の runTestFunctionForApi()：テスト関数を実行して Logger.getLog() を返すラッパー
+API_TEST_RUNNER_FUNCTION = 'runTestFunctionForApi'
+
+APPSSCRIPT_JSON = os.path.join(os.path.dirname(__file__), '..', 'appsscript.json')
+
+
+class ExecutionBackend:
+    """実行バックエンドの共通インターフェース"""
+
+    name = ''
+
+    async def run(self, function_name: str, timeout: Optional[float] = None,
+                  deadline: Optional[float] = None) -> Dict:
+        """テスト関数を実行（deadlineはtime.monotonic()の値で、実行全体の時間予算の期限）
+
+        Returns:
+            {'backend': str, 'status': 'completed' / 'error' / None, 'log_content': str}
+            実行できなかった場合は'error'キーにメッセージを設定する
+        """
+        raise NotImplementedError
+
+
+class PlaywrightBackend(ExecutionBackend):
+    """Apps Scriptエディタをブラウザで操作して実行"""
+
+    name = 'playwright'
+
+    def __init__(self, session: EditorSession):
+        self.session = session
+
+    async def run(self, function_name: str, timeout: Optional[float] = None,
+                  deadline: Optional[float] = None) -> Dict:
+        execution = await self.session.execute(function_name, timeout, deadline)
+        execution['backend'] = self.name
+        return execution
+
+
+class ApiBackend(ExecutionBackend):
+    """Apps Script API（scripts.run）で実行
+
+    devMode=Trueで保存済みの最新コード（エディタの実行と同じ）を実行する。
+    実行ログはtests.gsのrunTestFunctionForApi()の戻り値（Logger.getLog()）から取得する。
+    timeout秒以内に応答がない場合は、エディタでの実行と同じくタイムアウトの結果を返す。
+    """
+
+    name = 'api'
+
+    def __init__(self, creds, script_id: Optional[str] = None):
+        from googleapiclient.discovery import build
+        from run_tests import SCRIPT_ID
+
+        self.script_id = script_id or SCRIPT_ID
+        self.creds = creds
+        # httplib2はスレッドセーフではないため、バックエンドごとにサービスを作成する
+        self.service = build('script', 'v1', credentials=creds, cache_discovery=False)
+
+    async def run(self, function_name: str, timeout: Optional[float] = None,
+                  deadline: Optional[float] = None) -> Dict:
+        print(f"🔌 Apps Script APIで実行しています: {function_name}")
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(self._run_sync, function_name), timeout)
+        except asyncio.TimeoutError:
+            # 応答待ちのスレッドは止められないため、次の実行では新しいサービス（HTTP接続）を使う
+            from googleapiclient.discovery import build
+            self.service = build('script', 'v1', credentials=self.creds, cache_discovery=False)
+            print(f"   ⚠️  {timeout:g}秒以内に実行が完了しませんでした")
+            return {
+                'backend': self.name,
+                'status': None,
+                'log_content': '',
+                'error': f'実行完了を検出できませんでした（タイムアウト: {timeout:g}秒）',
+                'timed_out': True,
+            }
+
+    def _run_sync(self, function_name: str) -> Dict:
+        from googleapiclient.errors import HttpError
+
+        try:
+            response = self.service.scripts().run(
+                scriptId=self.script_id,
+                body={
+                    'function': API_TEST_RUNNER_FUNCTION,
+                    'parameters': [function_name],
+                    'devMode': True,
+                }
+            ).execute()
+        except HttpError as error:
+            return {'backend': self.name, 'status': None, 'log_content': '', 'error': f'HTTPエラー: {error}'}
+
+        if 'error' in response:
+            details = (response['error'].get('details') or [{}])[0]
+            message = details.get('errorMessage') or response['error'].get('message', 'Unknown error')
+            print(f"   ❌ 実行エラー: {message}")
+            return {'backend': self.name, 'status': 'error', 'log_content': '', 'error': message}
+
+        result = response.get('response', {}).get('result') or {}
+        print(f"   ✅ 実行完了（{result.get('durationMs', '?')}ms）")
+        return {'backend': self.name, 'status': 'completed', 'log_content': result.get('log', '')}
+
+
+def get_required_api_scopes() -> list:
+    """scripts.runに必要なスコープ（スクリプトが使用するスコープ）をappsscript.jsonから取得"""
+    try:
+        with open(APPSSCRIPT_JSON, 'r', encoding='utf-8') as f:
+            return json.load(f).get('oauthScopes', [])
+    except (OSError, ValueError):
+        return []
+
+
+def load_api_credentials():
+    """Apps Script APIで実行できる認証情報を取得（対話的な認証は行わない）
+
+    Google APIクライアントが未インストール、token.jsonがない、
+    またはスコープが不足している場合はNoneを返す。
+    """
+    try:
+        from run_tests import load_saved_credentials
+    except ImportError:
+        return None
+    return load_saved_credentials(get_required_api_scopes())
+
+
+def resolve_backend_name(requested: str) -> str:
+    """--backendの指定から実際に使用するバックエンド名を決定（autoは認証情報があればapi）"""
+    if requested != 'auto':
+        return requested
+    return 'api' if load_api_credentials() is not None else 'playwright'
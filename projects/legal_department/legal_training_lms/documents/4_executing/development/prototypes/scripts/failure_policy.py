@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+テスト失敗の分類とリトライ方針
+
+- transient（一時的）: ネットワークエラー、ページ読み込みのタイムアウト、途中で切れたログ、APIのレート制限など
+- infrastructure（実行環境）: 関数選択・実行ボタンの検出失敗、実行完了の検出タイムアウト、
+  ブラウザの終了、Apps Scriptの割り当て（クォータ）超過など
+- test（テストの失敗）: 上記以外。テスト自体の失敗なのでリトライしない
+
+transient / infrastructureは指数バックオフ（ジッター付き）でリトライし、
+1回の実行全体でのリトライ回数の上限（予算）を設ける。
+ただし実行完了の検出タイムアウトは、ログに実行開始がなく実行が始まっていなかった場合（not_started）だけリトライする。
+実行が始まっていればテストはサーバー側で最後まで動いている可能性があり、
+カレンダーの予約などの副作用があるテストを二重に実行してしまうため。
+Apps Scriptの最大実行時間の超過はテスト自体が長すぎるためで、リトライしても同じ結果になるためリトライしない。
+"""
+
+import random
+import re
+from typing import Dict, Optional
+
+TRANSIENT = 'transient'
+INFRASTRUCTURE = 'infrastructure'
+TEST_FAILURE = 'test'
+
+FAILURE_LABELS = {
+    TRANSIENT: '一時的なエラー',
+    INFRASTRUCTURE: '実行環境のエラー',
+    TEST_FAILURE: 'テストの失敗',
+}
+
+TRANSIENT_PATTERNS = [
+    r'net::ERR_',
+    r'ERR_ADDRESS_UNREACHABLE',
+    r'ERR_INTERNET_DISCONNECTED',
+    r'ERR_NETWORK_CHANGED',
+    r'ERR_CONNECTION_(RESET|CLOSED|REFUSED|TIMED_OUT)',
+    r'Navigation timeout',
+    r'Timeout \d+ms exceeded',
+    r'読み込んでいます',
+    r'ログが不完全',
+    r'ログ取得失敗',
+    r'HttpError 429',
+    r'HttpError 50[0234]',
+    r'Rate Limit Exceeded',
+    r'too many (simultaneous|concurrent) invocations',
+    r'同時に実行されているスクリプトが多すぎます',
+    r'ロックのタイムアウト',
+    r'Lock timeout',
+]
+
+INFRASTRUCTURE_PATTERNS = [
+    r'関数選択に失敗',
+    r'実行ボタンが見つからない',
+    r'実行完了を検出できませんでした',
+    r'Target (page, context or browser|closed)',
+    r'Browser has been closed',
+    r'Page crashed',
+    r'Service invoked too many times',
+    r'サービスの呼び出し回数が多すぎます',
+]
+
+# 実行完了の検出タイムアウト（実行が始まっていなかった場合だけリトライする）
+COMPLETION_TIMEOUT_PATTERN = r'実行完了を検出できませんでした'
+
+# リトライしても回復しない実行環境のエラー（認証切れ・権限不足）
+NON_RETRYABLE_PATTERNS = [
+    r'HttpError 40[13]',
+    r'invalid_grant',
+    r'PERMISSION_DENIED',
+]
+
+_TRANSIENT_RE = re.compile('|'.join(TRANSIENT_PATTERNS), re.IGNORECASE)
+_INFRASTRUCTURE_RE = re.compile('|'.join(INFRASTRUCTURE_PATTERNS + NON_RETRYABLE_PATTERNS), re.IGNORECASE)
+_NON_RETRYABLE_RE = re.compile('|'.join(NON_RETRYABLE_PATTERNS), re.IGNORECASE)
+_COMPLETION_TIMEOUT_RE = re.compile(COMPLETION_TIMEOUT_PATTERN)
+
+
+def failure_text(result: Dict) -> str:
+    """分類に使うテキスト（エラーメッセージと検出されたエラー行）"""
+    parts = [str(result.get('error') or '')]
+    parts.extend(str(e) for e in (result.get('errors') or [])[:20])
+    return '\n'.join(parts)
+
+
+def classify_failure(result: Dict) -> Optional[str]:
+    """テスト結果の失敗を分類（成功の場合はNone）"""
+    if result.get('success') == True:
+        return None
+    text = failure_text(result)
+    if _INFRASTRUCTURE_RE.search(text):
+        return INFRASTRUCTURE
+    if _TRANSIENT_RE.search(text):
+        return TRANSIENT
+    return TEST_FAILURE
+
+
+def is_retryable(result: Dict) -> bool:
+    """リトライで回復する可能性がある失敗か"""
+    category = classify_failure(result)
+    if category in (None, TEST_FAILURE):
+        return False
+    text = failure_text(result)
+    if _COMPLETION_TIMEOUT_RE.search(text) and not result.get('not_started'):
+        return False
+    return not _NON_RETRYABLE_RE.search(text)
+
+
+class RetryPolicy:
+    """指数バックオフ（ジッター付き）と、1回の実行全体で共有するリトライ予算"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 5, max_delay: float = 120,
+                 budget: int = 10):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.used = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.budget - self.used)
+
+    def should_retry(self, result: Dict, attempt: int) -> bool:
+        """attempt回目の実行結果をリトライするか"""
+        return attempt < self.max_attempts and self.remaining > 0 and is_retryable(result)
+
+    def next_delay(self, attempt: int) -> float:
+        """attempt回目の失敗後の待機秒数（上限付きの指数バックオフの半分 + ランダムなジッター）"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def consume(self) -> None:
+        """リトライ予算を1回分使う"""
+        self.used += 1
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+テストの不安定さ（flakiness）の測定結果と隔離（quarantine）
+
+run_all_tests.py --repeat K で各テストをK回実行し、成功率とそのWilsonスコア信頼区間、
+実行時間の平均とp95を logs/flakiness.json に保存する。
+成功と失敗の両方が観測され、成功率がしきい値を下回ったテストは隔離され、
+通常の実行では結果を記録するものの失敗には数えない。
+
+使い方:
+    python3 scripts/flakiness.py                          # 測定結果と隔離中のテストを表示
+    python3 scripts/flakiness.py --release testErrorHandling   # 隔離を解除（測定結果を削除）
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from duration_store import percentile
+
+FLAKINESS_FILE = os.path.join(os.path.dirname(__file__), '..', 'logs', 'flakiness.json')
+
+# 成功率がこれを下回る不安定なテストを隔離する
+QUARANTINE_THRESHOLD = 0.9
+# 信頼区間の水準（95%）
+CONFIDENCE_Z = 1.96
+
+
+def wilson_interval(passes: int, runs: int, z: float = CONFIDENCE_Z) -> List[float]:
+    """成功率のWilsonスコア信頼区間 [下限, 上限]（少ない実行回数でも0〜1に収まる）"""
+    if runs == 0:
+        return [0.0, 1.0]
+    rate = passes / runs
+    denominator = 1 + z * z / runs
+    center = (rate + z * z / (2 * runs)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / runs + z * z / (4 * runs * runs)) / denominator
+    return [max(0.0, center - margin), min(1.0, center + margin)]
+
+
+def summarize_runs(test_function: str, results: List[Dict], threshold: float = QUARANTINE_THRESHOLD) -> Dict:
+    """同じテストの繰り返し実行の結果から統計を作成"""
+    runs = len(results)
+    passes = sum(1 for r in results if r.get('success') == True)
+    durations = [r['wall_time'] for r in results if r.get('wall_time') is not None]
+    categories: Dict[str, int] = {}
+    for result in results:
+        if result.get('success') != True:
+            category = result.get('failure_category') or 'unknown'
+            categories[category] = categories.get(category, 0) + 1
+
+    pass_rate = passes / runs if runs else 0.0
+    flaky = 0 < passes < runs
+    return {
+        'test_function': test_function,
+        'runs': runs,
+        'passes': passes,
+        'pass_rate': round(pass_rate, 3),
+        'confidence_interval': [round(v, 3) for v in wilson_interval(passes, runs)],
+        'duration_mean': round(sum(durations) / len(durations), 1) if durations else None,
+        'duration_p95': round(percentile(durations, 95), 1) if durations else None,
+        'failure_categories': categories,
+        'flaky': flaky,
+        # 常に失敗するテストは不具合として扱い、隔離しない
+        'quarantined': flaky and pass_rate < threshold,
+        'measured_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def print_flakiness(stats: List[Dict]) -> None:
+    """テストごとの統計を表示"""
+    print("\n" + "="*80)
+    print("🎲 テストの安定性")
+    print("="*80)
+    for entry in stats:
+        low, high = entry['confidence_interval']
+        mark = "🧪" if entry['quarantined'] else ("🎲" if entry['flaky'] else ("✅" if entry['passes'] else "❌"))
+        duration = ""
+        if entry.get('duration_mean') is not None:
+            duration = f"、平均 {entry['duration_mean']:.1f}秒 / p95 {entry['duration_p95']:.1f}秒"
+        print(f"{mark} {entry['test_function']}: {entry['passes']}/{entry['runs']} "
+              f"（成功率 {entry['pass_rate']:.0%}、95%信頼区間 {low:.0%}〜{high:.0%}{duration}）")
+    quarantined = [e['test_function'] for e in stats if e['quarantined']]
+    if quarantined:
+        print(f"\n🧪 隔離するテスト（成功率 {QUARANTINE_THRESHOLD:.0%} 未満の不安定なテスト）: {', '.join(quarantined)}")
+
+
+class FlakinessStore:
+    """テスト関数 → 直近の測定結果"""
+
+    def __init__(self, path: str = FLAKINESS_FILE):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.tests: Dict[str, Dict] = json.load(f).get('tests', {})
+        except (OSError, ValueError, AttributeError):
+            self.tests = {}
+
+    def update(self, stats: List[Dict]) -> None:
+        """測定したテストの結果を置き換える（測定していないテストの結果は残す）"""
+        for entry in stats:
+            self.tests[entry['test_function']] = entry
+
+    def quarantined(self) -> List[str]:
+        """隔離中のテスト関数"""
+        return sorted(name for name, entry in self.tests.items() if entry.get('quarantined'))
+
+    def release(self, test_function: str) -> bool:
+        """隔離を解除（測定結果を削除）。測定結果がない場合はFalse"""
+        return self.tests.pop(test_function, None) is not None
+
+    def save(self) -> None:
+        """測定結果をファイルに保存"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'updated_at': datetime.now().isoformat(timespec='seconds'),
+                    'quarantine_threshold': QUARANTINE_THRESHOLD,
+                    'tests': self.tests,
+                }, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"⚠️  テストの安定性の測定結果を保存できませんでした: {e}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='テストの安定性の測定結果と隔離中のテストを表示します')
+    parser.add_argument('--release', nargs='+', metavar='TEST',
+                        help='指定したテストの隔離を解除する（測定結果を削除）')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    store = FlakinessStore()
+    if args.release:
+        for test_function in args.release:
+            if store.release(test_function):
+                print(f"🔓 {test_function} の隔離を解除しました")
+            else:
+                print(f"⚠️  {test_function} の測定結果はありません")
+        store.save()
+    elif not store.tests:
+        print("📭 測定結果はありません（python3 scripts/run_all_tests.py --repeat K で測定します）")
+    else:
+        print_flakiness(list(store.tests.values()))
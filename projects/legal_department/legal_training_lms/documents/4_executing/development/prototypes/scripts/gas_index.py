@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Apps Script（.gs）ファイルの関数と呼び出し関係を解析するモジュール
+
+- tests.gsのテスト関数の呼び出しグラフ（testAll → testAllSheetFunctions → testSheetFunctions ...）
+- 集約テストと個別テストの重複を除いた最小の実行セットの計画
+- 各.gsの関数・トップレベル変数 → それに到達するテスト関数のインデックス（変更されたテストの選択用）
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import subprocess
+from typing import Dict, List, Optional, Set
+
+GAS_DIR = os.path.join(os.path.dirname(__file__), '..')
+TESTS_GS = os.path.join(GAS_DIR, 'tests.gs')
+INDEX_CACHE_FILE = os.path.join(GAS_DIR, '.cache', 'gas_index.json')
+INDEX_VERSION = 1
+
+FUNCTION_DECL_PATTERN = re.compile(r'\b(?:async\s+)?function\s+([A-Za-z_$][\w$]*)\s*\(')
+# obj.method( は除外し、グローバル関数の呼び出しだけを拾う
+CALL_PATTERN = re.compile(r'(?<![\w$.])([A-Za-z_$][\w$]*)\s*\(')
+# 関数の参照（コールバックとして渡す場合など）やトップレベル変数の参照
+IDENTIFIER_PATTERN = re.compile(r'(?<![\w$.])([A-Za-z_$][\w$]*)')
+TOP_LEVEL_VAR_PATTERN = re.compile(r'^(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=', re.M)
+TOP_LEVEL_ITEM_PATTERN = re.compile(r'(?:(?:async\s+)?function|const|let|var)\b')
+HUNK_PATTERN = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@', re.M)
+
+# この直後の「/」は正規表現リテラルの開始とみなす
+REGEX_PRECEDING_CHARS = set('(,=:[!&|?{};+-*%<>~^')
+
+
+def strip_comments_and_strings(source: str) -> str:
+    """コメントと文字列リテラルの中身を空白に置き換える（行番号と文字位置は保持）
+
+    テンプレートリテラルの ${...} の中はコードとして残す。
+    """
+    out = list(source)
+    length = len(source)
+    i = 0
+    # テンプレートリテラルの ${ } の入れ子を管理するための波括弧の深さ
+    template_stack: List[int] = []
+    brace_depth = 0
+    last_significant = ''
+
+    def blank(start: int, end: int) -> None:
+        for k in range(start, min(end, length)):
+            if out[k] != '\n':
+                out[k] = ' '
+
+    def skip_template(start: int) -> int:
+        """テンプレートリテラルの文字列部分を読み飛ばし、終端か ${ の直後の位置を返す"""
+        k = start
+        while k < length:
+            ch = source[k]
+            if ch == '\\':
+                k += 2
+                continue
+            if ch == '`':
+                blank(start, k)
+                return k + 1
+            if ch == '$' and k + 1 < length and source[k + 1] == '{':
+                blank(start, k)
+                template_stack.append(brace_depth)
+                return k + 2
+            k += 1
+        blank(start, length)
+        return length
+
+    while i < length:
+        ch = source[i]
+        nxt = source[i + 1] if i + 1 < length else ''
+
+        if ch == '/' and nxt == '/':
+            end = source.find('\n', i)
+            end = length if end == -1 else end
+            blank(i, end)
+            i = end
+            continue
+        if ch == '/' and nxt == '*':
+            end = source.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            blank(i, end)
+            i = end
+            continue
+        if ch in ('"', "'"):
+            k = i + 1
+            while k < length and source[k] != ch and source[k] != '\n':
+                k += 2 if source[k] == '\\' else 1
+            blank(i + 1, k)
+            i = k + 1
+            last_significant = ch
+            continue
+        if ch == '`':
+            i = skip_template(i + 1)
+            last_significant = '`'
+            continue
+        if ch == '/' and (last_significant == '' or last_significant in REGEX_PRECEDING_CHARS):
+            k = i + 1
+            in_class = False
+            while k < length and source[k] != '\n':
+                c = source[k]
+                if c == '\\':
+                    k += 2
+                    continue
+                if c == '[':
+                    in_class = True
+                elif c == ']':
+                    in_class = False
+                elif c == '/' and not in_class:
+                    break
+                k += 1
+            blank(i + 1, k)
+            i = k + 1
+            last_significant = '/'
+            continue
+        if ch == '{':
+            brace_depth += 1
+        elif ch == '}':
+            if template_stack and template_stack[-1] == brace_depth:
+                # ${ ... } の終わり → テンプレートリテラルの続き
+                template_stack.pop()
+                i = skip_template(i + 1)
+                last_significant = '`'
+                continue
+            brace_depth -= 1
+        if not ch.isspace():
+            last_significant = ch
+        i += 1
+
+    return ''.join(out)
+
+
+def parse_gs_functions(source: str, filename: str = '') -> Dict[str, Dict]:
+    """トップレベルの関数定義を抽出
+
+    Returns:
+        関数名 → {'name', 'file', 'start_line', 'end_line', 'calls', 'refs', 'source'}
+        ネストした関数の呼び出しは外側の関数の呼び出しとして扱う
+    """
+    code = strip_comments_and_strings(source)
+    functions: Dict[str, Dict] = {}
+    depth = 0
+    pos = 0
+    for match in FUNCTION_DECL_PATTERN.finditer(code):
+        if match.start() < pos:
+            continue  # 直前の関数の本体の中（ネストした関数）
+        depth += code.count('{', pos, match.start()) - code.count('}', pos, match.start())
+        pos = match.start()
+        if depth != 0:
+            continue
+
+        body_start = code.find('{', match.end())
+        if body_start == -1:
+            break
+        level = 0
+        body_end = body_start
+        for k in range(body_start, len(code)):
+            if code[k] == '{':
+                level += 1
+            elif code[k] == '}':
+                level -= 1
+                if level == 0:
+                    body_end = k
+                    break
+        else:
+            body_end = len(code) - 1
+
+        name = match.group(1)
+        body = code[body_start + 1:body_end]
+        nested = set(FUNCTION_DECL_PATTERN.findall(body))
+        calls = {c for c in CALL_PATTERN.findall(body) if c != name and c not in nested}
+        functions[name] = {
+            'name': name,
+            'file': filename,
+            'start_line': code.count('\n', 0, match.start()) + 1,
+            'end_line': code.count('\n', 0, body_end) + 1,
+            'calls': calls,
+            'refs': set(IDENTIFIER_PATTERN.findall(body)) - {name},
+            'source': source[match.start():body_end + 1],
+        }
+        pos = body_end + 1
+
+    return functions
+
+
+def parse_gs_variables(source: str, filename: str = '') -> Dict[str, Dict]:
+    """トップレベルの変数定義（const/let/var）を抽出
+
+    Returns:
+        変数名 → {'name', 'file', 'start_line', 'end_line', 'refs'}
+    """
+    code = strip_comments_and_strings(source)
+    variables: Dict[str, Dict] = {}
+    for match in TOP_LEVEL_VAR_PATTERN.finditer(code):
+        prefix = code[:match.start()]
+        if prefix.count('{') != prefix.count('}'):
+            continue  # 関数やブロックの中
+
+        # 括弧の外の「;」または次のトップレベルの定義までを1つの文とみなす
+        depth = 0
+        end = len(code)
+        k = match.end()
+        while k < len(code):
+            ch = code[k]
+            if ch in '({[':
+                depth += 1
+            elif ch in ')}]':
+                depth -= 1
+            elif depth == 0 and ch == ';':
+                end = k
+                break
+            elif depth == 0 and ch == '\n' and TOP_LEVEL_ITEM_PATTERN.match(code, k + 1):
+                end = k
+                break
+            k += 1
+
+        name = match.group(1)
+        variables[name] = {
+            'name': name,
+            'file': filename,
+            'start_line': code.count('\n', 0, match.start()) + 1,
+            'end_line': code.count('\n', 0, end) + 1,
+            'refs': set(IDENTIFIER_PATTERN.findall(code[match.end():end])) - {name},
+        }
+    return variables
+
+
+def build_call_graph(functions: Dict[str, Dict]) -> Dict[str, Set[str]]:
+    """関数名 → 呼び出している（定義済みの）関数名の集合"""
+    return {name: {c for c in info['calls'] if c in functions} for name, info in functions.items()}
+
+
+def reachable_functions(graph: Dict[str, Set[str]], root: str) -> Set[str]:
+    """rootから呼び出しをたどって到達できる関数（root自身は含めない）"""
+    seen: Set[str] = set()
+    stack = list(graph.get(root, ()))
+    while stack:
+        name = stack.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        stack.extend(graph.get(name, ()))
+    return seen
+
+
+def has_test_markers(functions: Dict[str, Dict], test_function: str) -> bool:
+    """テスト関数が「=== 関数名: 開始 ===」のマーカーをログに出力するか
+
+    マーカーがあるテストは、集約テストの実行ログから自分の部分を切り出せる。
+    """
+    info = functions.get(test_function)
+    return bool(info) and f'=== {test_function}: 開始 ===' in info['source']
+
+
+def load_gs_functions(path: str = TESTS_GS) -> Dict[str, Dict]:
+    """.gsファイルを読み込んで関数定義を抽出"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_gs_functions(f.read(), os.path.basename(path))
+
+
+def plan_test_execution(test_functions: List[str], functions: Optional[Dict[str, Dict]] = None) -> Dict:
+    """集約テストと、それが呼び出す個別テストの重複実行をなくした実行計画を作成
+
+    各テストは、自身を実行するか、マーカー付きで呼び出す集約テストの実行で結果を得られる。
+    すべてのテストの結果が得られる最小の実行セットを貪欲法（集合被覆）で選ぶ。
+
+    Returns:
+        {'executions': 実行するテスト関数（test_functionsの順）,
+         'covered_by': テスト関数 → 結果を得る実行（自身の場合は自身）}
+    """
+    if functions is None:
+        functions = load_gs_functions()
+    graph = build_call_graph(functions)
+    targets = set(test_functions)
+
+    covers: Dict[str, Set[str]] = {}
+    for test_function in test_functions:
+        derived = {t for t in reachable_functions(graph, test_function)
+                   if t in targets and has_test_markers(functions, t)}
+        covers[test_function] = derived | {test_function}
+
+    order = {name: i for i, name in enumerate(test_functions)}
+    uncovered = set(targets)
+    executions: List[str] = []
+    while uncovered:
+        # 未カバーのテストを最も多く含む実行を選ぶ（同数なら元の順序を優先）
+        best = max(
+            (t for t in test_functions if t not in executions),
+            key=lambda t: (len(covers[t] & uncovered), -order[t])
+        )
+        executions.append(best)
+        uncovered -= covers[best]
+
+    covered_by: Dict[str, str] = {}
+    for execution in executions:
+        for test_function in covers[execution]:
+            covered_by.setdefault(test_function, execution)
+    for execution in executions:
+        covered_by[execution] = execution
+
+    return {
+        'executions': sorted(executions, key=order.get),
+        'covered_by': covered_by,
+    }
+
+
+def file_hash(path: str) -> str:
+    """ファイル内容のハッシュ"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def list_gs_files(gas_dir: str = GAS_DIR) -> List[str]:
+    """プロジェクトの.gsファイル（gas_dirからの相対パス）"""
+    return sorted(os.path.relpath(path, gas_dir) for path in glob.glob(os.path.join(gas_dir, '*.gs')))
+
+
+def build_gas_index(gas_dir: str = GAS_DIR, tests_file: str = 'tests.gs') -> Dict:
+    """各.gsの関数・トップレベル変数 → それに到達するtests.gsのテスト関数のインデックスを作成"""
+    files: Dict[str, Dict] = {}
+    symbols: Dict[str, Dict] = {}
+    for rel_path in list_gs_files(gas_dir):
+        path = os.path.join(gas_dir, rel_path)
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        file_symbols = parse_gs_variables(source, rel_path)
+        file_symbols.update(parse_gs_functions(source, rel_path))
+        files[rel_path] = {
+            'hash': file_hash(path),
+            'symbols': {name: [info['start_line'], info['end_line']] for name, info in file_symbols.items()},
+        }
+        symbols.update(file_symbols)
+
+    graph = {name: {r for r in info['refs'] if r in symbols} for name, info in symbols.items()}
+    tests = [name for name, info in symbols.items()
+             if info['file'] == tests_file and name.startswith('test') and 'calls' in info]
+
+    affected: Dict[str, Set[str]] = {}
+    for test_function in tests:
+        for name in reachable_functions(graph, test_function) | {test_function}:
+            affected.setdefault(name, set()).add(test_function)
+
+    return {
+        'version': INDEX_VERSION,
+        'files': files,
+        'tests': tests,
+        'affected_tests': {name: sorted(found) for name, found in sorted(affected.items())},
+    }
+
+
+def load_gas_index(gas_dir: str = GAS_DIR, cache_file: str = INDEX_CACHE_FILE) -> Dict:
+    """キャッシュ済みのインデックスを読み込む（.gsファイルのハッシュが変わっていれば再構築）"""
+    current = {rel_path: file_hash(os.path.join(gas_dir, rel_path)) for rel_path in list_gs_files(gas_dir)}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        cached = {rel_path: info['hash'] for rel_path, info in index['files'].items()}
+        if index.get('version') == INDEX_VERSION and cached == current:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+
+    print("🗂️  .gsファイルの関数インデックスを作成しています...")
+    index = build_gas_index(gas_dir)
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️  関数インデックスを保存できませんでした: {e}")
+    return index
+
+
+def _code_lines(source: Optional[str]) -> Optional[List[str]]:
+    """各行からコメントと文字列リテラルの中身を除いたもの（sourceがNoneの場合はNone）"""
+    return strip_comments_and_strings(source).split('\n') if source is not None else None
+
+
+def _read_source(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _git_show(ref: str, rel_path: str, gas_dir: str) -> Optional[str]:
+    """refの時点のファイルの内容（存在しない場合はNone）"""
+    proc = subprocess.run(['git', 'show', f'{ref}:./{rel_path}'], cwd=gas_dir, capture_output=True, text=True)
+    return proc.stdout if proc.returncode == 0 else None
+
+
+def _has_code(code: Optional[List[str]], line_numbers) -> bool:
+    """行番号（1始まり）の行にコードがあるか（内容が分からない場合はあるとみなす）"""
+    if code is None:
+        return True
+    return any(n <= len(code) and code[n - 1].strip() for n in line_numbers)
+
+
+def get_changed_lines(ref: str, gas_dir: str = GAS_DIR) -> Dict[str, Optional[Set[int]]]:
+    """refから現在の作業ツリーまでに変更された.gsファイルの行番号（変更後の行番号）
+
+    インデックスの対象と同じく、gas_dir直下の.gsファイルだけを見る（archived/などの変更は無視する）。
+    gitに追加していない新しい.gsファイルはすべての行を変更とみなす。
+    空行・コメントだけの行の変更は含めない。ただしコードを削除した（コメントアウトした）だけのハンクは、
+    その位置の行を含める。
+
+    Returns:
+        ファイル（gas_dirからの相対パス）→ 変更行の集合。削除・名前変更されたファイルはNone
+
+    Raises:
+        RuntimeError: git diffに失敗した場合（refが存在しないなど）
+    """
+    proc = subprocess.run(
+        ['git', 'diff', '-U0', '--no-color', '--relative', '-M', ref, '--', ':(glob)*.gs'],
+        cwd=gas_dir, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or f'git diff {ref} に失敗しました')
+
+    changed: Dict[str, Optional[Set[int]]] = {}
+    # ファイル → ハンクごとの (変更前の行番号, 変更後の行番号)
+    hunks: Dict[str, List[tuple]] = {}
+    current_file = None
+    for line in proc.stdout.splitlines():
+        if line.startswith('diff --git'):
+            current_file = None
+        elif line.startswith('--- a/'):
+            old_file = line[len('--- a/'):]
+            changed.setdefault(old_file, set())
+            current_file = old_file
+        elif line.startswith('+++ '):
+            if line == '+++ /dev/null':
+                changed[current_file] = None  # 削除されたファイル
+                current_file = None
+                continue
+            new_file = line[len('+++ b/'):]
+            if current_file and current_file != new_file:
+                changed[current_file] = None  # 名前変更されたファイル
+            current_file = new_file
+            changed.setdefault(current_file, set())
+        elif line.startswith('@@') and current_file and changed.get(current_file) is not None:
+            match = HUNK_PATTERN.match(line)
+            if not match:
+                continue
+            old_start, old_count = int(match.group(1)), int(match.group(2) or 1)
+            start, count = int(match.group(3)), int(match.group(4) or 1)
+            # 削除のみのハンク：削除位置の前後の行を変更とみなす
+            new_lines = range(start, start + count) if count else (start, start + 1)
+            hunks.setdefault(current_file, []).append((range(old_start, old_start + old_count), new_lines))
+
+    for rel_path, file_hunks in hunks.items():
+        if changed.get(rel_path) is None:
+            continue
+        code = _code_lines(_read_source(os.path.join(gas_dir, rel_path)))
+        old_code = None
+        if any(old_lines for old_lines, _ in file_hunks):
+            old_code = _code_lines(_git_show(ref, rel_path, gas_dir))
+        for old_lines, new_lines in file_hunks:
+            kept = [n for n in new_lines if _has_code(code, (n,))]
+            if not kept and old_lines and _has_code(old_code, old_lines):
+                kept = new_lines  # コードを削除・コメントアウトした位置
+            changed[rel_path].update(kept)
+
+    untracked = subprocess.run(
+        ['git', 'ls-files', '--others', '--exclude-standard', '--', ':(glob)*.gs'],
+        cwd=gas_dir, capture_output=True, text=True
+    )
+    for rel_path in untracked.stdout.splitlines():
+        code = _code_lines(_read_source(os.path.join(gas_dir, rel_path)))
+        if code is not None:
+            changed[rel_path] = {n for n in range(1, len(code) + 1) if code[n - 1].strip()}
+    return changed
+
+
+def select_tests_for_changes(ref: str, test_functions: List[str], gas_dir: str = GAS_DIR) -> Dict:
+    """refからの.gsの変更の影響を受けるテスト関数を選択
+
+    関数・変数の外（ファイル先頭など）の変更は、そのファイルのすべての関数の変更とみなす。
+    削除・名前変更されたファイルがある場合は、影響範囲を特定できないためすべてのテストを選択する。
+
+    Returns:
+        {'tests': 選択したテスト関数（test_functionsの順）, 'changed_symbols': 変更された関数・変数,
+         'changed_files': 変更された.gsファイル}
+    """
+    changed_lines = get_changed_lines(ref, gas_dir)
+    index = load_gas_index(gas_dir)
+
+    changed_symbols: Set[str] = set()
+    select_all = False
+    for rel_path, lines in changed_lines.items():
+        file_info = index['files'].get(rel_path)
+        if lines is None or file_info is None:
+            select_all = True
+            continue
+        ranges = file_info['symbols']
+        for line_no in lines:
+            hits = [name for name, (start, end) in ranges.items() if start <= line_no <= end]
+            if hits:
+                changed_symbols.update(hits)
+            elif line_no <= max((end for _, end in ranges.values()), default=0):
+                changed_symbols.update(ranges)
+
+    if select_all:
+        tests = list(test_functions)
+    else:
+        affected: Set[str] = set()
+        for name in changed_symbols:
+            affected.update(index['affected_tests'].get(name, []))
+        tests = [t for t in test_functions if t in affected]
+
+    return {
+        'tests': tests,
+        'changed_symbols': sorted(changed_symbols),
+        'changed_files': sorted(changed_lines),
+    }
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Apps Scriptエディタのネットワーク応答から実行ログを取得する
+
+エディタは実行ログをRPC（batchexecute形式: 先頭に「)]}'」、続いて「長さ行 + JSON」のチャンク）で受け取る。
+page.on("response")でこの応答を監視し、ログのレコード（時刻・レベル・メッセージ）に変換する。
+DOMの走査と違い、ページの初期化データ（window.WIZ_global_data など）や「読み込んでいます…」を拾わない。
+
+レコードの形式は公開されていないため、応答のJSONを走査して
+「メッセージ文字列 + 時刻（エポックミリ秒または[秒, ナノ秒]）」を持つ小さな配列をレコードとみなす。
+この条件だけではRPCの無関係なメタデータも拾うため、実行の通知（実行開始・実行完了）のレコードか、
+レベル（INFOなど）を持つレコードが1つもない場合は実行ログとみなさない。
+実行ボタンを押す前の時刻のレコードは（時計のずれを除いて）無視する。時計のずれの範囲には前のテストの実行の
+レコードも入りうるため、最後の実行開始からその後の実行完了までのレコードだけを今回の実行ログとする。
+実行完了がない場合（実行中・タイムアウト）は実行ログを返さず、呼び出し側でDOMから取得する。
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# 実行ログを運ぶ応答のURL（エディタのRPC）
+LOG_RESPONSE_URL_PARTS = ['script.google.com', 'batchexecute']
+LOG_RESPONSE_TYPES = {'xhr', 'fetch'}
+
+XSSI_PREFIX = ")]}'"
+
+# ログのレベル → エディタの表示名
+LEVEL_LABELS = {
+    'NOTICE': 'お知らせ',
+    'INFO': '情報',
+    'DEBUG': 'デバッグ',
+    'WARNING': '警告',
+    'WARN': '警告',
+    'ERROR': 'エラー',
+}
+
+# 実行の通知のメッセージ（エディタの表示言語によって変わる）
+EXECUTION_START_NOTICES = ('実行開始', 'Execution started')
+EXECUTION_END_NOTICES = ('実行完了', 'Execution completed')
+EXECUTION_NOTICES = EXECUTION_START_NOTICES + EXECUTION_END_NOTICES
+
+# エポック秒として妥当な範囲（2017年〜2049年）
+EPOCH_SECONDS_RANGE = (1.5e9, 2.5e9)
+
+# 実行開始より前とみなすまでの許容秒数（PCとサーバーの時計のずれ）
+CLOCK_SKEW = 60
+
+# レコードとみなす配列の最大長
+MAX_RECORD_FIELDS = 8
+
+
+def strip_xssi(text: str) -> str:
+    """応答の先頭のXSSI対策の接頭辞を取り除く"""
+    text = text.lstrip()
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+    return text.lstrip()
+
+
+def decode_rpc_response(text: str) -> List[Any]:
+    """batchexecute形式（またはJSON）の応答をデコードし、含まれるペイロードのリストを返す
+
+    チャンクの長さ行は無視し、JSONとして読める行だけを使う。
+    ["wrb.fr", rpcid, "<JSON文字列>", ...] のエンベロープは中のJSON文字列もデコードする。
+    """
+    body = strip_xssi(text)
+    chunks = []
+    try:
+        chunks.append(json.loads(body))
+    except ValueError:
+        for line in body.splitlines():
+            line = line.strip()
+            if not line or line.isdigit():
+                continue
+            try:
+                chunks.append(json.loads(line))
+            except ValueError:
+                continue
+
+    payloads: List[Any] = []
+    for chunk in chunks:
+        payloads.append(chunk)
+        for envelope in _iter_envelopes(chunk):
+            try:
+                payloads.append(json.loads(envelope[2]))
+            except (ValueError, TypeError):
+                continue
+    return payloads
+
+
+def _iter_envelopes(node: Any):
+    """["wrb.fr", rpcid, "<JSON文字列>", ...] のエンベロープを列挙"""
+    if isinstance(node, list):
+        if len(node) >= 3 and node[0] == 'wrb.fr' and isinstance(node[2], str):
+            yield node
+            return
+        for child in node:
+            yield from _iter_envelopes(child)
+
+
+def _as_epoch_seconds(value: Any) -> Optional[float]:
+    """エポックミリ秒・[秒, ナノ秒]・ISO 8601文字列を秒に変換（時刻でなければNone）"""
+    low, high = EPOCH_SECONDS_RANGE
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        if low * 1000 <= value <= high * 1000:
+            return value / 1000
+        return None
+    if isinstance(value, list) and 1 <= len(value) <= 2 and all(isinstance(v, int) for v in value):
+        if low <= value[0] <= high:
+            return value[0] + (value[1] / 1e9 if len(value) > 1 else 0)
+        return None
+    if isinstance(value, str) and len(value) >= 19 and value[4] == '-' and 'T' in value:
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _as_record(node: List[Any]) -> Optional[Dict]:
+    """配列がログのレコードならdictに変換（レベルの値が見つからない場合はlevel=None）"""
+    if len(node) > MAX_RECORD_FIELDS:
+        return None
+    timestamp = None
+    level = None
+    message = None
+    for value in node:
+        if timestamp is None:
+            timestamp = _as_epoch_seconds(value)
+            if timestamp is not None:
+                continue
+        if isinstance(value, str):
+            if level is None and value.upper() in LEVEL_LABELS:
+                level = value.upper()
+            elif message is None and value.strip():
+                message = value
+    if timestamp is None or message is None:
+        return None
+    return {'time': timestamp, 'level': level, 'message': message}
+
+
+def find_log_records(payload: Any) -> List[Dict]:
+    """ペイロードを走査してログのレコードを取り出す"""
+    records: List[Dict] = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, list):
+            continue
+        record = _as_record(node)
+        if record:
+            records.append(record)
+            continue
+        stack.extend(reversed(node))
+    return records
+
+
+def is_execution_log(records: List[Dict]) -> bool:
+    """実行の通知か、レベルを持つレコードを含むか（含まなければ無関係なメタデータとみなす）"""
+    return any(record['level'] is not None
+               or any(notice in record['message'] for notice in EXECUTION_NOTICES)
+               for record in records)
+
+
+def _is_notice(record: Dict, notices: tuple) -> bool:
+    """実行の通知のレコードか（テストのログの「…実行完了」などと区別するため、メッセージ全体で比べる）"""
+    return record['level'] in (None, 'NOTICE') and record['message'].strip() in notices
+
+
+def select_current_execution(records: List[Dict]) -> List[Dict]:
+    """時刻順のレコードから、最後の実行（最後の実行開始から、その後の最初の実行完了まで）のレコードを取り出す
+
+    実行開始がないか、最後の実行開始の後に実行完了がない（実行中・タイムアウト）場合は空のリストを返す。
+    """
+    start = next((i for i in range(len(records) - 1, -1, -1)
+                  if _is_notice(records[i], EXECUTION_START_NOTICES)), None)
+    if start is None:
+        return []
+    end = next((i for i in range(start, len(records)) if _is_notice(records[i], EXECUTION_END_NOTICES)), None)
+    if end is None:
+        return []
+    # 実行完了と同じ時刻のレコードは、時刻順の並びで実行完了の後になっている場合がある
+    while end + 1 < len(records) and records[end + 1]['time'] == records[end]['time']:
+        end += 1
+    return records[start:end + 1]
+
+
+def format_log_records(records: List[Dict]) -> str:
+    """レコードをエディタの表示と同じ「時刻 + レベル + メッセージ」の行にする（1レコード1行）"""
+    lines = []
+    for record in records:
+        time_text = datetime.fromtimestamp(record['time']).strftime('%H:%M:%S')
+        lines.append(f"{time_text}{LEVEL_LABELS.get(record['level'], '情報')}{record['message']}")
+    return '\n'.join(lines)
+
+
+class ExecutionLogCapture:
+    """ページのネットワーク応答から実行ログのレコードを集める
+
+    attach()でページに登録し、実行ボタンを押す直前にstart()を呼ぶ。
+    start()以降の応答に含まれる、start()以降（時計のずれを除く）の時刻のレコードを重複を除いて時刻順に保持し、
+    text()では今回の実行（実行開始〜実行完了）のレコードだけを使う。
+    """
+
+    def __init__(self):
+        self.page = None
+        self.started_at: Optional[float] = None
+        self._records: Dict[tuple, Dict] = {}
+        self._pending = set()
+
+    def attach(self, page) -> None:
+        """ページの応答の監視を開始（同じページには1回だけ登録する）"""
+        if self.page is page:
+            return
+        self.page = page
+        page.on('response', self._on_response)
+
+    def start(self) -> None:
+        """これから実行するテストのレコードの収集を開始"""
+        self.started_at = datetime.now().timestamp()
+        self._records = {}
+
+    @property
+    def records(self) -> List[Dict]:
+        return sorted(self._records.values(), key=lambda r: r['time'])
+
+    def text(self) -> str:
+        """今回の実行のレコードを実行ログのテキストにする（実行完了までのレコードがなければ空文字）"""
+        records = select_current_execution(self.records)
+        if not is_execution_log(records):
+            return ''
+        return format_log_records(records)
+
+    async def flush(self) -> None:
+        """処理中の応答のデコードが終わるまで待つ"""
+        for task in list(self._pending):
+            try:
+                await task
+            except Exception:
+                pass
+
+    def _on_response(self, response) -> None:
+        if self.started_at is None:
+            return
+        try:
+            if response.request.resource_type not in LOG_RESPONSE_TYPES:
+                return
+        except Exception:
+            return
+        if not all(part in response.url for part in LOG_RESPONSE_URL_PARTS):
+            return
+        task = asyncio.ensure_future(self._collect(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _collect(self, response) -> None:
+        try:
+            text = await response.text()
+        except Exception:
+            return  # ページ遷移などで本文を取得できない応答は無視する
+        for payload in decode_rpc_response(text):
+            for record in find_log_records(payload):
+                if record['time'] < self.started_at - CLOCK_SKEW:
+                    continue
+                self._records[(record['time'], record['level'], record['message'])] = record
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+実行ログを解析してテスト結果（成否・エラー・警告・実行されたテスト関数）を判定する
+
+エラー・警告のキーワードと、エラーを意図的に発生させるテストの期待されるエラーのパターンは
+config/expected_error_rules.json で定義する（エラー処理のテストを追加してもコードの変更は不要）。
+ルールは1回だけ読み込んで正規表現にまとめ、ログの行（log_tokenizer.log_linesのレコード単位の行）ごとに
+正規表現を1回ずつ当てて判定する。エラー行が期待されるものかどうかは前後の行（ルールのcontext）に
+パターンがあるかで決まるため、エラー行がある場合だけパターンを含む行の番号を集め、二分探索で範囲内にあるかを調べる。
+手順（extract_steps）はレポートに記録する場合（steps=True）だけ取り出す。
+レポートにはどのルールで判定したかをExpectedErrorRules.info()（ファイルのハッシュなど）で記録する。
+"""
+
+import hashlib
+import json
+import os
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from log_tokenizer import log_lines, record_text, tokenize_log
+from test_discovery import TEST_PREFIX, discover_test_functions
+
+# 期待されるエラーの判定ルール（テストごとのパターン・確認する範囲・成功とみなすマーク）
+RULES_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'expected_error_rules.json')
+RULES_VERSION = 1
+
+# ルールで範囲を省略した場合に確認する範囲（エラー行の何行前から何行後の手前まで）
+DEFAULT_CONTEXT_BEFORE = 5
+DEFAULT_CONTEXT_AFTER = 10
+
+# ログが短すぎる場合は解析しない（「読み込んでいます...」だけのログなど）
+MIN_LOG_LENGTH = 100
+
+# HTMLコンテンツ（window.WIZ_global_data、AF_initDataCallbackなど）の行
+HTML_MARKERS = ['window.WIZ_global_data', 'AF_initDataCallback']
+HTML_LINE_MARKERS = ['AF_initDataCallback', 'window["_F_toggles', 'window.IJ_values']
+
+
+def _compile_any(words: List[str]) -> 're.Pattern':
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+HTML_LINE_RE = _compile_any(HTML_LINE_MARKERS)
+# テストの開始・完了の行の判定に使う語（大文字・小文字を区別しない「test」または「テスト」）
+TEST_WORD_RE = re.compile(r'[Tt][Ee][Ss][Tt]|テスト')
+# テストの番号付きの手順（「1. getUtils()のテスト...」「   1-2. emailが空文字列の場合...」）
+STEP_PATTERN = re.compile(r'^(\d+(?:-\d+)*)\.\s+(.+)$', re.DOTALL)
+# 手順で呼び出す関数（手順の見出しの最初の「名前()」）
+STEP_FUNCTION_PATTERN = re.compile(r'([A-Za-z_$][\w$]*)\(\)')
+# テスト関数の開始・完了のマーカー
+TEST_MARKER_PATTERN = re.compile(r'=== ([A-Za-z_$][\w$]*): (開始|完了) ===')
+# テスト関数名の候補（「test」から始まる英数字の並び。並びの途中の「test」から始まる並びはfind_executed_testsで補う）
+TEST_NAME_RUN_RE = re.compile(f'{re.escape(TEST_PREFIX)}[\\w$]*')
+
+
+class ExpectedErrorRules:
+    """判定ルールのファイルを読み込み、キーワード・パターンを正規表現にまとめたもの
+
+    各ルールは、ログにtestsのいずれかの名前が含まれる場合に適用される。
+    適用されたルールのexpected_patternsがエラー行の前後（context）の行にあればそのエラーは数えず、
+    完了しているのにエラーが残った場合もsuccess_markersがログにあれば成功とする。
+    """
+
+    def __init__(self, path: str = RULES_FILE):
+        self.path = path
+        with open(path, 'rb') as f:
+            raw = f.read()
+        config = json.loads(raw.decode('utf-8'))
+        if config.get('version') != RULES_VERSION:
+            raise ValueError(f'判定ルールのバージョンが対応していません: {config.get("version")}（{path}）')
+        self.version = config['version']
+        self.hash = hashlib.sha1(raw).hexdigest()[:12]
+        self.error_re = _compile_any(config['error_keywords'])
+        self.warning_re = _compile_any(config['warning_keywords'])
+        self.rules = []
+        for rule in config.get('rules', []):
+            context = rule.get('context', {})
+            self.rules.append({
+                'name': rule['name'],
+                'tests': list(rule['tests']),
+                'tests_re': _compile_any(rule['tests']),
+                'expected_re': _compile_any(rule['expected_patterns']) if rule.get('expected_patterns') else None,
+                'before': context.get('before', DEFAULT_CONTEXT_BEFORE),
+                'after': context.get('after', DEFAULT_CONTEXT_AFTER),
+                'success_markers': list(rule.get('success_markers', [])),
+            })
+
+    @property
+    def error_tests(self) -> List[str]:
+        """いずれかのルールの対象のテスト（エラーを意図的に発生させるテスト）"""
+        return [name for rule in self.rules for name in rule['tests']]
+
+    def active_rules(self, text: str) -> List[Dict]:
+        """テキスト（ログ・テスト関数名）に適用されるルール"""
+        return [rule for rule in self.rules if rule['tests_re'].search(text)]
+
+    def info(self) -> Dict:
+        """レポートに記録するルールの識別情報"""
+        return {'file': os.path.basename(self.path), 'version': self.version, 'hash': self.hash,
+                'rules': [rule['name'] for rule in self.rules]}
+
+
+_default_rules: Optional[ExpectedErrorRules] = None
+_default_test_functions: Optional[List[str]] = None
+
+
+def default_rules() -> ExpectedErrorRules:
+    """config/expected_error_rules.json（最初の呼び出し時に1回だけ読み込む）"""
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = ExpectedErrorRules()
+    return _default_rules
+
+
+def default_test_functions() -> List[str]:
+    """tests.gsのテスト関数（最初の呼び出し時に1回だけ検出する）"""
+    global _default_test_functions
+    if _default_test_functions is None:
+        _default_test_functions = discover_test_functions()
+    return _default_test_functions
+
+
+def remove_html_lines(log_content: str) -> str:
+    """DOMから取得したログに混入したページのスクリプト（window.〜）の行を除く"""
+    return '\n'.join(
+        line for line in log_content.split('\n')
+        if line.strip() and not line.strip().startswith('window.') and not HTML_LINE_RE.search(line)
+    )
+
+
+def find_executed_tests(log_content: str, test_functions: List[str]) -> List[str]:
+    """ログに名前が含まれるテスト関数（test_functionsの順）
+
+    部分一致（testAllSheetFunctionsのログにtestAllも含まれる）も従来どおり数える。
+    """
+    runs = set(TEST_NAME_RUN_RE.findall(log_content))
+    for run in list(runs):
+        # 「testAlltestSheet」のように並びの途中から始まるテスト関数名
+        start = run.find(TEST_PREFIX, 1)
+        while start != -1:
+            runs.add(run[start:])
+            start = run.find(TEST_PREFIX, start + 1)
+    lengths = {len(name) for name in test_functions}
+    found = {run[:length] for run in runs for length in lengths}
+    executed = []
+    for name in test_functions:
+        if name.startswith(TEST_PREFIX):
+            if name in found:
+                executed.append(name)
+        elif name in log_content:
+            executed.append(name)
+    return executed
+
+
+def _seconds_of_day(time_text: str) -> int:
+    hours, minutes, seconds = (int(part) for part in time_text.split(':'))
+    return hours * 3600 + minutes * 60 + seconds
+
+
+# 手順の状態を決めるマーク（先にあるものを優先。⚠️は異体字セレクタのない「⚠」も含める）
+STEP_STATUS_MARKS = [('❌', 'failed'), ('⚠', 'warning'), ('✅', 'passed')]
+STEP_STATUS_PRIORITY = {'failed': 0, 'warning': 1, 'passed': 2, 'unknown': 3}
+
+
+def extract_steps(records: List[Dict]) -> List[Dict]:
+    """実行ログのレコードからテストの番号付きの手順を取り出す
+
+    手順の状態は、同じテストの次の手順までの行の❌/⚠️/✅（この順に優先）で決める。
+    時間は手順の行から、同じテストの同じかより上位の次の手順（「1.」に対する「2.」。子の「1-1.」は含める）
+    またはテストの完了のマーカーまでのタイムスタンプの差（秒単位）とする。
+    集約テストの手順で別のテストを呼び出した場合は、呼び出し先のテストの時間も含める。
+    """
+    steps: List[Dict] = []
+    open_steps: Dict[Optional[str], List[Dict]] = {}  # テスト関数 → 時間がまだ決まっていない手順
+    current_step: Dict[Optional[str], Dict] = {}  # テスト関数 → 直近の手順
+    test_stack: List[str] = []
+    last_time = None
+
+    def close_steps(test_function: Optional[str], depth: int, time_text: Optional[str]) -> None:
+        pending = open_steps.get(test_function, [])
+        while pending and pending[-1]['_depth'] >= depth:
+            step = pending.pop()
+            if time_text is not None and step['started_at'] is not None:
+                duration = _seconds_of_day(time_text) - _seconds_of_day(step['started_at'])
+                step['duration'] = float(duration + 24 * 3600 if duration < 0 else duration)
+
+    for record in records:
+        message = record['message']
+        time_text = record.get('time')
+        test_function = test_stack[-1] if test_stack else None
+        marker = TEST_MARKER_PATTERN.search(message) if '===' in message else None
+        stripped = message.lstrip()
+        match = STEP_PATTERN.match(stripped.rstrip()) if not marker and stripped[:1].isdigit() else None
+        if marker and marker.group(2) == '開始':
+            test_stack.append(marker.group(1))
+        elif marker:
+            close_steps(marker.group(1), 0, time_text)
+            current_step.pop(marker.group(1), None)
+            if marker.group(1) in test_stack:
+                del test_stack[test_stack.index(marker.group(1)):]
+        elif match:
+            depth = match.group(1).count('-')
+            close_steps(test_function, depth, time_text)
+            title = match.group(2).strip()
+            function = STEP_FUNCTION_PATTERN.search(title)
+            step = {
+                'number': match.group(1),
+                'title': title,
+                'function': function.group(1) if function else None,
+                'test_function': test_function,
+                'status': 'unknown',
+                'started_at': time_text,
+                'duration': None,
+                '_depth': depth,
+            }
+            steps.append(step)
+            open_steps.setdefault(test_function, []).append(step)
+            current_step[test_function] = step
+        elif test_function in current_step:
+            step = current_step[test_function]
+            status = next((status for mark, status in STEP_STATUS_MARKS if mark in message), 'unknown')
+            if STEP_STATUS_PRIORITY[status] < STEP_STATUS_PRIORITY[step['status']]:
+                step['status'] = status
+        if time_text is not None:
+            last_time = time_text
+    for test_function in list(open_steps):
+        close_steps(test_function, 0, last_time)
+    for step in steps:
+        del step['_depth']
+    return steps
+
+
+def _is_expected_error(i: int, line_count: int, pattern_rules: List[Dict],
+                       expected_lines: List[List[int]]) -> bool:
+    """i行目のエラーの前後（ルールごとの範囲）に期待されるエラーのパターンを含む行があるか"""
+    for rule, positions in zip(pattern_rules, expected_lines):
+        context_start = max(0, i - rule['before'])
+        context_end = min(line_count, i + rule['after'])
+        index = bisect_left(positions, context_start)
+        if index < len(positions) and positions[index] < context_end:
+            return True
+    return False
+
+
+def _has_test_line(lines: List[str], word: str) -> bool:
+    """wordを含むテストの行（「test」「テスト」を含む行）があるか"""
+    return any(TEST_WORD_RE.search(line) for line in lines if word in line)
+
+
+def parse_test_results(log_content: str, test_functions: Optional[List[str]] = None,
+                       rules: Optional[ExpectedErrorRules] = None, steps: bool = False) -> Dict:
+    """実行ログを解析してテスト結果を抽出
+
+    rulesを省略した場合はconfig/expected_error_rules.jsonを使う。
+    steps=Trueの場合はテストの番号付きの手順（extract_steps）もresults['steps']に入れる。
+    """
+    results = {
+        'success': False,
+        'errors': [],
+        'warnings': [],
+        'test_functions_executed': [],
+        'execution_time': None,
+        'steps': [],
+    }
+
+    if not log_content or len(log_content.strip()) < MIN_LOG_LENGTH:
+        return results
+    if rules is None:
+        rules = default_rules()
+
+    # HTMLコンテンツを除外（window.WIZ_global_data、AF_initDataCallbackなど）
+    if any(marker in log_content for marker in HTML_MARKERS):
+        log_content = remove_html_lines(log_content)
+
+    # 改行なしで連結されたログも「時刻 + レベル + メッセージ」のレコード単位の行にする
+    if steps:
+        records = tokenize_log(log_content)
+        lines = [record_text(record) for record in records]
+        # テストの番号付きの手順（手順ごとの状態と時間）
+        results['steps'] = extract_steps(records)
+    else:
+        lines = log_lines(log_content)
+
+    # テスト開始・完了の検出
+    test_started = '開始' in log_content and _has_test_line(lines, '開始')
+    test_completed = '完了' in log_content and _has_test_line(lines, '完了')
+
+    # キーワードがログのどこにもなければ行ごとには探さない
+    error_lines = [i for i, line in enumerate(lines)
+                   if rules.error_re.search(line) and not line.strip().startswith('window.')
+                   ] if rules.error_re.search(log_content) else []
+    results['warnings'] = [line.strip() for line in lines
+                           if rules.warning_re.search(line) and not line.strip().startswith('window.')
+                           ] if rules.warning_re.search(log_content) else []
+
+    # エラーの検出（ただし、テスト内で期待されるエラーは除外）
+    # エラーが期待されるテスト（エラー検出テスト）のログに適用するルール
+    active_rules = rules.active_rules(log_content) if error_lines else []
+    pattern_rules = [rule for rule in active_rules if rule['expected_re'] is not None]
+    # expected_lines[k] = k番目のルールの期待されるエラーのパターンを含む行の番号（昇順）
+    expected_lines = [[i for i, line in enumerate(lines) if rule['expected_re'].search(line)]
+                      for rule in pattern_rules]
+    unexpected_errors = []
+    for i in error_lines:
+        if not _is_expected_error(i, len(lines), pattern_rules, expected_lines):
+            unexpected_errors.append(lines[i].strip())
+    results['errors'] = unexpected_errors
+
+    # 実行されたテスト関数の検出
+    results['test_functions_executed'] = find_executed_tests(
+        log_content, test_functions if test_functions is not None else default_test_functions())
+
+    # 成功の判定（改善版）
+    # 1. テストが完了している
+    # 2. 予期しないエラーがない
+    # 3. 「完了」メッセージが含まれている
+    # 注意: 結果不明（None）も失敗として扱う
+
+    # 「読み込んでいます...」で終わっている場合はログが不完全
+    is_log_incomplete = '読み込んでいます' in log_content and '完了' not in log_content
+
+    if is_log_incomplete:
+        # ログが不完全な場合 → 失敗として扱う
+        results['success'] = False
+        results['error'] = 'ログが不完全（読み込み中で終了）'
+    elif test_completed and len(unexpected_errors) == 0:
+        results['success'] = True
+    elif test_completed and len(unexpected_errors) > 0:
+        # 完了しているが予期しないエラーがある
+        # ただし、エラーテストの場合はルールの成功のマーク（「✅」など）があれば成功と判定
+        results['success'] = any(marker in log_content
+                                 for rule in active_rules for marker in rule['success_markers'])
+    elif '✅' in log_content and '完了' in log_content and len(unexpected_errors) == 0:
+        results['success'] = True
+    elif '❌' in log_content and len(unexpected_errors) > 0 and not test_completed:
+        # 予期しないエラーがあり、テストが完了していない
+        results['success'] = False
+    elif test_started and not test_completed:
+        # テストが開始されたが完了していない → 失敗として扱う
+        results['success'] = False
+        results['error'] = 'テストが完了していない（完了メッセージなし）'
+    else:
+        # 結果不明 → 失敗として扱う
+        results['success'] = False
+        results['error'] = '結果不明'
+
+    return results
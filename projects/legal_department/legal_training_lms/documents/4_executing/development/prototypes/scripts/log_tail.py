@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+実行中のテストの実行ログを1行ずつ受け取る（ライブ表示・fail-fast）
+
+page.expose_bindingでPython側の受け口を公開し、実行ログパネルを監視するMutationObserverを注入する。
+パネルのテキストが増えるたびに増えた部分だけが送られ、「時刻 + レベル」の区切りで1行ずつに分けて
+コンソールとログファイル（logs/playwright_test_<関数>_<時刻>.log）に書き込む。
+実行完了後の最終的なログはrun_all_tests.save_log()が同じファイルに上書きする。
+
+fail-fastを有効にすると「❌」の行を受け取った時点でfailedイベントを立て、
+EditorSession.execute()は実行完了を待たずに実行を停止する（testRebuildDependenciesなどの長いテスト向け）。
+"""
+
+import asyncio
+import re
+from typing import List, Optional
+
+from log_parser import default_rules
+from test_reports import LOG_DIR, create_log_file
+
+BINDING_NAME = '__lmsLogTail'
+
+# DOMの更新が続く間は送信をまとめる（ミリ秒）
+FLUSH_DELAY_MS = 200
+
+# 1行の区切り（エディタの表示は「17:50:50情報メッセージ」が改行なしで連結される）
+ENTRY_BOUNDARY = re.compile(
+    r'(?<!\d)(?=\d{1,2}:\d{2}:\d{2}\s*(?:お知らせ|情報|デバッグ|警告|エラー|Notice|Info|Debug|Warning|Error))'
+)
+
+FAIL_MARK = '❌'
+
+# 監視を開始するJS（{get_text}にパネルのテキストを取得するJSを埋め込む。
+# 同じページで再度呼ぶと前回の監視を止めて基準のテキストを置き換える）
+LOG_TAIL_INSTALL_JS = '''
+    ([binding, baseline, delay]) => {
+        const getText = {get_text};
+        if (window.__lmsLogTailObserver) {
+            window.__lmsLogTailObserver.disconnect();
+        }
+        let sent = baseline || '';
+        let timer = null;
+        const flush = () => {
+            timer = null;
+            const text = getText();
+            if (!text || text === sent) {
+                return;
+            }
+            // パネルが書き換えられた場合（前回の実行ログが消えた場合）は全体を送る
+            window[binding](text.startsWith(sent) ? text.slice(sent.length) : text);
+            sent = text;
+        };
+        const observer = new MutationObserver(() => {
+            if (timer === null) {
+                timer = setTimeout(flush, delay);
+            }
+        });
+        observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+        window.__lmsLogTailObserver = observer;
+        window.__lmsLogTailFlush = flush;
+    }
+'''
+
+LOG_TAIL_STOP_JS = '''
+    () => {
+        if (window.__lmsLogTailFlush) {
+            window.__lmsLogTailFlush();
+        }
+        if (window.__lmsLogTailObserver) {
+            window.__lmsLogTailObserver.disconnect();
+            window.__lmsLogTailObserver = null;
+        }
+    }
+'''
+
+
+def split_entries(text: str) -> List[str]:
+    """「時刻 + レベル」の区切りで行に分ける（区切りの前の断片も1行として返す）"""
+    return [entry.strip() for entry in ENTRY_BOUNDARY.split(text) if entry.strip()]
+
+
+class LogTail:
+    """ページの実行ログパネルを監視し、増えた行をコンソールとログファイルに流す
+
+    ページごとに1つ作成し、テストごとにstart()・stop()を呼ぶ。
+    エディタはログの行を1要素ずつ追加するため、届いたテキストは行の途中で切れていないものとして扱う。
+    """
+
+    def __init__(self, page, panel_text_js: str, echo: bool = True, fail_fast: bool = False,
+                 log_dir: str = LOG_DIR):
+        self.page = page
+        self.install_js = LOG_TAIL_INSTALL_JS.replace('{get_text}', panel_text_js.strip())
+        self.echo = echo
+        self.fail_fast = fail_fast
+        self.log_dir = log_dir
+        self.failed = asyncio.Event()
+        self.failed_line: Optional[str] = None
+        self.log_file: Optional[str] = None
+        self.lines: List[str] = []
+        self.test_function: Optional[str] = None
+        self._exposed = False
+        self._file = None
+        self._write_failed = False
+
+    async def start(self, test_function: str, baseline: str = '') -> None:
+        """テストの実行ログの監視を開始（baselineは実行前のパネルのテキスト）"""
+        self._close_file()
+        self.test_function = test_function
+        self.failed = asyncio.Event()
+        self.failed_line = None
+        self.log_file = None
+        self.lines = []
+        self._write_failed = False
+        if not self._exposed:
+            # expose_bindingはページの遷移後も有効なので1回だけ登録する
+            await self.page.expose_binding(BINDING_NAME, self._on_chunk)
+            self._exposed = True
+        await self.page.evaluate(self.install_js, [BINDING_NAME, baseline, FLUSH_DELAY_MS])
+
+    async def stop(self) -> None:
+        """監視を終了し（未送信の変更は送ってから）、ログファイルを閉じる"""
+        try:
+            await self.page.evaluate(LOG_TAIL_STOP_JS)
+        except Exception:
+            pass  # ページが閉じた・遷移した場合は受け取った分だけを出力する
+        self._close_file()
+
+    def text(self) -> str:
+        """受け取った行（ネットワーク応答・DOMから取得できなかった場合の実行ログ）"""
+        return '\n'.join(self.lines)
+
+    def _on_chunk(self, source, chunk: str) -> None:
+        for entry in split_entries(chunk):
+            self._emit(entry)
+
+    def _emit(self, entry: str) -> None:
+        self.lines.append(entry)
+        if self.echo:
+            print(f"   │ {entry}")
+        self._write(entry)
+        if self.fail_fast and FAIL_MARK in entry and not self._expects_errors():
+            self.failed_line = entry
+            self.failed.set()
+
+    def _expects_errors(self) -> bool:
+        """エラーを意図的に発生させて「❌」を出力することがあるテストか（判定ルールの対象のテストはfail-fastの対象外）"""
+        rules = default_rules()
+        return bool(rules.active_rules(self.test_function or '') or rules.active_rules('\n'.join(self.lines)))
+
+    def _write(self, entry: str) -> None:
+        if self._write_failed:
+            return
+        try:
+            if self._file is None:
+                self.log_file, self._file = create_log_file(self.test_function, self.log_dir)
+            self._file.write(entry + '\n')
+            self._file.flush()
+        except OSError as e:
+            print(f"   ⚠️  実行ログの書き込みに失敗しました: {e}")
+            self._write_failed = True
+            self._close_file()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+実行ログのテキストを「時刻・レベル・メッセージ」のレコードに分ける
+
+エディタのログパネルから取得したテキストは改行なしで連結されている
+（例: 「17:50:49お知らせ実行開始17:50:50情報=== testSheetFunctions: 開始 ===17:50:50情報1. ...」）。
+Logger.getLog()の形式（「[26-01-13 17:50:49:123 JST] メッセージ」）や、1レコード1行のテキストも同じように扱う。
+レコードの先頭（時刻 + レベル）を1つの正規表現で先頭から順に探すだけなので、ログの長さに比例した時間で終わる。
+log_lines()は、すでに1レコード1行になっているテキスト（ネットワーク応答から取得して保存したログなど）と
+タイムスタンプのないテキストをレコードに分けずにそのまま行に分ける（結果はレコードに分けた場合と同じ）。
+
+使い方:
+    python3 scripts/log_tokenizer.py logs/playwright_test_testAll_20260113_182137.log
+"""
+
+import re
+import sys
+from typing import Dict, List
+
+# 英語表示のレベル → エディタの日本語表示
+LEVEL_NAMES = {
+    'Notice': 'お知らせ',
+    'Info': '情報',
+    'Debug': 'デバッグ',
+    'Warning': '警告',
+    'Error': 'エラー',
+}
+
+DEFAULT_LEVEL = '情報'
+
+# レコードの先頭（エディタの「17:50:49お知らせ」またはLogger.getLog()の「[26-01-13 17:50:49:123 JST] 」）
+RECORD_HEAD_PATTERN = re.compile(
+    r'(?<!\d)(?P<time>\d{1,2}:\d{2}:\d{2})\s*'
+    r'(?P<level>お知らせ|情報|デバッグ|警告|エラー|Notice|Info|Debug|Warning|Error)'
+    r'|\[\d{2,4}[-/]\d{1,2}[-/]\d{1,2} (?P<logger_time>\d{1,2}:\d{2}:\d{2})(?::\d{1,3})?(?: [A-Z]{2,5})?\] ?'
+)
+
+# 1レコード1行の形式（record_text()の出力と同じ行）になっていない箇所:
+# エディタの日本語表示の「時刻 + レベル + 空白以外」で始まらない空でない行、末尾の空白、行の途中のレコードの先頭、
+# Logger.getLog()の形式のレコードの先頭
+NON_LINE_FORMAT_PATTERN = re.compile(
+    r'^(?!\d{1,2}:\d{2}:\d{2}(?:お知らせ|情報|デバッグ|警告|エラー)\S|$)'
+    r'|[^\S\n]$'
+    r'|(?<=.)(?<!\d)\d{1,2}:\d{2}:\d{2}\s*(?:お知らせ|情報|デバッグ|警告|エラー|Notice|Info|Debug|Warning|Error)'
+    r'|\[\d{2,4}[-/]\d{1,2}[-/]\d{1,2} \d{1,2}:\d{2}:\d{2}',
+    re.MULTILINE
+)
+
+
+def tokenize_log(text: str) -> List[Dict]:
+    """実行ログをレコードのリストにする
+
+    Returns:
+        [{'time': '17:50:49', 'level': 'お知らせ', 'message': '実行開始', 'offset': 0}, ...]
+        最初のレコードより前のテキストはtime・levelがNoneのレコードにする。
+        レコードの先頭が1つもないテキストは、空でない行をそれぞれtime・levelがNoneのレコードにする。
+    """
+    text = text or ''
+    records: List[Dict] = []
+    current = None
+    position = 0
+    for match in RECORD_HEAD_PATTERN.finditer(text):
+        _append(records, current, text[position:match.start()], position)
+        if match.group('time'):
+            level = match.group('level')
+            current = {'time': match.group('time'), 'level': LEVEL_NAMES.get(level, level)}
+        else:
+            current = {'time': match.group('logger_time'), 'level': DEFAULT_LEVEL}
+        current['offset'] = match.start()
+        position = match.end()
+
+    if current is None:
+        # タイムスタンプのないテキスト（手で作成したログなど）は行ごとに分ける
+        offset = 0
+        for line in text.split('\n'):
+            if line.strip():
+                records.append({'time': None, 'level': None, 'message': line.strip(), 'offset': offset})
+            offset += len(line) + 1
+        return records
+
+    _append(records, current, text[position:], position)
+    return records
+
+
+def _append(records: List[Dict], current, message: str, position: int) -> None:
+    """直前のレコード（最初のレコードより前のテキストの場合はcurrent=None）にメッセージを設定して追加"""
+    message = message.strip()
+    if current is None:
+        if message:
+            records.append({'time': None, 'level': None, 'message': message, 'offset': 0})
+        return
+    current['message'] = message
+    records.append(current)
+
+
+def record_text(record: Dict) -> str:
+    """レコードをエディタの表示と同じ「時刻 + レベル + メッセージ」の1行にする"""
+    if record.get('time') is None:
+        return record['message']
+    return f"{record['time']}{record['level']}{record['message']}"
+
+
+def log_lines(text: str) -> List[str]:
+    """実行ログを1レコード1行の行のリストにする（ログの解析で行の代わりに使う）"""
+    text = text or ''
+    if not NON_LINE_FORMAT_PATTERN.search(text):
+        # すでに1レコード1行（空行はレコードにならない）
+        return [line for line in text.split('\n') if line]
+    if not RECORD_HEAD_PATTERN.search(text):
+        # タイムスタンプのないテキストは空でない行ごと
+        return [line.strip() for line in text.split('\n') if line.strip()]
+    return [record_text(record) for record in tokenize_log(text)]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("使い方: python3 scripts/log_tokenizer.py <ログファイル>")
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        for record in tokenize_log(f.read()):
+            print(f"{record['time'] or '--:--:--'}  {record['level'] or '':<4}  {record['message']}")
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+保存済みの実行ログ（logs/playwright_test_*.log）を現在の判定ロジックで解析し直す
+
+ログは書き込まれた時点で1回だけ判定されるため、判定ロジックや config/expected_error_rules.json を
+変更すると過去の判定が古くなる。このスクリプトはすべてのログをプロセスプールで並列に解析し、
+判定結果を logs/results_index.json（ログファイル名 → 判定）に書き込み、判定が変わった実行を表示する。
+以前の判定は前回のインデックス、なければそのログを記録したレポート（test_report_*.json など）から取る。
+ブラウザでテストを再実行せずに、判定ロジックの調整の影響を確認できる。
+
+使い方:
+    python3 scripts/reparse_logs.py                             # すべてのログを解析し直してインデックスを更新
+    python3 scripts/reparse_logs.py --rules my_rules.json --dry-run   # 別の判定ルールでの変化だけを確認
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from datetime import datetime
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(__file__))
+from log_parser import RULES_FILE, ExpectedErrorRules, parse_test_results
+from test_discovery import discover_test_functions
+from test_reports import LOG_DIR, LOG_FILE_PATTERN, REPORT_PREFIXES, load_report
+
+RESULTS_INDEX_FILE = os.path.join(LOG_DIR, 'results_index.json')
+RESULTS_INDEX_VERSION = 1
+
+# 1回にワーカーへ渡すログの数（小さなログが数千件ある場合のプロセス間通信を減らす）
+CHUNK_SIZE = 16
+
+# ワーカープロセスごとに1回だけ読み込む判定ルールとテスト関数
+_worker_rules: Optional[ExpectedErrorRules] = None
+_worker_test_functions: List[str] = []
+
+
+def find_logs(log_dir: str = LOG_DIR) -> List[Tuple[str, str, str]]:
+    """保存済みの実行ログ [(パス, テスト関数, 実行日時 YYYYMMDD_HHMMSS)]（実行日時の順）"""
+    logs = []
+    for path in glob.glob(os.path.join(log_dir, 'playwright_test_*.log')):
+        match = LOG_FILE_PATTERN.match(os.path.basename(path))
+        if match:
+            logs.append((int(match.group(3) or 1), (path, match.group(1), match.group(2))))
+    return [entry for _, entry in sorted(logs, key=lambda item: (item[1][2], item[1][1], item[0]))]
+
+
+def load_results_index(path: str = RESULTS_INDEX_FILE) -> Dict[str, Dict]:
+    """前回のインデックス（ログファイル名 → 判定）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') == RESULTS_INDEX_VERSION:
+            return index.get('logs', {})
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def load_report_verdicts(log_dir: str = LOG_DIR) -> Dict[str, Dict]:
+    """レポートに記録された判定（ログファイル名 → 判定）。同じログが複数のレポートにある場合は新しいレポートを使う"""
+    report_files = []
+    for prefix in REPORT_PREFIXES:
+        report_files.extend(glob.glob(os.path.join(log_dir, f'{prefix}_*.json')))
+    verdicts = {}
+    for path in sorted(report_files, key=os.path.basename):
+        try:
+            report = load_report(path)
+        except (OSError, ValueError):
+            continue
+        for result in report.get('results', []):
+            if isinstance(result, dict) and result.get('log_file'):
+                verdicts[os.path.basename(result['log_file'])] = {
+                    'success': result.get('success'),
+                    'source': os.path.basename(path),
+                }
+    return verdicts
+
+
+def _init_worker(rules_file: str, test_functions: List[str]) -> None:
+    global _worker_rules, _worker_test_functions
+    _worker_rules = ExpectedErrorRules(rules_file)
+    _worker_test_functions = test_functions
+
+
+def judge_log(entry: Tuple[str, str, str]) -> Dict:
+    """ワーカーで1つのログを解析して判定を返す"""
+    path, test_function, run_at = entry
+    verdict = {'log_file': os.path.basename(path), 'test_function': test_function, 'run_at': run_at}
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            log_content = f.read()
+    except OSError as e:
+        verdict['success'] = None
+        verdict['error'] = f'ログを読み込めません: {e}'
+        return verdict
+    result = parse_test_results(log_content, _worker_test_functions, _worker_rules)
+    verdict['success'] = result['success']
+    if result.get('error'):
+        verdict['error'] = result['error']
+    verdict['errors'] = result['errors'][:5]
+    verdict['error_count'] = len(result['errors'])
+    verdict['warning_count'] = len(result['warnings'])
+    return verdict
+
+
+def reparse_logs(logs: List[Tuple[str, str, str]], rules_file: str = RULES_FILE,
+                 workers: Optional[int] = None) -> List[Dict]:
+    """ログをプロセスプールで解析し直す（ログの順に返す）"""
+    test_functions = discover_test_functions()
+    if workers == 1 or len(logs) <= CHUNK_SIZE:
+        _init_worker(rules_file, test_functions)
+        return [judge_log(entry) for entry in logs]
+    with Pool(processes=workers, initializer=_init_worker, initargs=(rules_file, test_functions)) as pool:
+        return list(pool.imap(judge_log, logs, chunksize=CHUNK_SIZE))
+
+
+def find_changes(verdicts: List[Dict], previous: Dict[str, Dict]) -> List[Dict]:
+    """以前の判定から成否が変わったログ"""
+    changes = []
+    for verdict in verdicts:
+        before = previous.get(verdict['log_file'])
+        if before is not None and before.get('success') != verdict['success']:
+            changes.append({**verdict, 'previous_success': before.get('success')})
+    return changes
+
+
+def save_results_index(verdicts: List[Dict], rules: ExpectedErrorRules, path: str = RESULTS_INDEX_FILE) -> None:
+    """判定をインデックスに保存"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': RESULTS_INDEX_VERSION,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+            'expected_error_rules': rules.info(),
+            'logs': {v['log_file']: {**{k: val for k, val in v.items() if k != 'log_file'},
+                                     'source': 'reparse', 'rules_hash': rules.hash}
+                     for v in verdicts},
+        }, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def verdict_label(success) -> str:
+    """判定の表示名（結果不明のNoneは「不明」）"""
+    return "成功" if success == True else ("失敗" if success == False else "不明")
+
+
+def print_changes(changes: List[Dict], total: int) -> None:
+    """判定が変わった実行を表示"""
+    if not changes:
+        print(f"✅ 判定が変わったログはありません（{total}件）")
+        return
+    print(f"🔁 判定が変わったログ: {len(changes)}/{total}件")
+    for change in changes:
+        run_at = datetime.strptime(change['run_at'], '%Y%m%d_%H%M%S').strftime('%Y-%m-%d %H:%M:%S')
+        reason = f"（{change['error']}）" if change.get('error') else ""
+        print(f"   {change['test_function']} {run_at}: "
+              f"{verdict_label(change['previous_success'])} → {verdict_label(change['success'])}{reason}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='保存済みの実行ログを現在の判定ロジックで解析し直します')
+    parser.add_argument('--rules', default=RULES_FILE, metavar='PATH',
+                        help='判定ルールのファイル（デフォルト: config/expected_error_rules.json）')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='解析するプロセス数（デフォルト: CPUのコア数）')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='判定が変わったログを表示するだけで、インデックスを更新しない')
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers は1以上を指定してください')
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logs = find_logs()
+    if not logs:
+        print("📭 logs/に実行ログ（playwright_test_*.log）がありません")
+        sys.exit(0)
+    rules = ExpectedErrorRules(args.rules)
+    previous = {**load_report_verdicts(), **load_results_index()}
+    started = datetime.now()
+    print(f"🔍 {len(logs)}件のログを解析しています...（判定ルール {os.path.basename(args.rules)} {rules.hash}）")
+    verdicts = reparse_logs(logs, args.rules, args.workers)
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"   {elapsed:.1f}秒で解析しました")
+    print_changes(find_changes(verdicts, previous), len(verdicts))
+    if not args.dry_run:
+        save_results_index(verdicts, rules)
+        print(f"📝 判定を保存しました: {RESULTS_INDEX_FILE}")
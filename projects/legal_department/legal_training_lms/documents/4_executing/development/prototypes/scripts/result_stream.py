@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+テスト実行中の結果イベントの記録（NDJSON）とJUnit XMLへの変換
+
+run_all_tests.pyは各テストの開始・フェーズごとの時間・結果を終わった時点で
+logs/test_events_YYYYMMDD_HHMMSS.ndjson に1行ずつ追記する。
+途中で実行が中断しても終わったテストの結果は残り、--resumeで成功済みのテストをスキップして再開できる。
+
+イベント（1行1つのJSON、共通項目: event, time）:
+- run_start: test_functions（対象のテスト関数）, pending（今回実行するテスト関数）など
+- test_start: test_function, worker, backend
+- phase: test_function, phase（execute / parse / retry_wait）, seconds
+- test_result: test_function, result（レポートのresultsと同じ形式）
+- run_end: summary, report_file
+
+使い方:
+    python3 scripts/result_stream.py                      # 最新のイベントからJUnit XMLを作成
+    python3 scripts/result_stream.py logs/test_events_20260113_182137.ndjson --junit junit.xml
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Dict, List, Optional
+
+LOG_DIR = os.path.join(os.path.dirname(__file__), '..', 'logs')
+
+EVENTS_PREFIX = 'test_events'
+
+
+def find_latest_stream(log_dir: str = LOG_DIR) -> Optional[str]:
+    """最新のイベントファイルを探す（ファイル名のタイムスタンプで比較）"""
+    candidates = glob.glob(os.path.join(log_dir, f'{EVENTS_PREFIX}_*.ndjson'))
+    return max(candidates, key=lambda path: (os.path.basename(path), os.path.getmtime(path))) if candidates else None
+
+
+def read_events(path: str) -> List[Dict]:
+    """イベントを読み込む（書き込み途中で中断した最後の行などの壊れた行は無視する）"""
+    events = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict):
+                    events.append(event)
+    except OSError:
+        pass
+    return events
+
+
+def latest_results(events: List[Dict]) -> Dict[str, Dict]:
+    """テスト関数 → 最後に記録された結果"""
+    results = {}
+    for event in events:
+        if event.get('event') == 'test_result' and event.get('test_function'):
+            results[event['test_function']] = event.get('result') or {}
+    return results
+
+
+def passed_results(events: List[Dict]) -> Dict[str, Dict]:
+    """最後の結果が成功のテスト関数 → 結果（--resumeでスキップするテスト）"""
+    return {t: r for t, r in latest_results(events).items() if r.get('success') == True}
+
+
+class ResultStream:
+    """イベントをNDJSONファイルに追記する（既存のファイルを指定した場合は続きに追記）"""
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            path = os.path.join(LOG_DIR, f'{EVENTS_PREFIX}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.ndjson')
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def emit(self, event: str, **fields) -> None:
+        """イベントを1行追記（ダッシュボードなどからすぐに読めるように毎回フラッシュする）"""
+        record = {'event': event, 'time': datetime.now().isoformat(timespec='seconds'), **fields}
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        self._file.flush()
+
+    def run_start(self, test_functions: List[str], pending: List[str], **info) -> None:
+        self.emit('run_start', test_functions=test_functions, pending=pending, **info)
+
+    def test_start(self, test_function: str, **info) -> None:
+        self.emit('test_start', test_function=test_function, **info)
+
+    def test_result(self, result: Dict) -> None:
+        """フェーズごとの時間とテスト結果を記録"""
+        test_function = result.get('test_function')
+        for phase, seconds in (result.get('phases') or {}).items():
+            self.emit('phase', test_function=test_function, phase=phase, seconds=seconds)
+        self.emit('test_result', test_function=test_function, result=result)
+
+    def run_end(self, summary: Dict, **info) -> None:
+        self.emit('run_end', summary=summary, **info)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def build_junit_xml(events: List[Dict], suite_name: str = 'tests.gs') -> ET.ElementTree:
+    """イベントからJUnit XMLを作成
+
+    対象のテスト関数のうち結果が記録されていないもの（実行が中断された場合など）はskippedとして出力する。
+    """
+    test_functions: List[str] = []
+    timestamp = None
+    for event in events:
+        if event.get('event') == 'run_start':
+            timestamp = timestamp or event.get('time')
+            for test_function in event.get('test_functions', []):
+                if test_function not in test_functions:
+                    test_functions.append(test_function)
+    results = latest_results(events)
+    test_functions.extend(t for t in results if t not in test_functions)
+
+    suite = ET.Element('testsuite', name=suite_name, tests=str(len(test_functions)))
+    if timestamp:
+        suite.set('timestamp', timestamp)
+    failures = skipped = 0
+    total_time = 0.0
+    for test_function in test_functions:
+        case = ET.SubElement(suite, 'testcase', name=test_function, classname=suite_name)
+        result = results.get(test_function)
+        if result is None or result.get('skipped'):
+            skipped += 1
+            message = result.get('error') if result else '結果なし（実行が中断されました）'
+            ET.SubElement(case, 'skipped', message=message or 'スキップ')
+            continue
+        seconds = result.get('wall_time') or result.get('execution_time') or 0
+        total_time += seconds
+        case.set('time', f'{seconds:.1f}')
+        if result.get('success') != True:
+            failures += 1
+            errors = [str(e) for e in result.get('errors') or []]
+            message = result.get('error') or (errors[0] if errors else '結果不明')
+            failure = ET.SubElement(case, 'failure', message=str(message)[:200],
+                                    type=result.get('failure_category') or 'test')
+            failure.text = '\n'.join(errors[:20]) or str(message)
+        if result.get('log_file'):
+            ET.SubElement(case, 'system-out').text = result['log_file']
+    suite.set('failures', str(failures))
+    suite.set('errors', '0')
+    suite.set('skipped', str(skipped))
+    suite.set('time', f'{total_time:.1f}')
+    return ET.ElementTree(suite)
+
+
+def write_junit_xml(stream_file: str, output_file: Optional[str] = None) -> str:
+    """イベントファイルからJUnit XMLを書き出す（省略時はイベントファイルと同じ名前の.xml）"""
+    output_file = output_file or os.path.splitext(stream_file)[0] + '.xml'
+    tree = build_junit_xml(read_events(stream_file))
+    if hasattr(ET, 'indent'):
+        ET.indent(tree)
+    tree.write(output_file, encoding='utf-8', xml_declaration=True)
+    return output_file
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='テスト結果のイベント（NDJSON）からJUnit XMLを作成します')
+    parser.add_argument('stream', nargs='?',
+                        help='イベントファイル（デフォルト: logs/の最新のtest_events_*.ndjson）')
+    parser.add_argument('--junit', metavar='PATH',
+                        help='出力するJUnit XML（デフォルト: イベントファイルと同じ名前の.xml）')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    stream_file = args.stream or find_latest_stream()
+    if not stream_file:
+        print("❌ logs/にテスト結果のイベントファイルが見つかりません")
+        sys.exit(1)
+    print(f"📝 JUnit XMLを保存しました: {write_junit_xml(stream_file, args.junit)}")
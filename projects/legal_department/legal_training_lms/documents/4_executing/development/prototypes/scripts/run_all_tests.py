@@ -4,821 +4,885 @@
 実行ログを取得・解析して、不具合を特定する
 """
 
+import argparse
 import asyncio
+import hashlib
 import sys
+import time
 from playwright.async_api import async_playwright
 import os
 import re
 import json
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
-
-SPREADSHEET_SCRIPT_URL = "https://script.google.com/u/0/home/projects/1DiZUSkJU_Z4Yc0bBcNgOUH3iqHux8xnSS7qILL5YZMfKgw86QeMvx0S-/edit"
-
-# すべてのテスト関数のリスト（tests.gsから抽出）
-ALL_TEST_FUNCTIONS = [
-    'testSheetFunctions',
-    'testCancelReservation',
-    'testChangeReservation',
-    'testMarkAttendeeAsReserved',
-    'testMarkAttendeeAsUnreserved',
-    'testAllSheetFunctions',
-    'testRefreshAttendeeStatus',
-    'testHandleReservationFormSubmit',
-    'testOnCreatingSchedule',
-    'testOnDashboardAction',
-    'testEditHandler',
-    'testAllUntestedFunctions',
-    'testAll',
-    'testEnhancedFunctions',
-    'testCalendarEnhancedFunctions',
-    'testReservationChangeFunctions',
-    'testEventCapacityBoundary',
-    'testChangeDeadlineBoundary',
-    'testChangeLimitBoundary',
-    'testInvalidInputs',
-    'testDataInconsistency',
-    'testErrorHandling',
-    'testAllBoundaryAndEdgeCases',
-    'testRebuildDependencies',
-    'testGetReservedCountForGroupAndCourse',
-    'testGetCourseNumberFromCourseListByCourseName',
-    'testUpdateDashboardAfterReservation',
-    'testDeleteCalendarEvent',
-    'testSyncCalendarOnReservationChange',
-    'testSendReservationConfirmationEmail',
-    'testSendReservationChangeEmail',
-    'testSendCancellationEmail',
-    'testAllNewFunctions',
-]
-
-def save_log(test_function: str, log_content: str) -> str:
-    """ログをファイルに保存"""
-    log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    log_file = os.path.join(log_dir, f'playwright_test_{test_function}_{timestamp}.log')
-    
-    with open(log_file, 'w', encoding='utf-8') as f:
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(__file__))
+from browser_profile import is_headed, launch_context
+from duration_store import TIMEOUT_MARGIN, TIMEOUT_PERCENTILE, DurationStore, measure_log_duration, percentile
+from editor_session import EditorSession
+from failure_policy import FAILURE_LABELS, RetryPolicy, classify_failure
+from flakiness import FlakinessStore, print_flakiness, summarize_runs
+from log_parser import default_rules, parse_test_results
+from result_stream import ResultStream, find_latest_stream, passed_results, read_events
+from test_discovery import discover_test_functions
+from test_reports import create_log_file, load_report, merge_shard_results
+from gas_index import (
+    build_call_graph,
+    load_gs_functions,
+    plan_test_execution,
+    reachable_functions,
+    select_tests_for_changes,
+)
+from execution_backends import (
+    BACKEND_CHOICES,
+    ApiBackend,
+    ExecutionBackend,
+    PlaywrightBackend,
+    load_api_credentials,
+    resolve_backend_name,
+)
+
+# すべてのテスト関数（tests.gsのトップレベルの function test* を宣言順に自動検出）
+ALL_TEST_FUNCTIONS = discover_test_functions()
+
+# 実行完了待ちの上限（秒）。実行時間の履歴がないテストに使用する（--timeoutで全テスト共通の値を指定可能）
+DEFAULT_TEST_TIMEOUT = 300
+# 1回の実行全体でのリトライ回数の上限（一時的なエラー・実行環境のエラーのみリトライする）
+DEFAULT_RETRY_BUDGET = 10
+# 実行時間の履歴がまったくない場合に時間予算の見積もりに使う1実行あたりの秒数
+DEFAULT_BUDGET_ESTIMATE = 60
+
+BUDGET_SKIP_REASON = '時間予算を超えるためスキップ'
+
+DURATION_UNITS = {'h': 3600, 'm': 60, 's': 1, '': 1}
+
+def save_log(test_function: str, log_content: str, log_file: Optional[str] = None) -> str:
+    """ログをファイルに保存（log_fileを指定した場合はライブ表示で書き込んでいたファイルを上書き）"""
+    if log_file is None:
+        log_file, f = create_log_file(test_function)
+    else:
+        f = open(log_file, 'w', encoding='utf-8')
+    
+    with f:
         f.write(log_content)
     
     return log_file
 
-def parse_test_results(log_content: str) -> Dict:
-    """実行ログを解析してテスト結果を抽出"""
-    results = {
-        'success': False,
-        'errors': [],
-        'warnings': [],
-        'test_functions_executed': [],
-        'execution_time': None,
-    }
+def resolve_timeout(test_function: str, timeout: Optional[float] = None,
+                    durations: Optional[DurationStore] = None) -> float:
+    """テスト関数ごとの実行完了待ちの上限秒数（指定がなければ実行時間の履歴から決定）"""
+    if timeout is not None:
+        return timeout
+    if durations is not None:
+        suggested = durations.suggest_timeout(test_function)
+        if suggested is not None:
+            return suggested
+    return DEFAULT_TEST_TIMEOUT
+
+def skipped_result(test_function: str, reason: str = BUDGET_SKIP_REASON) -> Dict:
+    """実行しなかったテストの結果（成功・失敗には数えない）"""
+    return {'success': None, 'skipped': True, 'test_function': test_function, 'error': reason}
+
+def finalize_execution(test_function: str, execution: Dict) -> Dict:
+    """バックエンドの実行結果（実行ログ）を保存・解析してテスト結果にする"""
+    log_content = execution.get('log_content') or ''
+    live_log_file = execution.get('live_log_file')
     
-    if not log_content or len(log_content.strip()) < 100:
-        return results
-    
-    # HTMLコンテンツを除外（window.WIZ_global_data、AF_initDataCallbackなど）
-    if 'window.WIZ_global_data' in log_content or 'AF_initDataCallback' in log_content:
-        # HTML部分を除去
-        lines_clean = []
-        for line in log_content.split('\n'):
-            if (not line.strip().startswith('window.') and 
-                'AF_initDataCallback' not in line and
-                'window["_F_toggles' not in line and
-                'window.IJ_values' not in line and
-                len(line.strip()) > 0):
-                lines_clean.append(line)
-        log_content = '\n'.join(lines_clean)
-    
-    lines = log_content.split('\n')
-    
-    # テスト完了の検出（重要：テストが正常に完了したかどうかを判定）
-    test_completed = False
-    test_started = False
-    for line in lines:
-        # テスト開始の検出
-        if '開始' in line and ('test' in line.lower() or 'テスト' in line):
-            test_started = True
-        # テスト完了の検出
-        if '完了' in line and ('test' in line.lower() or 'テスト' in line or '=== test' in line):
-            test_completed = True
-            # 「完了」の前に「エラー」がないか確認
-            if 'エラーが発生しました' not in line and 'Exception' not in line:
-                # 正常に完了したと判定
-                pass
-    
-    # エラーの検出（ただし、テスト内で期待されるエラーは除外）
-    unexpected_errors = []
-    for i, line in enumerate(lines):
-        if any(keyword in line for keyword in ['❌', 'エラー', 'Error', 'Exception', '失敗', 'Failed']):
-            if line.strip() and not line.strip().startswith('window.'):
-                # 次の数行を確認して、エラーが期待されるものかどうかを判定
-                is_expected_error = False
-                # エラーが期待されるテスト（エラー検出テスト）の場合
-                if any(test_name in log_content for test_name in [
-                    'testInvalidInputs', 'testErrorHandling', 'testDataInconsistency',
-                    'testAllBoundaryAndEdgeCases'
-                ]):
-                    # エラーメッセージの前後を広く確認（最大10行前後）
-                    context_start = max(0, i-5)
-                    context_end = min(len(lines), i+10)
-                    context_lines = lines[context_start:context_end]
-                    context_text = ' '.join(context_lines)
-                    
-                    # 期待されるエラーのパターンをチェック
-                    if ('期待値通り' in context_text or 
-                        '適切にエラーを返しています' in context_text or 
-                        'クラッシュしないことを確認' in context_text or
-                        'エラー時にnullを返して' in context_text or
-                        'エラー時にfalseを返して' in context_text or
-                        'エラー時にisValid=falseを返して' in context_text or
-                        '✅' in context_text):  # ✅マークが含まれている場合は成功
-                        is_expected_error = True
-                    
-                    # testErrorHandlingの場合、特に注意深く判定
-                    if 'testErrorHandling' in log_content:
-                        # 「✅ エラー時に...」というパターンを探す
-                        if any('✅' in l and ('エラー時に' in l or 'クラッシュしない' in l) 
-                               for l in context_lines):
-                            is_expected_error = True
-                
-                if not is_expected_error:
-                    unexpected_errors.append(line.strip())
-    
-    results['errors'] = unexpected_errors
-    
-    # 警告の検出
-    for line in lines:
-        if '⚠️' in line or '警告' in line or 'Warning' in line:
-            if line.strip() and not line.strip().startswith('window.'):
-                results['warnings'].append(line.strip())
-    
-    # 実行されたテスト関数の検出
-    for func_name in ALL_TEST_FUNCTIONS:
-        if func_name in log_content:
-            results['test_functions_executed'].append(func_name)
-    
-    # 成功の判定（改善版）
-    # 1. テストが完了している
-    # 2. 予期しないエラーがない
-    # 3. 「完了」メッセージが含まれている
-    # 注意: 結果不明（None）も失敗として扱う
-    
-    # 「読み込んでいます...」で終わっている場合はログが不完全
-    is_log_incomplete = '読み込んでいます' in log_content and '完了' not in log_content
-    
-    # testErrorHandlingやtestAllBoundaryAndEdgeCasesの場合、特別な判定
-    is_error_test = any(test_name in log_content for test_name in [
-        'testErrorHandling', 'testAllBoundaryAndEdgeCases', 'testInvalidInputs', 'testDataInconsistency'
-    ])
-    
-    if is_log_incomplete:
-        # ログが不完全な場合 → 失敗として扱う
-        results['success'] = False
-        if not results.get('error'):
-            results['error'] = 'ログが不完全（読み込み中で終了）'
-    elif test_completed and len(unexpected_errors) == 0:
-        results['success'] = True
-    elif test_completed and len(unexpected_errors) > 0:
-        # 完了しているが予期しないエラーがある
-        # ただし、エラーテストの場合は「✅」マークがあれば成功と判定
-        if is_error_test and '✅' in log_content:
-            # エラーテストで「✅」マークがある場合は成功
-            results['success'] = True
-        else:
-            results['success'] = False
-    elif '✅' in log_content and '完了' in log_content and len(unexpected_errors) == 0:
-        results['success'] = True
-    elif is_error_test and '✅' in log_content and test_completed:
-        # エラーテストで「✅」マークがあり、完了している場合は成功
-        results['success'] = True
-    elif '❌' in log_content and len(unexpected_errors) > 0 and not test_completed:
-        # 予期しないエラーがあり、テストが完了していない
-        results['success'] = False
-    elif test_started and not test_completed:
-        # テストが開始されたが完了していない → 失敗として扱う
-        results['success'] = False
-        if not results.get('error'):
-            results['error'] = 'テストが完了していない（完了メッセージなし）'
+    if execution.get('error'):
+        # 実行前の失敗・タイムアウト（取得できたログは保存しておく）
+        result = {'success': False, 'test_function': test_function, 'error': execution['error']}
+        if log_content.strip():
+            result['log_file'] = save_log(test_function, log_content, live_log_file)
+    elif log_content.strip():
+        # ログをファイルに保存
+        log_file = save_log(test_function, log_content, live_log_file)
+        
+        # 実行結果を解析
+        result = parse_test_results(log_content, steps=True)
+        result['log_file'] = log_file
+        result['test_function'] = test_function
+        result['execution_time'] = measure_log_duration(log_content)
     else:
-        # 結果不明 → 失敗として扱う
-        results['success'] = False
-        if not results.get('error'):
-            results['error'] = '結果不明'
+        print("   ⚠️  実行ログを取得できませんでした")
+        # 結果不明も失敗として扱う
+        result = {'success': False, 'test_function': test_function, 'error': 'ログ取得失敗'}
     
-    return results
+    for key in ('backend', 'screenshot', 'timed_out', 'not_started', 'log_source', 'fail_fast'):
+        if execution.get(key):
+            result[key] = execution[key]
+    return result
 
-async def extract_execution_logs(page) -> str:
-    """実行ログを抽出（改善版）"""
-    # より確実な方法で実行ログを取得
-    log_content = await page.evaluate('''
-        () => {
-            // 方法1: 実行ログパネル内のテキスト要素を探す
-            const logPanelSelectors = [
-                '[class*="log-panel"]',
-                '[class*="execution-log"]',
-                '[aria-label*="実行ログ"]',
-                '[aria-label*="Execution log"]',
-                '[role="dialog"]',
-                '[role="complementary"]'
-            ];
-            
-            let logText = '';
-            let maxLength = 0;
-            
-            // 実行ログパネル内の要素を探す
-            for (const panelSelector of logPanelSelectors) {
-                try {
-                    const panels = document.querySelectorAll(panelSelector);
-                    for (const panel of panels) {
-                        const textElements = panel.querySelectorAll('pre, code, textarea, [role="textbox"], [role="log"], div');
-                        for (const el of textElements) {
-                            const text = el.textContent || el.innerText || '';
-                            // window.WIZ_global_dataを含むものは除外
-                            if (text.length > maxLength && 
-                                text.length > 50 &&
-                                !text.includes('window.WIZ_global_data') &&
-                                !text.includes('AF_initDataCallback') &&
-                                (text.includes('test') ||
-                                 text.includes('開始') ||
-                                 text.includes('完了') ||
-                                 text.includes('✅') ||
-                                 text.includes('❌') ||
-                                 text.includes('Logger') ||
-                                 text.includes('エラー'))) {
-                                logText = text;
-                                maxLength = text.length;
-                            }
-                        }
-                    }
-                } catch (e) {}
-            }
-            
-            // 方法2: 通常のログ要素を探す
-            if (!logText || logText.length < 100) {
-                const logSelectors = [
-                    '[class*="log"]',
-                    '[class*="execution"]',
-                    '[aria-label*="ログ"]',
-                    '[aria-label*="log"]',
-                    '[role="log"]',
-                    '[role="textbox"][readonly]',
-                    'pre',
-                    'code',
-                    'textarea[readonly]'
-                ];
-                
-                for (const selector of logSelectors) {
-                    try {
-                        const elements = document.querySelectorAll(selector);
-                        for (const el of elements) {
-                            const text = el.textContent || el.innerText || '';
-                            if (text.length > maxLength && 
-                                text.length > 50 &&
-                                !text.includes('window.WIZ_global_data') &&
-                                !text.includes('AF_initDataCallback') &&
-                                (text.includes('test') ||
-                                 text.includes('開始') ||
-                                 text.includes('完了') ||
-                                 text.includes('✅') ||
-                                 text.includes('❌'))) {
-                                logText = text;
-                                maxLength = text.length;
-                            }
-                        }
-                    } catch (e) {}
-                }
-            }
-            
-            // 方法3: すべての要素を確認（最後の手段）
-            if (!logText || logText.length < 100) {
-                const allElements = document.querySelectorAll('pre, code, textarea, [role="textbox"]');
-                for (const el of allElements) {
-                    const text = el.textContent || el.innerText || '';
-                    if (text.length > 200 && 
-                        !text.includes('window.WIZ_global_data') &&
-                        !text.includes('AF_initDataCallback') &&
-                        (text.includes('test') ||
-                         text.includes('開始') ||
-                         text.includes('完了') ||
-                         text.includes('✅') ||
-                         text.includes('❌'))) {
-                        logText = text;
-                        break;
-                    }
-                }
-            }
-            
-            return logText || '';
-        }
-    ''')
+async def run_test_function(context, test_function: str, page=None, timeout: Optional[float] = None,
+                            session: Optional[EditorSession] = None) -> Dict:
+    """テスト関数をApps Scriptエディタで実行
     
-    return log_content
+    sessionを渡した場合は読み込み済みのエディタを再利用する。
+    省略した場合はpage（省略時はコンテキストの最初のページ）で新しいセッションを作成する。
+    """
+    if session is None:
+        if page is None:
+            pages = context.pages
+            page = pages[0] if pages else await context.new_page()
+        session = EditorSession(page)
+    return await run_with_backend(PlaywrightBackend(session), test_function, timeout)
 
-async def run_test_function(context, test_function: str) -> Dict:
-    """テスト関数を実行"""
-    pages = context.pages
-    page = pages[0] if pages else await context.new_page()
+async def run_with_backend(backend: ExecutionBackend, test_function: str, timeout: Optional[float] = None,
+                           deadline: Optional[float] = None) -> Dict:
+    """バックエンドでテスト関数を実行して結果を判定（実測時間をwall_time、フェーズごとの時間をphasesに記録）
     
+    deadline（time.monotonic()の値）を渡した場合は、タイムアウト後の再確認なども含めて
+    deadlineを過ぎた時点で実行を打ち切る。
+    """
+    started = time.monotonic()
+    phases = {}
     try:
-        print(f"\n🚀 テスト関数を実行します: {test_function}")
-        print("📂 Apps Scriptエディタを開いています...")
-        await page.goto(SPREADSHEET_SCRIPT_URL, wait_until="domcontentloaded", timeout=60000)
-        await asyncio.sleep(5)
-        
-        # tests.gsファイルを開く（重要！）
-        print("📄 tests.gsファイルを開いています...")
-        tests_file_opened = False
-        try:
-            # ファイルタブを探してクリック
-            file_selectors = [
-                'text="tests.gs"',
-                'div:has-text("tests.gs")',
-                '[aria-label*="tests.gs"]',
-                'button:has-text("tests.gs")',
-            ]
-            
-            for selector in file_selectors:
-                try:
-                    file_tab = await page.wait_for_selector(selector, timeout=5000)
-                    if file_tab:
-                        await file_tab.click()
-                        print(f"   ✅ tests.gsファイルを開きました: {selector}")
-                        tests_file_opened = True
-                        await asyncio.sleep(3)  # ファイルが開くまで待機
-                        break
-                except:
-                    continue
-            
-            if not tests_file_opened:
-                print("   ⚠️  tests.gsファイルタブが見つかりませんでした（既に開いている可能性があります）")
-                # 既に開いている可能性があるので続行
-        except Exception as e:
-            print(f"   ⚠️  tests.gsファイルを開く際にエラー: {e}")
-            # エラーが発生しても続行（既に開いている可能性がある）
-        
-        # 関数選択ドロップダウンを探す（改善版）
-        print("🔍 関数選択ドロップダウンを探しています...")
-        
-        # デバッグ: ページの構造を確認
-        debug_info = await page.evaluate('''
-            () => {
-                const info = {
-                    selects: document.querySelectorAll('select').length,
-                    comboboxes: document.querySelectorAll('[role="combobox"]').length,
-                    listboxes: document.querySelectorAll('[aria-haspopup="listbox"]').length,
-                    functionSelectors: []
-                };
-                
-                // select要素の情報を取得
-                const selects = document.querySelectorAll('select');
-                selects.forEach((select, idx) => {
-                    const options = Array.from(select.options);
-                    const testOptions = options.filter(opt => opt.textContent.includes('test'));
-                    if (testOptions.length > 0) {
-                        info.functionSelectors.push({
-                            index: idx,
-                            optionCount: options.length,
-                            testOptionCount: testOptions.length,
-                            firstTestOption: testOptions[0]?.textContent
-                        });
-                    }
-                });
-                
-                return info;
-            }
-        ''')
-        print(f"   📊 デバッグ情報: select要素={debug_info['selects']}, combobox={debug_info['comboboxes']}, listbox={debug_info['listboxes']}")
-        if debug_info['functionSelectors']:
-            print(f"   📊 テスト関数を含むselect要素: {len(debug_info['functionSelectors'])}個")
-        
-        # より確実な方法で関数を選択
-        function_selected = False
-        
-        # 方法1: select要素を探す（Playwrightのselect_optionを使用）
-        try:
-            selects = await page.query_selector_all('select')
-            print(f"   🔍 select要素を{len(selects)}個発見")
-            
-            for idx, select in enumerate(selects):
-                try:
-                    # オプションを取得
-                    options = await select.query_selector_all('option')
-                    print(f"   🔍 select[{idx}]: {len(options)}個のオプション")
-                    
-                    # テスト関数名を含むオプションを探す
-                    for option in options:
-                        text = await option.text_content()
-                        value = await option.get_attribute('value')
-                        
-                        if text and (test_function in text or test_function == value):
-                            print(f"   ✅ オプションを発見: {text} (value: {value})")
-                            try:
-                                # Playwrightのselect_optionメソッドを使用
-                                await select.select_option(value)
-                                print(f"   ✅ select要素から関数を選択しました: {test_function}")
-                                function_selected = True
-                                await asyncio.sleep(2)  # 選択が反映されるまで待機
-                                break
-                            except Exception as e:
-                                print(f"   ⚠️  select_optionでエラー: {e}")
-                                # フォールバック: JavaScriptで直接設定
-                                await page.evaluate(f'''
-                                    (selectIndex, optionValue) => {{
-                                        const selects = document.querySelectorAll('select');
-                                        if (selects[selectIndex]) {{
-                                            selects[selectIndex].value = optionValue;
-                                            selects[selectIndex].dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                            selects[selectIndex].dispatchEvent(new Event('input', {{ bubbles: true }}));
-                                        }}
-                                    }}
-                                ''', idx, value)
-                                function_selected = True
-                                await asyncio.sleep(2)
-                                break
-                    
-                    if function_selected:
-                        break
-                except Exception as e:
-                    print(f"   ⚠️  select[{idx}]の処理でエラー: {e}")
-                    continue
-        except Exception as e:
-            print(f"   ⚠️  select要素の検索でエラー: {e}")
-        
-        # 方法2: 関数選択ドロップダウンをクリック（run_create_test_event_only.pyの方法）
-        if not function_selected:
-            try:
-                function_dropdown_selectors = [
-                    'div[aria-label="実行する関数を選択"]',
-                    'div[aria-label*="関数を選択"]',
-                    'div[aria-label*="function"]',
-                    '[role="combobox"][aria-label*="関数"]',
-                    '[role="combobox"][aria-label*="function"]',
-                ]
-                
-                for selector in function_dropdown_selectors:
-                    try:
-                        dropdown = await page.wait_for_selector(selector, timeout=5000)
-                        if dropdown:
-                            print(f"   ✅ 関数選択ドロップダウンを発見: {selector}")
-                            # クリックしてフォーカス
-                            await dropdown.click()
-                            await asyncio.sleep(1)
-                            
-                            # 既存のテキストをクリア
-                            await page.keyboard.press('Control+A')
-                            await asyncio.sleep(0.5)
-                            
-                            # 関数名を入力
-                            await page.keyboard.type(test_function, delay=50)
-                            await asyncio.sleep(1)
-                            
-                            # Enterキーで選択
-                            await page.keyboard.press('Enter')
-                            print(f"   ✅ 関数名を入力しました: {test_function}")
-                            function_selected = True
-                            await asyncio.sleep(2)
-                            break
-                    except Exception as e:
-                        print(f"   ⚠️  セレクタ {selector} でエラー: {e}")
-                        continue
-            except Exception as e:
-                print(f"   ⚠️  関数選択ドロップダウンの検索でエラー: {e}")
-        
-        # 方法3: 通常のドロップダウンを探してクリック
-        if not function_selected:
-            try:
-                dropdowns = await page.query_selector_all('[role="combobox"], [aria-haspopup="listbox"]')
-                print(f"   🔍 ドロップダウンを{len(dropdowns)}個発見")
-                
-                for idx, dropdown in enumerate(dropdowns):
-                    try:
-                        await dropdown.click()
-                        await asyncio.sleep(2)  # オプションが表示されるまで待機
-                        
-                        # オプションを探す
-                        options = await page.query_selector_all('[role="option"]')
-                        print(f"   🔍 ドロップダウン[{idx}]: {len(options)}個のオプション")
-                        
-                        for option in options:
-                            text = await option.text_content()
-                            if text and test_function in text:
-                                await option.click()
-                                print(f"   ✅ ドロップダウンから関数を選択しました: {test_function}")
-                                function_selected = True
-                                await asyncio.sleep(2)
-                                break
-                        
-                        if function_selected:
-                            break
-                    except Exception as e:
-                        print(f"   ⚠️  ドロップダウン[{idx}]の処理でエラー: {e}")
-                        continue
-            except Exception as e:
-                print(f"   ⚠️  ドロップダウンの検索でエラー: {e}")
-        
-        # 方法4: JavaScriptで直接選択を試みる（同期版）
-        if not function_selected:
-            print("   🔍 JavaScriptで直接選択を試みます...")
-            function_selected = await page.evaluate(f'''
-                (functionName) => {{
-                    // select要素を探す
-                    const selects = document.querySelectorAll('select');
-                    for (const select of selects) {{
-                        const options = Array.from(select.options);
-                        const found = options.find(opt => 
-                            opt.textContent.trim() === functionName || 
-                            opt.textContent.includes(functionName) ||
-                            opt.value === functionName
-                        );
-                        if (found) {{
-                            select.value = found.value;
-                            select.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                            select.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                            return true;
-                        }}
-                    }}
-                    return false;
-                }}
-            ''', test_function)
-            
-            if function_selected:
-                print(f"   ✅ JavaScriptで関数を選択しました: {test_function}")
-                await asyncio.sleep(2)
-        
-        # 選択の確認
-        if function_selected:
-            # 選択が正しく反映されたか確認
-            selected_value = await page.evaluate('''
-                () => {
-                    const selects = document.querySelectorAll('select');
-                    for (const select of selects) {
-                        if (select.value && select.value.includes('test')) {
-                            return select.value;
-                        }
-                    }
-                    return null;
-                }
-            ''')
-            if selected_value:
-                print(f"   ✅ 選択を確認しました: {selected_value}")
-            else:
-                print(f"   ⚠️  選択の確認に失敗しました")
-        else:
-            print(f"   ❌ 関数選択に失敗しました: {test_function}")
-            # スクリーンショットを保存（デバッグ用）
-            screenshot_path = os.path.join(os.path.dirname(__file__), '..', 'logs', f'function_select_failed_{test_function}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png')
-            await page.screenshot(path=screenshot_path, full_page=True)
-            print(f"   📸 スクリーンショットを保存しました: {screenshot_path}")
-            return {'success': False, 'error': '関数選択に失敗', 'test_function': test_function, 'screenshot': screenshot_path}
-        
-        # 実行ボタンを探してクリック
-        print("▶️  実行ボタンを探しています...")
-        run_button_selectors = [
-            'button[aria-label*="実行"]',
-            'button[aria-label*="Run"]',
-            'button:has-text("実行")',
-            'button:has-text("Run")',
-        ]
-        
-        run_button_clicked = False
-        for selector in run_button_selectors:
-            try:
-                run_button = await page.wait_for_selector(selector, timeout=3000)
-                if run_button:
-                    await run_button.click()
-                    print(f"   ✅ 実行ボタンをクリックしました")
-                    run_button_clicked = True
-                    await asyncio.sleep(2)
-                    break
-            except:
-                continue
-        
-        if not run_button_clicked:
-            print("   ⚠️  実行ボタンが見つかりませんでした")
-            return {'success': False, 'error': '実行ボタンが見つからない'}
-        
-        # 実行ログを待機（長時間実行されるテストを考慮）
-        # testRebuildDependenciesやtestUpdateDashboardAfterReservationは長時間実行される可能性がある
-        long_running_tests = ['testRebuildDependencies', 'testUpdateDashboardAfterReservation', 'testAll']
-        initial_wait_time = 90 if test_function in long_running_tests else 30
-        
-        print(f"⏳ 実行ログの表示を待機しています...（{initial_wait_time}秒）")
-        await asyncio.sleep(initial_wait_time)
-        
-        # 実行ログパネルを開く
-        print("📋 実行ログパネルを開いています...")
-        log_button_selectors = [
-            'button[aria-label*="実行ログ"]',
-            'button[aria-label*="Execution log"]',
-            'button:has-text("実行ログ")',
-            'button:has-text("Execution log")',
-        ]
-        
-        log_panel_opened = False
-        for selector in log_button_selectors:
-            try:
-                log_button = await page.wait_for_selector(selector, timeout=5000)
-                if log_button:
-                    await log_button.click()
-                    print(f"   ✅ 実行ログボタンをクリックしました")
-                    log_panel_opened = True
-                    await asyncio.sleep(10)  # ログが表示されるまで待機（延長）
-                    break
-            except:
-                continue
-        
-        if not log_panel_opened:
-            print("   ⚠️  実行ログボタンが見つかりませんでした")
-        
-        # 実行ログを取得（複数回試行、完了メッセージを確認）
-        print("📋 実行ログを取得しています...")
-        log_content = ""
-        max_retries = 5  # リトライ回数を増やす
-        for retry in range(max_retries):
-            wait_time = 10 if retry == 0 else 15  # 初回は10秒、再試行は15秒
-            await asyncio.sleep(wait_time)
-            log_content = await extract_execution_logs(page)
-            
-            # ログが「読み込んでいます...」で終わっている場合は、完了メッセージを待つ
-            if log_content and '読み込んでいます' in log_content:
-                print(f"   ⏳ ログがまだ読み込み中です。完了を待機します... ({retry + 1}/{max_retries})")
-                if retry < max_retries - 1:
-                    # ログパネルを再度開く
-                    for selector in log_button_selectors:
-                        try:
-                            log_button = await page.wait_for_selector(selector, timeout=3000)
-                            if log_button:
-                                await log_button.click()
-                                await asyncio.sleep(5)
-                                break
-                        except:
-                            continue
-                    continue
-            
-            # 完了メッセージが含まれているか確認
-            completion_keywords = ['完了', '✅', '❌', 'testRebuildDependencies: 完了', 'testUpdateDashboardAfterReservation: 完了']
-            has_completion = any(keyword in log_content for keyword in completion_keywords)
-            
-            # ログが十分な長さがあるか、または完了メッセージが含まれているか確認
-            if log_content and (len(log_content.strip()) > 200 or has_completion):
-                print(f"   ✅ 実行ログを取得しました（{len(log_content)}文字）")
-                if has_completion:
-                    print(f"   ✅ 完了メッセージを確認しました")
-                break
-            elif retry < max_retries - 1:
-                print(f"   ⚠️  実行ログが見つかりませんでした。再試行します... ({retry + 1}/{max_retries})")
-                # ログパネルを再度開く
-                for selector in log_button_selectors:
-                    try:
-                        log_button = await page.wait_for_selector(selector, timeout=3000)
-                        if log_button:
-                            await log_button.click()
-                            await asyncio.sleep(5)
-                            break
-                    except:
-                        continue
-        
-        if log_content and len(log_content.strip()) > 0:
-            # ログをファイルに保存
-            log_file = save_log(test_function, log_content)
-            
-            # 実行結果を解析
-            results = parse_test_results(log_content)
-            results['log_file'] = log_file
-            results['test_function'] = test_function
-            
-            return results
+        print(f"\n🚀 テスト関数を実行します: {test_function}（{backend.name}）")
+        test_timeout = resolve_timeout(test_function, timeout)
+        if deadline is None:
+            execution = await backend.run(test_function, test_timeout)
         else:
-            print("   ⚠️  実行ログを取得できませんでした")
-            # 結果不明も失敗として扱う
-            return {'success': False, 'test_function': test_function, 'error': 'ログ取得失敗'}
-            
+            remaining = deadline - time.monotonic()
+            execution = await asyncio.wait_for(
+                backend.run(test_function, min(test_timeout, remaining), deadline), remaining)
+        phases['execute'] = round(time.monotonic() - started, 1)
+        result = finalize_execution(test_function, execution)
+        phases['parse'] = round(time.monotonic() - started - phases['execute'], 2)
+    except asyncio.TimeoutError:
+        print("\n⏳ 時間予算を超えたため実行を打ち切りました")
+        result = {'success': False, 'test_function': test_function, 'error': '時間予算を超えたため実行を打ち切りました',
+                  'timed_out': True, 'budget_exceeded': True, 'backend': backend.name}
     except Exception as e:
         print(f"\n❌ エラーが発生しました: {e}")
         import traceback
         traceback.print_exc()
-        return {'success': False, 'test_function': test_function, 'error': str(e)}
+        result = {'success': False, 'test_function': test_function, 'error': str(e), 'backend': backend.name}
+    result['wall_time'] = round(time.monotonic() - started, 1)
+    result['phases'] = phases
+    return result
 
-async def run_all_tests():
-    """すべてのテスト関数を実行"""
-    async with async_playwright() as p:
-        home_dir = os.path.expanduser("~")
-        user_data_dir = os.path.join(home_dir, ".playwright_chrome_profile")
-        
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            headless=False,
-            viewport={"width": 1920, "height": 1080}
-        )
-        
-        results = []
+async def run_test_with_retry(backend: ExecutionBackend, test_function: str, timeout: Optional[float] = None,
+                              policy: Optional[RetryPolicy] = None, deadline: Optional[float] = None) -> Dict:
+    """一時的なエラー・実行環境のエラーの場合に指数バックオフでリトライしながらテスト関数を実行
+    
+    policyを複数のテストで共有すると、リトライ回数の上限（予算）が実行全体に適用される。
+    deadline（time.monotonic()の値）を渡した場合は、各回の実行をその時点の残り時間までに制限し、
+    それを超えるリトライは行わない。
+    """
+    if policy is None:
+        policy = RetryPolicy()
+    attempt = 0
+    retry_wait = 0.0
+    while True:
+        attempt += 1
+        test_result = await run_with_backend(backend, test_function, timeout, deadline)
+        category = classify_failure(test_result)
+        if category is None:
+            break
+        test_result['failure_category'] = category
+        if not policy.should_retry(test_result, attempt):
+            break
         
+        delay = policy.next_delay(attempt)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            print(f"   ⚠️  {FAILURE_LABELS[category]}が発生しましたが、時間予算が残っていないためリトライしません")
+            break
+        policy.consume()
+        print(f"   ⚠️  {FAILURE_LABELS[category]}が発生しました。{delay:.1f}秒後にリトライします... "
+              f"({attempt}/{policy.max_attempts - 1}、残りのリトライ予算: {policy.remaining})")
+        await asyncio.sleep(delay)
+        retry_wait += delay
+    
+    if attempt > 1:
+        test_result['attempts'] = attempt
+        test_result.setdefault('phases', {})['retry_wait'] = round(retry_wait, 1)
+    return test_result
+
+TEST_START_MARKER_PATTERN = re.compile(r'=== ([A-Za-z_$][\w$]*): 開始 ===')
+
+def extract_test_segment(log_content: str, test_function: str, nested: Optional[set] = None) -> Optional[str]:
+    """集約テストの実行ログから、マーカー（=== 関数名: 開始/完了 ===）を元にテスト関数の部分を切り出す
+    
+    完了マーカーがない場合（テストがエラーで中断した場合）は、
+    呼び出し先（nested）以外のテストの開始マーカーかログの末尾までを対象にする。
+    マーカーが見つからない場合はNoneを返す。
+    """
+    start = log_content.find(f'=== {test_function}: 開始 ===')
+    if start == -1:
+        return None
+    
+    end_marker = f'=== {test_function}: 完了 ==='
+    end = log_content.find(end_marker, start)
+    if end != -1:
+        return log_content[start:end + len(end_marker)]
+    
+    nested = nested or set()
+    for match in TEST_START_MARKER_PATTERN.finditer(log_content, start + 1):
+        if match.group(1) != test_function and match.group(1) not in nested:
+            return log_content[start:match.start()]
+    return log_content[start:]
+
+def derive_result_from_aggregate(test_function: str, aggregate_result: Dict, nested: Optional[set] = None) -> Optional[Dict]:
+    """集約テストの実行結果からテスト関数の結果を作成（ログから切り出せない場合はNone）"""
+    log_file = aggregate_result.get('log_file')
+    if not log_file or not os.path.exists(log_file):
+        return None
+    with open(log_file, 'r', encoding='utf-8') as f:
+        segment = extract_test_segment(f.read(), test_function, nested)
+    if segment is None:
+        return None
+    
+    result = parse_test_results(segment, steps=True)
+    result['log_file'] = save_log(test_function, segment)
+    result['test_function'] = test_function
+    result['execution_time'] = measure_log_duration(segment)
+    result['derived_from'] = aggregate_result.get('test_function')
+    category = classify_failure(result)
+    if category:
+        result['failure_category'] = category
+    if aggregate_result.get('backend'):
+        result['backend'] = aggregate_result['backend']
+    return result
+
+def print_test_result(test_function: str, test_result: Dict) -> None:
+    """1件のテスト結果を表示（結果不明も失敗として扱う）"""
+    if test_result.get('success') == True:
+        print(f"✅ {test_function}: 成功")
+    elif test_result.get('skipped'):
+        print(f"⏭️  {test_function}: スキップ（{test_result.get('error')}）")
+    else:
+        # successがFalseまたはNoneの場合、失敗として扱う
+        print(f"❌ {test_function}: 失敗{'（fail-fastで打ち切り）' if test_result.get('fail_fast') else ''}")
+        if test_result.get('errors'):
+            print(f"   エラー数: {len(test_result['errors'])}")
+        if test_result.get('error'):
+            print(f"   エラー: {test_result['error']}")
+    print_step_summary(test_result.get('steps') or [])
+
+def print_step_summary(steps: List[Dict]) -> None:
+    """手順の件数・失敗した手順・最も時間がかかった手順を表示"""
+    if not steps:
+        return
+    failed = [s for s in steps if s['status'] == 'failed']
+    line = f"   手順: {len(steps)}件"
+    if failed:
+        line += f"（失敗: {', '.join(s['number'] + '. ' + (s['function'] or s['title']) for s in failed)}）"
+    timed = [s for s in steps if s.get('duration')]
+    if timed:
+        slowest = max(timed, key=lambda s: s['duration'])
+        line += f"、最も時間がかかった手順: {slowest['number']}. {slowest['function'] or slowest['title']}（{slowest['duration']:.0f}秒）"
+    print(line)
+
+def build_summary(results: List[Dict], total: int) -> Dict:
+    """レポートのsummaryブロックを生成
+    
+    スキップしたテストは成功・失敗・カバレッジに含めない。
+    隔離中の不安定なテストの失敗は失敗に数えず、quarantinedに数える。
+    """
+    skipped_count = sum(1 for r in results if r.get('skipped'))
+    results = [r for r in results if not r.get('skipped')]
+    success_count = sum(1 for r in results if r.get('success') == True)
+    quarantined_count = sum(1 for r in results if r.get('success') != True and r.get('quarantined'))
+    # 結果不明（None）も失敗としてカウント
+    failure_count = sum(1 for r in results if r.get('success') != True) - quarantined_count
+    unknown_count = sum(1 for r in results if r.get('success') is None)
+    return {
+        'total': total,
+        'success': success_count,
+        'failure': failure_count,
+        'unknown': unknown_count,
+        'skipped': skipped_count,
+        'quarantined': quarantined_count,
+        'coverage': len(results),
+        'coverage_percentage': 100 * len(results) / total if total > 0 else 0
+    }
+
+def print_summary(results: List[Dict], summary: Dict) -> None:
+    """結果サマリーを表示"""
+    total = summary['total']
+    print("\n" + "="*80)
+    print("📊 テスト実行結果サマリー")
+    print("="*80)
+    
+    print(f"✅ 成功: {summary['success']}/{total}")
+    print(f"❌ 失敗: {summary['failure']}/{total}")
+    if summary['unknown'] > 0:
+        print(f"⚠️  不明: {summary['unknown']}/{total} (失敗として扱います)")
+    if summary.get('skipped'):
+        print(f"⏭️  スキップ: {summary['skipped']}/{total}")
+    if summary.get('quarantined'):
+        names = [r.get('test_function') for r in results
+                 if r.get('quarantined') and r.get('success') != True and not r.get('skipped')]
+        print(f"🧪 隔離中のテストの失敗: {summary['quarantined']}件（失敗に数えません）: {', '.join(names)}")
+    print(f"📈 カバレッジ: {summary['coverage']}/{total} ({summary['coverage_percentage']:.1f}%)")
+    
+    # 失敗したテストの詳細（結果不明も含む）
+    if summary['failure'] > 0:
+        print("\n❌ 失敗したテスト:")
+        for result in results:
+            if result.get('success') != True and not result.get('skipped') and not result.get('quarantined'):
+                category = result.get('failure_category')
+                label = f"（{FAILURE_LABELS[category]}）" if category in FAILURE_LABELS else ""
+                print(f"  - {result.get('test_function')}{label}")
+                if result.get('errors'):
+                    for error in result['errors'][:3]:  # 最初の3つのエラー
+                        print(f"    {error[:100]}...")
+                if result.get('error'):
+                    print(f"    エラー: {result['error']}")
+
+def save_report(results: List[Dict], summary: Dict, prefix: str = 'test_report',
+                extra: Optional[Dict] = None) -> str:
+    """結果をJSONファイルに保存（extraはレポートに追加する項目）
+
+    判定に使ったルール（expected_error_rules）は常に記録する（extraで指定した場合はその値を使う）。
+    """
+    report_file = os.path.join(os.path.dirname(__file__), '..', 'logs', f'{prefix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
+    os.makedirs(os.path.dirname(report_file), exist_ok=True)
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'expected_error_rules': default_rules().info(),
+            **(extra or {}),
+            'summary': summary,
+            'results': results
+        }, f, ensure_ascii=False, indent=2)
+    return report_file
+
+async def create_playwright_backends(context, workers: int, live: bool = False,
+                                     fail_fast: bool = False) -> List[PlaywrightBackend]:
+    """ワーカーごとにエディタのページを用意（1つ目は既存のページを再利用）
+    
+    各ページはEditorSessionとしてエディタとtests.gsを1回だけ読み込み、以降のテストで再利用する。
+    """
+    pages = list(context.pages[:1])
+    while len(pages) < workers:
+        pages.append(await context.new_page())
+    return [PlaywrightBackend(EditorSession(page, live=live, fail_fast=fail_fast)) for page in pages]
+
+@asynccontextmanager
+async def open_backends(backend: str, workers: int, headed: Optional[bool] = None,
+                        live: bool = False, fail_fast: bool = False):
+    """--backend の指定（auto / api / playwright）に従って実行バックエンドをworkers個用意する
+    
+    APIの認証情報がない場合はメッセージを表示してNoneを返す。
+    ブラウザ操作の場合は抜けるときにブラウザを閉じる。
+    """
+    if resolve_backend_name(backend) == 'api':
+        creds = load_api_credentials()
+        if creds is None:
+            print("❌ Apps Script APIの認証情報（token.json）が見つからないか、スコープが不足しています")
+            print("   python3 scripts/run_tests.py --auth でスクリプトのスコープを含めて認証するか、--backend playwright を指定してください")
+            yield None
+        else:
+            yield [ApiBackend(creds) for _ in range(workers)]
+        return
+    
+    async with async_playwright() as p:
+        context = await launch_context(p, headed=headed)
         try:
-            print("="*80)
-            print("🎭 すべてのテスト関数を実行します")
-            print("="*80)
-            print(f"📋 テスト関数数: {len(ALL_TEST_FUNCTIONS)}")
-            print("="*80)
-            
-            for i, test_function in enumerate(ALL_TEST_FUNCTIONS, 1):
-                print(f"\n[{i}/{len(ALL_TEST_FUNCTIONS)}] {test_function}")
-                print("-"*80)
-                
-                # ネットワークエラーが発生した場合のリトライ処理
-                max_retries = 2
-                test_result = None
-                for retry in range(max_retries):
-                    try:
-                        test_result = await run_test_function(context, test_function)
-                        # ネットワークエラーでない場合はリトライ不要
-                        if 'ERR_ADDRESS_UNREACHABLE' not in str(test_result.get('error', '')):
-                            break
-                        elif retry < max_retries - 1:
-                            print(f"   ⚠️  ネットワークエラーが発生しました。リトライします... ({retry + 1}/{max_retries})")
-                            await asyncio.sleep(5)
-                    except Exception as e:
-                        if 'ERR_ADDRESS_UNREACHABLE' in str(e) and retry < max_retries - 1:
-                            print(f"   ⚠️  ネットワークエラーが発生しました。リトライします... ({retry + 1}/{max_retries})")
-                            await asyncio.sleep(5)
-                            continue
-                        else:
-                            test_result = {'success': False, 'test_function': test_function, 'error': str(e)}
-                            break
-                
-                if test_result is None:
-                    test_result = {'success': False, 'test_function': test_function, 'error': 'テスト実行に失敗'}
-                
-                results.append(test_result)
-                
-                # 結果を表示（結果不明も失敗として扱う）
-                if test_result.get('success') == True:
-                    print(f"✅ {test_function}: 成功")
-                else:
-                    # successがFalseまたはNoneの場合、失敗として扱う
-                    print(f"❌ {test_function}: 失敗")
-                    if test_result.get('errors'):
-                        print(f"   エラー数: {len(test_result['errors'])}")
-                    if test_result.get('error'):
-                        print(f"   エラー: {test_result['error']}")
-                
-                # テスト間の待機時間
-                if i < len(ALL_TEST_FUNCTIONS):
-                    print("\n⏳ 次のテストまで10秒待機します...")
-                    await asyncio.sleep(10)
-            
-            # 結果サマリーを生成
-            print("\n" + "="*80)
-            print("📊 テスト実行結果サマリー")
-            print("="*80)
-            
-            success_count = sum(1 for r in results if r.get('success') == True)
-            # 結果不明（None）も失敗としてカウント
-            failure_count = sum(1 for r in results if r.get('success') != True)
-            unknown_count = sum(1 for r in results if r.get('success') is None)
-            
-            print(f"✅ 成功: {success_count}/{len(ALL_TEST_FUNCTIONS)}")
-            print(f"❌ 失敗: {failure_count}/{len(ALL_TEST_FUNCTIONS)}")
-            if unknown_count > 0:
-                print(f"⚠️  不明: {unknown_count}/{len(ALL_TEST_FUNCTIONS)} (失敗として扱います)")
-            print(f"📈 カバレッジ: {len(results)}/{len(ALL_TEST_FUNCTIONS)} ({100 * len(results) / len(ALL_TEST_FUNCTIONS):.1f}%)")
+            yield await create_playwright_backends(context, workers, live=live, fail_fast=fail_fast)
+        finally:
+            if is_headed(headed):
+                print("\n⏳ 10秒後にブラウザを閉じます...")
+                await asyncio.sleep(10)
+            await context.close()
+
+async def run_tests_in_pool(backends: List[ExecutionBackend], test_functions: List[str], interval: float = 10,
+                            timeout: Optional[float] = None,
+                            durations: Optional[DurationStore] = None,
+                            policy: Optional[RetryPolicy] = None,
+                            stream: Optional[ResultStream] = None,
+                            deadline: Optional[float] = None) -> List[Dict]:
+    """バックエンドのプールでテスト関数を並列実行（結果はtest_functionsと同じ順序で返す）
+    
+    durationsを渡した場合は予想実行時間の長い順に実行し、タイムアウトも履歴から決定する。
+    policyのリトライ予算はすべてのワーカーで共有する。
+    streamを渡した場合は各テストの開始と結果を終わった時点で追記する。
+    deadline（time.monotonic()の値）を渡した場合はtest_functionsの順（優先順）に実行し、
+    残り時間に収まらないテストはスキップして、タイムアウトも残り時間までに制限する。
+    """
+    policy = policy or RetryPolicy()
+    total = len(test_functions)
+    workers = len(backends)
+    
+    if durations and deadline is None:
+        order = durations.order_longest_first(test_functions)
+    else:
+        order = range(total)
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in order:
+        queue.put_nowait((index, test_functions[index]))
+    
+    results: List[Optional[Dict]] = [None] * total
+    started = 0
+    
+    async def worker(worker_id: int, backend: ExecutionBackend) -> None:
+        nonlocal started
+        while True:
+            try:
+                index, test_function = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
             
-            # 失敗したテストの詳細（結果不明も含む）
-            if failure_count > 0:
-                print("\n❌ 失敗したテスト:")
-                for result in results:
-                    if result.get('success') != True:
-                        print(f"  - {result.get('test_function')}")
-                        if result.get('errors'):
-                            for error in result['errors'][:3]:  # 最初の3つのエラー
-                                print(f"    {error[:100]}...")
-                        if result.get('error'):
-                            print(f"    エラー: {result['error']}")
+            started += 1
+            prefix = f"[W{worker_id}] " if workers > 1 else ""
+            print(f"\n{prefix}[{started}/{total}] {test_function}")
+            print("-"*80)
             
-            # 結果をJSONファイルに保存
-            report_file = os.path.join(os.path.dirname(__file__), '..', 'logs', f'test_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'summary': {
-                        'total': len(ALL_TEST_FUNCTIONS),
-                        'success': success_count,
-                        'failure': failure_count,
-                        'unknown': unknown_count,
-                        'coverage': len(results),
-                        'coverage_percentage': 100 * len(results) / len(ALL_TEST_FUNCTIONS) if len(ALL_TEST_FUNCTIONS) > 0 else 0
-                    },
-                    'results': results
-                }, f, ensure_ascii=False, indent=2)
+            test_timeout = resolve_timeout(test_function, timeout, durations)
+            estimate = durations.estimate(test_function) if durations else None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (estimate is not None and estimate > remaining):
+                    results[index] = skipped_result(test_function)
+                    print_test_result(test_function, results[index])
+                    if stream:
+                        stream.test_result(results[index])
+                    continue
+                test_timeout = min(test_timeout, remaining)
+            if estimate is not None:
+                print(f"⏱️  予想実行時間: {estimate:.0f}秒（タイムアウト: {test_timeout:.0f}秒）")
             
-            print(f"\n📝 詳細レポートを保存しました: {report_file}")
+            if stream:
+                stream.test_start(test_function, worker=worker_id, backend=backend.name)
+            test_result = await run_test_with_retry(backend, test_function, test_timeout, policy, deadline)
+            results[index] = test_result
+            if stream:
+                stream.test_result(test_result)
+            print_test_result(test_function, test_result)
             
-        finally:
-            print("\n⏳ 10秒後にブラウザを閉じます...")
-            await asyncio.sleep(10)
-            await context.close()
+            # テスト間の待機時間（ワーカーごと。時間予算の期限を過ぎている場合は待たない）
+            wait = interval if deadline is None else min(interval, deadline - time.monotonic())
+            if not queue.empty() and wait > 0:
+                print(f"\n⏳ {prefix}次のテストまで{round(wait, 1):g}秒待機します...")
+                await asyncio.sleep(wait)
+    
+    await asyncio.gather(*(worker(i + 1, backend) for i, backend in enumerate(backends)))
+    
+    sessions = [backend.session for backend in backends if isinstance(backend, PlaywrightBackend)]
+    if sessions:
+        loads = sum(session.load_count for session in sessions)
+        print(f"\n📂 エディタの読み込み回数: {loads}（テスト数: {total}）")
+    return [r for r in results if r is not None]
+
+def plan_executions(test_functions: List[str]) -> Optional[Dict]:
+    """tests.gsの呼び出しグラフから重複を除いた実行計画を作成（解析できない場合はNone）"""
+    try:
+        functions = load_gs_functions()
+    except OSError as e:
+        print(f"⚠️  tests.gsを解析できないため、重複除外せずに実行します: {e}")
+        return None
+    plan = plan_test_execution(test_functions, functions)
+    graph = build_call_graph(functions)
+    plan['nested'] = {name: reachable_functions(graph, name) for name in test_functions}
+    return plan
+
+async def run_planned_tests(backends: List[ExecutionBackend], test_functions: List[str], plan: Dict,
+                            interval: float = 10, timeout: Optional[float] = None,
+                            durations: Optional[DurationStore] = None,
+                            policy: Optional[RetryPolicy] = None,
+                            stream: Optional[ResultStream] = None,
+                            deadline: Optional[float] = None) -> List[Dict]:
+    """実行計画に従ってテストを実行し、集約テストのログから呼び出し先のテスト結果を割り当てる
+    
+    集約テストのログから切り出せなかったテスト（集約テストが途中で中断した場合など）は個別に実行する。
+    時間予算で集約テストをスキップした場合は、呼び出し先のテストもスキップとする。
+    """
+    executions = plan['executions']
+    executed = await run_tests_in_pool(backends, executions, interval=interval, timeout=timeout,
+                                       durations=durations, policy=policy, stream=stream, deadline=deadline)
+    results_by_test = {r.get('test_function'): r for r in executed}
+    
+    missing = []
+    for test_function in test_functions:
+        if test_function in results_by_test:
+            continue
+        aggregate = plan['covered_by'].get(test_function)
+        result = None
+        if results_by_test.get(aggregate, {}).get('skipped'):
+            result = skipped_result(test_function)
+        elif aggregate in results_by_test:
+            result = derive_result_from_aggregate(test_function, results_by_test[aggregate],
+                                                  plan['nested'].get(test_function))
+        if result is None:
+            missing.append(test_function)
+        else:
+            results_by_test[test_function] = result
+            if stream:
+                stream.test_result(result)
+    
+    if missing:
+        print(f"\n🔁 集約テストのログから結果を取得できなかったテストを個別に実行します: {len(missing)}件")
+        for result in await run_tests_in_pool(backends, missing, interval=interval, timeout=timeout,
+                                              durations=durations, policy=policy, stream=stream,
+                                              deadline=deadline):
+            results_by_test[result.get('test_function')] = result
+    
+    return [results_by_test[t] for t in test_functions if t in results_by_test]
+
+def select_shard(test_functions: List[str], plan: Optional[Dict], shard: Tuple[int, int],
+                 durations: DurationStore) -> Tuple[List[str], Dict]:
+    """実行単位（重複除外時は集約テストごと）を予想実行時間で均等にn分割し、i番目のシャードを選ぶ
+    
+    Returns:
+        (シャードのテスト関数, レポートに記録するシャード情報)
+    """
+    index, count = shard
+    units = plan['executions'] if plan else list(test_functions)
+    parts = durations.partition(units, count)
+    selected = set(parts[index - 1])
+    owner = plan['covered_by'] if plan else {}
+    shard_tests = [t for t in test_functions if owner.get(t, t) in selected]
+    if plan:
+        plan['executions'] = [e for e in plan['executions'] if e in selected]
+    
+    estimated = sum(durations.estimate(u) or 0 for u in parts[index - 1])
+    estimated_text = f"、予想 {estimated:.0f}秒" if estimated else ""
+    print(f"🧱 シャード {index}/{count}: {len(parts[index - 1])}回の実行（{len(shard_tests)}テスト{estimated_text}）")
+    info = {
+        'index': index,
+        'count': count,
+        'tests': shard_tests,
+        # 全シャードで分割結果が一致しているかをマージ時に確認するためのハッシュ
+        'plan_hash': hashlib.sha1(json.dumps(parts).encode('utf-8')).hexdigest()[:12],
+    }
+    return shard_tests, info
+
+def select_within_budget(test_functions: List[str], plan: Optional[Dict], budget: float, workers: int,
+                         durations: DurationStore) -> Tuple[List[str], List[str]]:
+    """時間予算に収まる実行単位（重複除外時は集約テストごと）を優先順に選ぶ
+    
+    直近で失敗したテストを含む実行 → 長く実行されていないテストを含む実行の順に、
+    予想実行時間（履歴がなければ記録済みの中央値）を積み上げて予算×ワーカー数に収まるものを選ぶ。
+    
+    Returns:
+        (優先順に並べた実行する単位, 予算に収まらないためスキップする単位)
+    """
+    units = plan['executions'] if plan else list(test_functions)
+    owner = plan['covered_by'] if plan else {}
+    members: Dict[str, set] = {unit: {unit} for unit in units}
+    for test_function in test_functions:
+        members.setdefault(owner.get(test_function, test_function), set()).add(test_function)
+    
+    estimates = {unit: durations.estimate(unit) for unit in units}
+    known = [e for e in estimates.values() if e is not None]
+    fallback = percentile(known, 50) if known else DEFAULT_BUDGET_ESTIMATE
+    
+    ordered = sorted(units, key=lambda unit: min(durations.priority_key(t) for t in members[unit]))
+    capacity = budget * workers
+    used = 0.0
+    selected, skipped = [], []
+    for unit in ordered:
+        estimate = estimates[unit] if estimates[unit] is not None else fallback
+        if estimate <= budget and used + estimate <= capacity:
+            selected.append(unit)
+            used += estimate
+        else:
+            skipped.append(unit)
+    return selected, skipped
+
+async def run_and_report(backends: List[ExecutionBackend], test_functions: List[str], interval: float = 10,
+                         timeout: Optional[float] = None, dedupe: bool = True,
+                         retry_budget: int = DEFAULT_RETRY_BUDGET, shard: Optional[Tuple[int, int]] = None,
+                         durations_file: Optional[str] = None, events_file: Optional[str] = None,
+                         resume: bool = False, budget: Optional[float] = None) -> List[Dict]:
+    """テスト関数を実行してサマリーの表示とレポートの保存を行う
+    
+    shard=(i, n)の場合はi番目のシャードのテストだけを実行し、シャード情報付きの部分レポートを保存する。
+    各テストの結果はevents_file（省略時は新しいlogs/test_events_*.ndjson）に終わった時点で追記する。
+    resume=Trueの場合はevents_fileで成功済みのテストをスキップし、その結果をレポートに含める。
+    budget（秒）を指定した場合は優先度の高いテストから予算に収まるだけ実行し、残りはスキップとして記録する。
+    """
+    deadline = time.monotonic() + budget if budget else None
+    plan = plan_executions(test_functions) if dedupe else None
+    durations = DurationStore(durations_file) if durations_file else DurationStore()
+    policy = RetryPolicy(budget=retry_budget)
+    shard_info = None
+    if shard:
+        test_functions, shard_info = select_shard(test_functions, plan, shard, durations)
+    
+    resumed = {}
+    if resume and events_file:
+        passed = passed_results(read_events(events_file))
+        resumed = {t: dict(passed[t], resumed=True) for t in test_functions if t in passed}
+    pending = [t for t in test_functions if t not in resumed]
+    if resumed and plan:
+        plan = plan_executions(pending)
+    
+    to_run = pending
+    over_budget: List[str] = []
+    if budget:
+        selected, skipped_units = select_within_budget(pending, plan, budget, len(backends), durations)
+        owner = plan['covered_by'] if plan else {}
+        over_budget = [t for t in pending if owner.get(t, t) in skipped_units]
+        if plan:
+            plan['executions'] = selected
+            to_run = [t for t in pending if t not in over_budget]
+        else:
+            to_run = selected
+    
+    stream = ResultStream(events_file)
+    try:
+        print("="*80)
+        print("🎭 すべてのテスト関数を実行します")
+        print("="*80)
+        print(f"📋 テスト関数数: {len(test_functions)}")
+        if resumed:
+            print(f"⏭️  前回の実行で成功したテストをスキップ: {len(resumed)}件（残り {len(pending)}件）")
+        if plan:
+            print(f"🧩 集約テストとの重複を除外: {len(plan['executions'])}回の実行で全テストの結果を取得します")
+        if budget:
+            print(f"⏳ 時間予算: {budget:.0f}秒（直近の失敗 → 長く実行されていないテストの順に実行し、"
+                  f"収まらない{len(over_budget)}件はスキップ）")
+        print(f"🔌 実行バックエンド: {backends[0].name}")
+        if len(backends) > 1:
+            print(f"👷 並列ワーカー数: {len(backends)}")
+        print(f"📡 結果のイベント: {stream.path}")
+        print("="*80)
+        stream.run_start(test_functions, pending, backend=backends[0].name, workers=len(backends),
+                         shard=shard_info, resumed=sorted(resumed))
+        
+        results = [skipped_result(t) for t in over_budget]
+        for result in results:
+            stream.test_result(result)
+        if to_run and plan:
+            results += await run_planned_tests(backends, to_run, plan, interval=interval, timeout=timeout,
+                                               durations=durations, policy=policy, stream=stream,
+                                               deadline=deadline)
+        elif to_run:
+            results += await run_tests_in_pool(backends, to_run, interval=interval, timeout=timeout,
+                                               durations=durations, policy=policy, stream=stream,
+                                               deadline=deadline)
+        if policy.used:
+            print(f"\n🔁 リトライ回数: {policy.used}/{policy.budget}")
         
-        return results
+        for result in results:
+            durations.record(result)
+        durations.save()
+        
+        results_by_test = {**resumed, **{r.get('test_function'): r for r in results}}
+        results = [results_by_test[t] for t in test_functions if t in results_by_test]
+        quarantined = set(FlakinessStore().quarantined())
+        for result in results:
+            if result.get('test_function') in quarantined:
+                result['quarantined'] = True
+        summary = build_summary(results, len(test_functions))
+        print_summary(results, summary)
+        extra = {'events_file': os.path.basename(stream.path)}
+        if shard_info:
+            extra['shard'] = shard_info
+        report_file = save_report(results, summary, extra=extra)
+        stream.run_end(summary, report_file=os.path.basename(report_file))
+    finally:
+        stream.close()
+    
+    print(f"\n📝 詳細レポートを保存しました: {report_file}")
+    return results
+
+async def run_repeated(backends: List[ExecutionBackend], test_functions: List[str], repeat: int,
+                       interval: float = 10, timeout: Optional[float] = None,
+                       durations_file: Optional[str] = None) -> List[Dict]:
+    """各テスト関数をrepeat回実行し、成功率・信頼区間・実行時間の統計を表示して保存する
+    
+    テストごとの不安定さを測るため、集約テストとの重複除外とリトライは行わない。
+    エディタのセッションはワーカーごとに再利用し、複数ワーカーでは並列に実行する。
+    """
+    durations = DurationStore(durations_file) if durations_file else DurationStore()
+    runs = [t for t in test_functions for _ in range(repeat)]
+    
+    print("="*80)
+    print(f"🎲 テストの安定性を測定します（各テスト{repeat}回）")
+    print("="*80)
+    print(f"📋 テスト関数数: {len(test_functions)}（合計 {len(runs)}回の実行）")
+    print(f"🔌 実行バックエンド: {backends[0].name}")
+    if len(backends) > 1:
+        print(f"👷 並列ワーカー数: {len(backends)}")
+    print("="*80)
+    
+    results = await run_tests_in_pool(backends, runs, interval=interval, timeout=timeout,
+                                      durations=durations, policy=RetryPolicy(budget=0))
+    for result in results:
+        durations.record(result)
+    durations.save()
+    
+    results_by_test: Dict[str, List[Dict]] = {}
+    for result in results:
+        results_by_test.setdefault(result.get('test_function'), []).append(result)
+    stats = [summarize_runs(t, results_by_test.get(t, [])) for t in test_functions]
+    print_flakiness(stats)
+    
+    store = FlakinessStore()
+    store.update(stats)
+    store.save()
+    
+    summary = build_summary(results, len(runs))
+    report_file = save_report(results, summary, prefix='flakiness_report', extra={
+        'repeat': repeat,
+        'flakiness': stats,
+    })
+    print(f"\n📝 詳細レポートを保存しました: {report_file}")
+    print(f"🧪 隔離中のテスト: {', '.join(store.quarantined()) or 'なし'}（{os.path.basename(store.path)}）")
+    return results
+
+def merge_reports(report_files: List[str]) -> Optional[str]:
+    """シャードごとの部分レポートを1つのレポートにまとめて保存"""
+    reports = [load_report(path) for path in report_files]
+    shards = [r.get('shard') for r in reports if r.get('shard')]
+    
+    hashes = {s.get('plan_hash') for s in shards}
+    if len(hashes) > 1:
+        print("⚠️  シャードの分割結果が一致していません（実行時間の履歴が異なる可能性があります）。重複・漏れを確認してください")
+    rule_sets = list({r['expected_error_rules'].get('hash'): r['expected_error_rules']
+                      for r in reports if r.get('expected_error_rules')}.values())
+    if len(rule_sets) > 1:
+        print("⚠️  レポートごとに判定ルール（config/expected_error_rules.json）が異なります")
+    counts = {s.get('count') for s in shards}
+    if len(counts) == 1:
+        count = counts.pop()
+        missing = sorted(set(range(1, count + 1)) - {s.get('index') for s in shards})
+        if missing:
+            print(f"⚠️  シャード {', '.join(map(str, missing))}/{count} のレポートがありません")
+    
+    results = merge_shard_results(reports, ALL_TEST_FUNCTIONS)
+    total = sum(r.get('summary', {}).get('total', len(r.get('results', []))) for r in reports)
+    summary = build_summary(results, max(total, len(results)))
+    print_summary(results, summary)
+    report_file = save_report(results, summary, extra={
+        'merged_from': [os.path.basename(path) for path in report_files],
+        # 判定ルールが異なるレポートをまとめた場合はすべてのルールを記録する
+        'expected_error_rules': rule_sets[0] if len(rule_sets) == 1 else rule_sets,
+    })
+    print(f"\n📝 統合したレポートを保存しました: {report_file}")
+    return report_file
+
+def select_changed_tests(ref: str, test_functions: List[str]) -> Optional[List[str]]:
+    """refからの.gsの変更の影響を受けるテスト関数を選択（変更を取得できない場合はNone）"""
+    try:
+        selection = select_tests_for_changes(ref, test_functions)
+    except (RuntimeError, OSError) as e:
+        print(f"❌ {ref} からの変更を取得できませんでした: {e}")
+        return None
+    
+    print(f"🔍 {ref} からの変更: {', '.join(selection['changed_files']) or 'なし'}")
+    if selection['changed_symbols']:
+        print(f"   変更された関数・変数: {', '.join(selection['changed_symbols'])}")
+    print(f"   影響を受けるテスト: {len(selection['tests'])}/{len(test_functions)}件")
+    return selection['tests']
+
+async def run_all_tests(workers: int = 1, interval: float = 10, timeout: Optional[float] = None,
+                        backend: str = 'auto', headed: Optional[bool] = None, dedupe: bool = True,
+                        changed_since: Optional[str] = None, retry_budget: int = DEFAULT_RETRY_BUDGET,
+                        shard: Optional[Tuple[int, int]] = None, durations_file: Optional[str] = None,
+                        resume: Optional[str] = None, budget: Optional[float] = None,
+                        repeat: Optional[int] = None, live: bool = False, fail_fast: bool = False):
+    """すべてのテスト関数（changed_sinceを指定した場合は変更の影響を受けるテスト関数）を実行
+    
+    resumeにイベントファイル（'latest'の場合はlogs/の最新のもの）を指定すると、
+    成功済みのテストをスキップしてそのファイルに続きの結果を追記する。
+    repeatを指定した場合は各テストをrepeat回実行して安定性を測定する。
+    live・fail_fastはブラウザ操作での実行時のみ有効（実行中のログの表示・「❌」での打ち切り）。
+    """
+    test_functions = ALL_TEST_FUNCTIONS
+    events_file = None
+    if resume:
+        events_file = find_latest_stream() if resume == 'latest' else resume
+        if not events_file or not os.path.exists(events_file):
+            print(f"❌ 再開するイベントファイルが見つかりません: {events_file or 'logs/test_events_*.ndjson'}")
+            return []
+        print(f"⏯️  {os.path.basename(events_file)} から再開します")
+    if changed_since:
+        test_functions = select_changed_tests(changed_since, test_functions)
+        if not test_functions:
+            if test_functions is not None:
+                print("✅ 変更の影響を受けるテストはありません")
+            return []
+    workers = max(1, min(workers, len(test_functions) * (repeat or 1)))
+    
+    async def execute(backends: List[ExecutionBackend], interval: float) -> List[Dict]:
+        if repeat:
+            return await run_repeated(backends, test_functions, repeat, interval=interval, timeout=timeout,
+                                      durations_file=durations_file)
+        return await run_and_report(backends, test_functions, interval=interval, timeout=timeout, dedupe=dedupe,
+                                    retry_budget=retry_budget, shard=shard, durations_file=durations_file,
+                                    events_file=events_file, resume=bool(resume), budget=budget)
+    
+    async with open_backends(backend, workers, headed=headed, live=live, fail_fast=fail_fast) as backends:
+        if backends is None:
+            return []
+        # APIでの実行はエディタを操作しないため、テスト間で待機しない
+        return await execute(backends, interval=0 if backends[0].name == 'api' else interval)
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """--shard i/n を解析（1 <= i <= n）"""
+    match = re.fullmatch(r'(\d+)/(\d+)', value.strip())
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError('--shard は i/n（1 <= i <= n）の形式で指定してください（例: 1/3）')
+    return int(match.group(1)), int(match.group(2))
+
+def parse_duration(value: str) -> float:
+    """--budget の時間を秒に変換（例: 900, 90s, 15m, 1h30m）"""
+    parts = re.findall(r'(\d+(?:\.\d+)?)([hms]?)', value.strip().lower())
+    if not parts or ''.join(n + u for n, u in parts) != value.strip().lower():
+        raise argparse.ArgumentTypeError('--budget は 900、90s、15m、1h30m のように指定してください')
+    seconds = sum(float(n) * DURATION_UNITS[u] for n, u in parts)
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError('--budget には0より大きい時間を指定してください')
+    return seconds
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='tests.gsのテスト関数を実行します')
+    parser.add_argument('--backend', choices=BACKEND_CHOICES, default='auto',
+                        help='実行バックエンド（auto: 認証情報があればApps Script API、なければブラウザ操作）')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='同時に実行するエディタページ（API実行時は同時リクエスト）数（デフォルト: 1 = 逐次実行）')
+    parser.add_argument('--interval', type=float, default=10,
+                        help='各ワーカーでのテスト間の待機秒数（デフォルト: 10）')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help=f'1テストあたりの実行完了待ちの上限秒数（デフォルト: 実行時間の履歴の'
+                             f'p{TIMEOUT_PERCENTILE}の{TIMEOUT_MARGIN:g}倍、履歴がないテストは{DEFAULT_TEST_TIMEOUT}）')
+    parser.add_argument('--changed-since', metavar='GIT_REF',
+                        help='指定したgitのref（例: main, HEAD~1）からの.gsの変更の影響を受けるテストだけを実行')
+    parser.add_argument('--retry-budget', type=int, default=DEFAULT_RETRY_BUDGET,
+                        help='一時的なエラー・実行環境のエラーをリトライする回数の上限（実行全体、'
+                             f'デフォルト: {DEFAULT_RETRY_BUDGET}、0でリトライしない）')
+    parser.add_argument('--budget', type=parse_duration, metavar='TIME',
+                        help='実行全体の時間の上限（例: 15m, 1h, 900）。直近で失敗したテスト → 長く実行されていない'
+                             'テストの順に、予想実行時間で収まるものだけを実行し、残りはスキップとして記録する')
+    parser.add_argument('--repeat', type=int, metavar='K',
+                        help='各テストをK回実行して成功率・信頼区間・実行時間の平均とp95を測定し、'
+                             '不安定なテストをlogs/flakiness.jsonで隔離する（重複除外・リトライなし）')
+    parser.add_argument('--shard', type=parse_shard, metavar='i/n',
+                        help='テストを実行時間の履歴で均等にn分割し、i番目だけを実行（部分レポートを保存）')
+    parser.add_argument('--durations', metavar='PATH', dest='durations_file',
+                        help='実行時間の履歴ファイル（デフォルト: .cache/test_durations.json）。'
+                             '--shardでは全シャードで同じファイルを使うと分割結果が一致します')
+    parser.add_argument('--merge', nargs='+', metavar='REPORT',
+                        help='テストを実行せず、シャードごとの部分レポートを1つのレポートにまとめる')
+    parser.add_argument('--resume', nargs='?', const='latest', metavar='EVENTS',
+                        help='中断した実行を再開（イベントファイル test_events_*.ndjson で成功済みのテストをスキップ。'
+                             'ファイル省略時はlogs/の最新のもの）')
+    parser.add_argument('--live', action='store_true',
+                        help='実行中のログを1行ずつ表示し、ログファイルに随時書き込む（ブラウザ操作での実行時）')
+    parser.add_argument('--fail-fast', action='store_true',
+                        help='実行中のログに「❌」が出た時点でそのテストの実行を停止して失敗にする（--liveを含む）')
+    parser.add_argument('--no-dedupe', dest='dedupe', action='store_false',
+                        help='集約テスト（testAllなど）と呼び出し先のテストを重複して実行する（従来の動作）')
+    parser.add_argument('--headed', action='store_true', default=None,
+                        help='ブラウザを表示して実行（デバッグ用。既定はヘッドレスの軽量モード）')
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error('--workers は1以上を指定してください')
+    if args.repeat is not None and args.repeat < 1:
+        parser.error('--repeat は1以上を指定してください')
+    return args
 
 if __name__ == "__main__":
-    asyncio.run(run_all_tests())
+    args = parse_args()
+    if args.merge:
+        merge_reports(args.merge)
+        sys.exit(0)
+    asyncio.run(run_all_tests(workers=args.workers, interval=args.interval, timeout=args.timeout,
+                              backend=args.backend, headed=args.headed, dedupe=args.dedupe,
+                              changed_since=args.changed_since, retry_budget=args.retry_budget,
+                              shard=args.shard, durations_file=args.durations_file, resume=args.resume,
+                              budget=args.budget, repeat=args.repeat, live=args.live, fail_fast=args.fail_fast))
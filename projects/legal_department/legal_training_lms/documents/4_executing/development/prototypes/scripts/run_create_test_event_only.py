@@ -5,7 +5,7 @@ createTestEvent()のみを実行する簡易スクリプト
 
 import asyncio
 from playwright.async_api import async_playwright
-import os
+from browser_profile import launch_context
 
 # URLs
 SPREADSHEET_SCRIPT_URL = "https://script.google.com/u/0/home/projects/1DiZUSkJU_Z4Yc0bBcNgOUH3iqHux8xnSS7qILL5YZMfKgw86QeMvx0S-/edit"
@@ -76,19 +76,7 @@ async def main():
     async with async_playwright() as p:
         print("\n🌐 ブラウザを起動中...")
         
-        # 永続コンテキストを使用
-        home_dir = os.path.expanduser("~")
-        user_data_dir = os.path.join(home_dir, ".playwright_chrome_profile")
-        os.makedirs(user_data_dir, exist_ok=True)
-        
-        print(f"  ユーザーデータディレクトリ: {user_data_dir}")
-        
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            headless=False,
-            viewport={"width": 1920, "height": 1080},
-            args=['--disable-blink-features=AutomationControlled']
-        )
+        context = await launch_context(p)
         
         pages = context.pages
         if pages:
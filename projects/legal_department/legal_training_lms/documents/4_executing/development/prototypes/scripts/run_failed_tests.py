@@ -1,149 +1,99 @@
 #!/usr/bin/env python3
 """
 失敗したテストのみを再実行するスクリプト
+
+logs/の最新のレポート（test_report_*.json / failed_tests_report_*.json / combined_report_*.json）から
+success != true のテストを再実行し、結果を元のレポートに統合した combined_report_*.json を保存する。
 """
 
+import argparse
 import asyncio
 import sys
 import os
+from datetime import datetime
+from typing import List, Optional
 
 # run_all_tests.pyをインポート
 sys.path.insert(0, os.path.dirname(__file__))
+from duration_store import DurationStore
+from failure_policy import RetryPolicy
+from execution_backends import BACKEND_CHOICES
 from run_all_tests import (
-    async_playwright,
-    run_test_function,
-    parse_test_results,
-    extract_execution_logs,
-    save_log,
-    SPREADSHEET_SCRIPT_URL
+    build_summary,
+    open_backends,
+    print_summary,
+    run_tests_in_pool,
+    save_report,
 )
+from test_reports import failed_test_functions, find_latest_report, load_report, merge_results
+
+# テスト間の待機秒数
+RERUN_INTERVAL = 15
+
+async def run_failed_tests(report_file: Optional[str] = None, headed: Optional[bool] = None,
+                           backend: str = 'auto') -> List[dict]:
+    """最新（またはreport_file）のレポートで失敗したテスト関数のみを実行（backendはrun_all_tests.pyの--backendと同じ）"""
+    report_file = report_file or find_latest_report()
+    if not report_file:
+        print("❌ logs/にテストレポートが見つかりません。先に run_all_tests.py を実行してください")
+        return []
+
+    report = load_report(report_file)
+    failed_tests = failed_test_functions(report)
+    print(f"📄 元のレポート: {os.path.basename(report_file)}")
+    if not failed_tests:
+        print("✅ 失敗したテストはありません")
+        return []
+
+    async with open_backends(backend, 1, headed=headed) as backends:
+        if backends is None:
+            return []
+        print("="*80)
+        print(f"🎭 失敗したテスト関数を再実行します（{backends[0].name}）")
+        print("="*80)
+        print(f"📋 再実行するテスト関数数: {len(failed_tests)}")
+        for test_function in failed_tests:
+            print(f"  - {test_function}")
+        print("="*80)
+
+        durations = DurationStore()
+        # APIでの実行はエディタを操作しないため、テスト間で待機しない
+        interval = 0 if backends[0].name == 'api' else RERUN_INTERVAL
+        rerun_results = await run_tests_in_pool(backends, failed_tests, interval=interval,
+                                                 durations=durations, policy=RetryPolicy())
+        for result in rerun_results:
+            durations.record(result)
+        durations.save()
+
+    # 再実行の結果を元のレポートに統合
+    results = merge_results(report.get('results', []), rerun_results)
+    total = max(report.get('summary', {}).get('total', 0), len(results))
+    summary = build_summary(results, total)
+    summary['rerun'] = {
+        'total': len(rerun_results),
+        'success': sum(1 for r in rerun_results if r.get('success') == True),
+    }
+    print_summary(results, summary)
+    print(f"🔁 再実行: {summary['rerun']['success']}/{summary['rerun']['total']}件が成功")
 
-# 失敗したテスト関数のリスト
-FAILED_TEST_FUNCTIONS = [
-    'testErrorHandling',
-    'testAllBoundaryAndEdgeCases',
-    'testRebuildDependencies',
-    'testUpdateDashboardAfterReservation',
-]
+    combined_file = save_report(results, summary, prefix='combined_report', extra={
+        'timestamp': datetime.now().isoformat(),
+        'source_report': os.path.basename(report_file),
+    })
+    print(f"\n📝 統合レポートを保存しました: {combined_file}")
+    return results
 
-async def run_failed_tests():
-    """失敗したテスト関数のみを実行"""
-    async with async_playwright() as p:
-        home_dir = os.path.expanduser("~")
-        user_data_dir = os.path.join(home_dir, ".playwright_chrome_profile")
-        
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            headless=False,
-            viewport={"width": 1920, "height": 1080}
-        )
-        
-        results = []
-        
-        try:
-            print("="*80)
-            print("🎭 失敗したテスト関数を再実行します")
-            print("="*80)
-            print(f"📋 再実行するテスト関数数: {len(FAILED_TEST_FUNCTIONS)}")
-            print("="*80)
-            
-            for i, test_function in enumerate(FAILED_TEST_FUNCTIONS, 1):
-                print(f"\n[{i}/{len(FAILED_TEST_FUNCTIONS)}] {test_function}")
-                print("-"*80)
-                
-                # ネットワークエラーが発生した場合のリトライ処理
-                max_retries = 3  # リトライ回数を増やす
-                test_result = None
-                for retry in range(max_retries):
-                    try:
-                        test_result = await run_test_function(context, test_function)
-                        # ネットワークエラーでない場合はリトライ不要
-                        if 'ERR_ADDRESS_UNREACHABLE' not in str(test_result.get('error', '')):
-                            break
-                        elif retry < max_retries - 1:
-                            print(f"   ⚠️  ネットワークエラーが発生しました。リトライします... ({retry + 1}/{max_retries})")
-                            await asyncio.sleep(10)  # リトライ前に待機時間を延長
-                    except Exception as e:
-                        if 'ERR_ADDRESS_UNREACHABLE' in str(e) and retry < max_retries - 1:
-                            print(f"   ⚠️  ネットワークエラーが発生しました。リトライします... ({retry + 1}/{max_retries})")
-                            await asyncio.sleep(10)
-                            continue
-                        else:
-                            test_result = {'success': False, 'test_function': test_function, 'error': str(e)}
-                            break
-                
-                if test_result is None:
-                    test_result = {'success': False, 'test_function': test_function, 'error': 'テスト実行に失敗'}
-                
-                results.append(test_result)
-                
-                # 結果を表示
-                if test_result.get('success') == True:
-                    print(f"✅ {test_function}: 成功")
-                else:
-                    print(f"❌ {test_function}: 失敗")
-                    if test_result.get('errors'):
-                        print(f"   エラー数: {len(test_result['errors'])}")
-                        for err in test_result['errors'][:3]:
-                            print(f"     - {err[:80]}")
-                    if test_result.get('error'):
-                        print(f"   エラー: {test_result['error'][:100]}")
-                
-                # テスト間の待機時間
-                if i < len(FAILED_TEST_FUNCTIONS):
-                    print("\n⏳ 次のテストまで15秒待機します...")
-                    await asyncio.sleep(15)
-            
-            # 結果サマリーを生成
-            print("\n" + "="*80)
-            print("📊 テスト実行結果サマリー")
-            print("="*80)
-            
-            success_count = sum(1 for r in results if r.get('success') == True)
-            failure_count = len(results) - success_count
-            
-            print(f"✅ 成功: {success_count}/{len(results)}")
-            print(f"❌ 失敗: {failure_count}/{len(results)}")
-            print("="*80)
-            
-            # 失敗したテストの詳細
-            failed_tests = [r for r in results if r.get('success') != True]
-            if failed_tests:
-                print("\n❌ 失敗したテスト:")
-                for r in failed_tests:
-                    func = r.get('test_function', 'unknown')
-                    error = r.get('error', '')
-                    errors = r.get('errors', [])
-                    print(f"  - {func}")
-                    if error:
-                        print(f"    エラー: {error[:100]}")
-                    if errors:
-                        print(f"    エラー詳細: {errors[0][:100]}")
-            
-            # JSONレポートを保存
-            report_data = {
-                'timestamp': datetime.now().isoformat(),
-                'summary': {
-                    'total': len(results),
-                    'success': success_count,
-                    'failure': failure_count,
-                },
-                'results': results
-            }
-            
-            report_file = os.path.join(os.path.dirname(__file__), '..', 'logs', 
-                                     f'failed_tests_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
-            os.makedirs(os.path.dirname(report_file), exist_ok=True)
-            
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, ensure_ascii=False, indent=2)
-            
-            print(f"\n📝 レポートを保存しました: {report_file}")
-            
-        finally:
-            await context.close()
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='最新のテストレポートで失敗したテスト関数を再実行します')
+    parser.add_argument('--report', metavar='PATH',
+                        help='再実行の元にするレポート（デフォルト: logs/の最新のレポート）')
+    parser.add_argument('--backend', choices=BACKEND_CHOICES, default='auto',
+                        help='実行バックエンド（auto: 認証情報があればApps Script API、なければブラウザ操作）')
+    parser.add_argument('--headed', action='store_true', default=None,
+                        help='ブラウザを表示して実行（デバッグ用。既定はヘッドレスの軽量モード）')
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    from datetime import datetime
-    import json
-    asyncio.run(run_failed_tests())
+    args = parse_args()
+    asyncio.run(run_failed_tests(report_file=args.report, headed=args.headed, backend=args.backend))
@@ -3,8 +3,16 @@
 Google Apps Script テスト実行スクリプト
 
 このスクリプトはGoogle Apps Script APIを使用してテスト関数を実行します。
+
+scripts.runで実行する関数はスクリプトのスコープ（appsscript.jsonのoauthScopes）で動くため、
+認証ではそのスコープもすべて要求する。token.jsonのスコープが足りない場合は再認証する。
+
+使い方:
+    python3 scripts/run_tests.py          # 認証してテスト関数を実行
+    python3 scripts/run_tests.py --auth   # 認証してtoken.jsonを保存するだけ（run_all_tests.py --backend api用）
 """
 
+import argparse
 import os
 import sys
 import json
@@ -14,7 +22,10 @@ from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
-# スコープ
+sys.path.insert(0, os.path.dirname(__file__))
+from execution_backends import get_required_api_scopes
+
+# スコープ（これに加えてスクリプトのスコープを要求する）
 SCOPES = ['https://www.googleapis.com/auth/script.scriptapp']
 
 # プロジェクトID
@@ -26,15 +37,23 @@ TEST_FUNCTIONS = [
     'testAllUntestedFunctions',  # 統合テスト
 ]
 
+def get_auth_scopes():
+    """認証で要求するスコープ（SCOPES + appsscript.jsonのoauthScopes、重複なし）"""
+    return list(dict.fromkeys(SCOPES + get_required_api_scopes()))
+
 def get_credentials():
     """認証情報を取得"""
     creds = None
     token_file = 'token.json'
     credentials_file = 'credentials.json'
+    scopes = get_auth_scopes()
     
-    # 既存のトークンを読み込む
+    # 既存のトークンを読み込む（スコープはtoken.jsonに保存された、許可済みのスコープのまま）
     if os.path.exists(token_file):
-        creds = Credentials.from_authorized_user_file(token_file, SCOPES)
+        creds = Credentials.from_authorized_user_file(token_file)
+        if not creds.has_scopes(scopes):
+            print("🔑 token.jsonにスクリプトのスコープが不足しているため、再認証します")
+            creds = None
     
     # トークンが無効または存在しない場合、再認証
     if not creds or not creds.valid:
@@ -47,7 +66,7 @@ def get_credentials():
                 sys.exit(1)
             
             flow = InstalledAppFlow.from_client_secrets_file(
-                credentials_file, SCOPES)
+                credentials_file, scopes)
             creds = flow.run_local_server(port=0)
         
         # トークンを保存
@@ -56,6 +75,28 @@ def get_credentials():
     
     return creds
 
+def load_saved_credentials(required_scopes=None):
+    """保存済みのtoken.jsonから認証情報を取得（再認証は行わず、使えない場合はNoneを返す）"""
+    token_file = 'token.json'
+    if not os.path.exists(token_file):
+        return None
+
+    try:
+        creds = Credentials.from_authorized_user_file(token_file)
+        if required_scopes and not creds.has_scopes(required_scopes):
+            return None
+        if not creds.valid:
+            if not (creds.expired and creds.refresh_token):
+                return None
+            creds.refresh(Request())
+            with open(token_file, 'w') as token:
+                token.write(creds.to_json())
+    except Exception as error:
+        print(f"⚠️ 保存済みの認証情報を使用できません: {error}")
+        return None
+
+    return creds
+
 def run_function(service, function_name):
     """関数を実行"""
     try:
@@ -93,8 +134,24 @@ def run_function(service, function_name):
         print(f"❌ エラー: {error}")
         return False
 
+def parse_args(argv=None):
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description='Apps Script APIでテスト関数を実行します')
+    parser.add_argument('--auth', action='store_true',
+                        help='テストを実行せず、スクリプトのスコープを含めて認証してtoken.jsonを保存する')
+    return parser.parse_args(argv)
+
 def main():
     """メイン処理"""
+    args = parse_args()
+    if args.auth:
+        print("🔐 スクリプトのスコープを含めて認証します...")
+        for scope in get_auth_scopes():
+            print(f"   {scope}")
+        get_credentials()
+        print("✅ token.jsonを保存しました（run_all_tests.py --backend api で使用できます）")
+        return
+    
     print("=" * 60)
     print("Google Apps Script テスト実行スクリプト")
     print("=" * 60)
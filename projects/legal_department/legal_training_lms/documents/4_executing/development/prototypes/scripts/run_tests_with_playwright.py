@@ -7,31 +7,22 @@ Playwrightを使用してGoogle Apps Scriptのテストを実行するスクリ
 import asyncio
 import sys
 from playwright.async_api import async_playwright
+from browser_profile import launch_context
+from test_discovery import discover_test_functions
+from test_reports import create_log_file
 import os
 import re
 from datetime import datetime
 
 SPREADSHEET_SCRIPT_URL = "https://script.google.com/u/0/home/projects/1DiZUSkJU_Z4Yc0bBcNgOUH3iqHux8xnSS7qILL5YZMfKgw86QeMvx0S-/edit"
 
-# テスト関数のリスト
-TEST_FUNCTIONS = [
-    'testGetReservedCountForGroupAndCourse',
-    'testGetCourseNumberFromCourseListByCourseName',
-    'testUpdateDashboardAfterReservation',
-    'testAllNewFunctions',
-    'testAllUntestedFunctions',
-    'testAllBoundaryAndEdgeCases',
-]
+# テスト関数のリスト（tests.gsから自動検出）
+TEST_FUNCTIONS = discover_test_functions()
 
 def save_log(test_function, log_content):
     """ログをファイルに保存"""
-    log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    log_file = os.path.join(log_dir, f'playwright_test_{test_function}_{timestamp}.log')
-    
-    with open(log_file, 'w', encoding='utf-8') as f:
+    log_file, f = create_log_file(test_function)
+    with f:
         f.write(log_content)
     
     print(f"\n📝 ログを保存しました: {log_file}")
@@ -40,14 +31,7 @@ def save_log(test_function, log_content):
 async def run_test_function(test_function):
     """テスト関数を実行"""
     async with async_playwright() as p:
-        home_dir = os.path.expanduser("~")
-        user_data_dir = os.path.join(home_dir, ".playwright_chrome_profile")
-        
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
-            headless=False,
-            viewport={"width": 1920, "height": 1080}
-        )
+        context = await launch_context(p)
         
         pages = context.pages
         page = pages[0] if pages else await context.new_page()
@@ -192,7 +176,7 @@ async def run_test_function(test_function):
             # 実行ログパネルが開いていることを確認
             # 実行ログパネルのテキストエリアやpre要素を直接探す
             log_content = await page.evaluate('''
-                () => {
+                (testNames) => {
                     // 実行ログパネルを探す（check_test_results.pyと同じロジック）
                     const logSelectors = [
                         '[class*="log"]',
@@ -217,20 +201,7 @@ async def run_test_function(test_function):
                                 const text = el.textContent || el.innerText || '';
                                 // Logger.logの出力を含む要素を探す（テスト関数名を含むもの）
                                 if (text.length > maxLength && 
-                                    (text.includes('testAllUntestedFunctions') || 
-                                     text.includes('testRefreshAttendeeStatus') ||
-                                     text.includes('testHandleReservationFormSubmit') ||
-                                     text.includes('testOnCreatingSchedule') ||
-                                     text.includes('testOnDashboardAction') ||
-                                     text.includes('testEditHandler') ||
-                                     text.includes('testEnhancedFunctions') ||
-                                     text.includes('testCalendarEnhancedFunctions') ||
-                                     text.includes('testReservationChangeFunctions') ||
-                                     text.includes('testChangeReservation') ||
-                                     text.includes('testGetReservedCountForGroupAndCourse') ||
-                                     text.includes('testGetCourseNumberFromCourseListByCourseName') ||
-                                     text.includes('testUpdateDashboardAfterReservation') ||
-                                     text.includes('testAllNewFunctions') ||
+                                    (testNames.some(name => text.includes(name)) ||
                                      text.includes('開始') ||
                                      text.includes('完了') ||
                                      text.includes('成功') ||
@@ -254,8 +225,7 @@ async def run_test_function(test_function):
                         for (const el of allElements) {
                             const text = el.textContent || el.innerText || '';
                             if (text.length > 200 && 
-                                (text.includes('testAllUntestedFunctions') || 
-                                 text.includes('testGetReservedCountForGroupAndCourse') ||
+                                (testNames.some(name => text.includes(name)) ||
                                  text.includes('開始') || 
                                  text.includes('完了'))) {
                                 logText = text;
@@ -266,7 +236,7 @@ async def run_test_function(test_function):
                     
                     return logText || '';
                 }
-            ''')
+            ''', TEST_FUNCTIONS)
             
             # ログが見つからない場合、実行ログパネルを再度開く
             if not log_content or len(log_content.strip()) < 100:
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+関数選択ドロップダウンで成功した選択方法（ストラテジーとセレクタ）のキャッシュ
+
+エディタのビルド（取得できない場合はDOM構造のフィンガープリント）ごとに
+成功した方法を .cache/function_selector.json に保存し、次回はその方法から試す。
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+CACHE_FILE = os.path.join(os.path.dirname(__file__), '..', '.cache', 'function_selector.json')
+
+# エディタのビルドラベル（WIZ_global_data）と、取得できない場合のDOM構造のシグネチャを取得するJS
+EDITOR_FINGERPRINT_JS = '''
+() => {
+    const wiz = window.WIZ_global_data || {};
+    const build = wiz.cfb2h || wiz.cfb2H || '';
+    const labels = Array.from(document.querySelectorAll('[role="combobox"], [aria-haspopup="listbox"]'))
+        .map(el => el.tagName + ':' + (el.getAttribute('aria-label') || ''));
+    return {
+        build: build,
+        signature: [
+            'select=' + document.querySelectorAll('select').length,
+            'combobox=' + labels.join('|'),
+        ].join(';')
+    };
+}
+'''
+
+
+async def get_editor_fingerprint(page) -> str:
+    """エディタのフィンガープリントを取得（ビルドラベル優先、なければDOM構造のハッシュ）"""
+    try:
+        info = await page.evaluate(EDITOR_FINGERPRINT_JS)
+    except Exception:
+        return 'unknown'
+    if info.get('build'):
+        return f"build:{info['build']}"
+    digest = hashlib.sha1(info.get('signature', '').encode('utf-8')).hexdigest()[:12]
+    return f"dom:{digest}"
+
+
+class SelectorCache:
+    """フィンガープリント → {'strategy', 'hint', 'updated_at'} のキャッシュ"""
+
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self._entries: Optional[Dict] = None
+
+    def _load(self) -> Dict:
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"   ⚠️  選択方法のキャッシュを保存できませんでした: {e}")
+
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        """キャッシュ済みの選択方法を取得"""
+        return self._load().get(fingerprint)
+
+    def put(self, fingerprint: str, strategy: str, hint=None) -> None:
+        """成功した選択方法を保存（内容が同じ場合は書き込まない）"""
+        entries = self._load()
+        current = entries.get(fingerprint)
+        if current and current.get('strategy') == strategy and current.get('hint') == hint:
+            return
+        entries[fingerprint] = {
+            'strategy': strategy,
+            'hint': hint,
+            'updated_at': datetime.now().isoformat(),
+        }
+        self._save()
+
+    def forget(self, fingerprint: str) -> None:
+        """使えなくなった選択方法を削除"""
+        entries = self._load()
+        if entries.pop(fingerprint, None) is not None:
+            self._save()
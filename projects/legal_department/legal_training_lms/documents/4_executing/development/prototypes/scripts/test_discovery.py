@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+tests.gsからテスト関数を自動で検出する
+
+トップレベルの `function test*` の宣言を宣言順に列挙し、tests.gsの内容のハッシュをキーに
+.cache/test_functions.json にキャッシュする（tests.gsが変わらない限り解析しない）。
+各スクリプトはテスト関数の一覧を手で管理せず、この一覧を使う。
+
+使い方:
+    python3 scripts/test_discovery.py    # 検出したテスト関数を表示
+"""
+
+import json
+import os
+from typing import List
+
+from gas_index import TESTS_GS, file_hash, load_gs_functions
+
+DISCOVERY_CACHE_FILE = os.path.join(os.path.dirname(__file__), '..', '.cache', 'test_functions.json')
+DISCOVERY_VERSION = 1
+
+TEST_PREFIX = 'test'
+
+
+def scan_test_functions(path: str = TESTS_GS) -> List[str]:
+    """tests.gsを解析してトップレベルのテスト関数を宣言順に返す"""
+    return [name for name in load_gs_functions(path) if name.startswith(TEST_PREFIX)]
+
+
+def discover_test_functions(path: str = TESTS_GS, cache_file: str = DISCOVERY_CACHE_FILE) -> List[str]:
+    """テスト関数の一覧（tests.gsのハッシュが変わっていなければキャッシュを使う）"""
+    current = file_hash(path)
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('version') == DISCOVERY_VERSION and cached.get('hash') == current:
+            return list(cached['tests'])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    tests = scan_test_functions(path)
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': DISCOVERY_VERSION, 'hash': current, 'tests': tests}, f,
+                      ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️  テスト関数の一覧を保存できませんでした: {e}")
+    return tests
+
+
+if __name__ == "__main__":
+    tests = discover_test_functions()
+    print(f"📋 {os.path.basename(TESTS_GS)}のテスト関数: {len(tests)}件")
+    for test_function in tests:
+        print(f"  - {test_function}")
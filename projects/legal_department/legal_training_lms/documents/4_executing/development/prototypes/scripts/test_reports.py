@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+logs/のテストレポート（test_report_*.json / failed_tests_report_*.json / combined_report_*.json）の読み込みと統合
+"""
+
+import glob
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, TextIO, Tuple
+
+LOG_DIR = os.path.join(os.path.dirname(__file__), '..', 'logs')
+
+REPORT_PREFIXES = ['test_report', 'failed_tests_report', 'combined_report']
+
+REPORT_TIMESTAMP_PATTERN = re.compile(r'_(\d{8}_\d{6})\.json$')
+
+# 実行ログのファイル名（同じ秒に同じテストのログを書く場合は「_2」「_3」…を付ける）
+LOG_FILE_PATTERN = re.compile(r'^playwright_test_(.+)_(\d{8}_\d{6})(?:_(\d+))?\.log$')
+
+
+def create_log_file(test_function: str, log_dir: str = LOG_DIR) -> Tuple[str, TextIO]:
+    """実行ログのファイルを新規に作成して開く（既存のファイルは上書きしない）
+
+    --repeat や並列実行では同じテストが同じ秒に終わることがあるため、
+    O_EXCLで作成し、同名のファイルがあれば連番を付けて作り直す。
+
+    Returns:
+        (パス, 書き込み用に開いたファイル)
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    base = os.path.join(log_dir, f'playwright_test_{test_function}_{timestamp}')
+    path = f'{base}.log'
+    number = 1
+    while True:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            number += 1
+            path = f'{base}_{number}.log'
+            continue
+        return path, os.fdopen(fd, 'w', encoding='utf-8')
+
+
+def report_timestamp(path: str) -> str:
+    """ファイル名のタイムスタンプ（YYYYMMDD_HHMMSS）。ない場合は空文字"""
+    match = REPORT_TIMESTAMP_PATTERN.search(os.path.basename(path))
+    return match.group(1) if match else ''
+
+
+def find_latest_report(prefixes: Optional[List[str]] = None, log_dir: str = LOG_DIR) -> Optional[str]:
+    """最新のレポートファイルを探す（ファイル名のタイムスタンプで比較）"""
+    candidates = []
+    for prefix in prefixes or REPORT_PREFIXES:
+        candidates.extend(glob.glob(os.path.join(log_dir, f'{prefix}_*.json')))
+    candidates = [path for path in candidates if report_timestamp(path)]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda path: (report_timestamp(path), os.path.getmtime(path)))
+
+
+def load_report(path: str) -> Dict:
+    """レポートを読み込む"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def failed_test_functions(report: Dict) -> List[str]:
+    """success != true のテスト関数（結果不明も含む、時間予算でスキップしたテストは除く、レポートの順）"""
+    failed = []
+    for result in report.get('results', []):
+        test_function = result.get('test_function')
+        if result.get('skipped'):
+            continue
+        if test_function and result.get('success') != True and test_function not in failed:
+            failed.append(test_function)
+    return failed
+
+
+def merge_results(base_results: List[Dict], rerun_results: List[Dict]) -> List[Dict]:
+    """元のレポートの結果に再実行の結果を上書きする（元の順序を保ち、新しいテストは末尾に追加）"""
+    reruns = {r.get('test_function'): dict(r, rerun=True) for r in rerun_results}
+    merged = []
+    for result in base_results:
+        test_function = result.get('test_function')
+        if test_function in reruns:
+            merged.append(reruns.pop(test_function))
+        else:
+            merged.append(result)
+    merged.extend(reruns.values())
+    return merged
+
+
+def merge_shard_results(reports: List[Dict], order: List[str]) -> List[Dict]:
+    """シャードごとのレポートの結果を1つにまとめる
+
+    同じテストが複数のレポートにある場合は後のレポートの結果を使う。
+    結果はorderの順に並べ、orderにないテストは末尾に追加する。
+    """
+    by_test: Dict[str, Dict] = {}
+    for report in reports:
+        for result in report.get('results', []):
+            by_test[result.get('test_function')] = result
+    position = {name: i for i, name in enumerate(order)}
+    return sorted(by_test.values(), key=lambda r: position.get(r.get('test_function'), len(order)))
@@ -2508,3 +2508,28 @@ function testAllNewFunctions() {
     Logger.log('スタックトレース: ' + error.stack);
   }
 }
+
+/**
+ * Apps Script API（scripts.run）からテスト関数を実行するためのラッパー
+ * 
+ * テスト関数は内部でエラーを捕捉してLoggerに出力するため、APIの戻り値だけでは成否を判定できない。
+ * 実行ログ（Logger.getLog()）を戻り値として返し、scripts/execution_backends.py の
+ * ApiBackend でエディタ実行時と同じようにログを解析する。
+ * 
+ * @param {string} functionName - 実行するテスト関数名（test〜）
+ * @return {Object} { functionName, log, durationMs }
+ */
+function runTestFunctionForApi(functionName) {
+  if (!/^test[A-Za-z0-9_]*$/.test(functionName) || typeof globalThis[functionName] !== 'function') {
+    throw new Error('テスト関数が見つかりません: ' + functionName);
+  }
+  
+  const startTime = new Date();
+  globalThis[functionName]();
+  
+  return {
+    functionName: functionName,
+    log: Logger.getLog(),
+    durationMs: new Date() - startTime
+  };
+}
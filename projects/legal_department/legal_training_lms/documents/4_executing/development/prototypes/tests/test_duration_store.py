@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+scripts/duration_store.py の時間予算内の実行順（priority_key）のテスト
+
+使い方:
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from duration_store import DurationStore
+
+
+def make_store(samples):
+    """テスト関数 → 直近の記録（success, recorded_at）の一時的な履歴"""
+    store = DurationStore(os.path.join(tempfile.mkdtemp(), 'test_durations.json'))
+    store.entries = {
+        test_function: [{'wall_time': 10.0, 'success': success, 'recorded_at': recorded_at}]
+        for test_function, (success, recorded_at) in samples.items()
+    }
+    return store
+
+
+class PriorityKeyTest(unittest.TestCase):
+
+    def test_most_recent_failure_first(self):
+        store = make_store({
+            'testOldFailure': (False, '2026-01-10T09:00:00'),
+            'testNewFailure': (False, '2026-01-13T18:00:00'),
+        })
+        ordered = sorted(['testOldFailure', 'testNewFailure'], key=store.priority_key)
+        self.assertEqual(ordered, ['testNewFailure', 'testOldFailure'])
+
+    def test_failures_before_least_recently_run(self):
+        store = make_store({
+            'testRecentSuccess': (True, '2026-01-13T18:00:00'),
+            'testOldSuccess': (True, '2026-01-01T09:00:00'),
+            'testFailure': (False, '2026-01-12T09:00:00'),
+        })
+        ordered = sorted(['testRecentSuccess', 'testNoRecord', 'testOldSuccess', 'testFailure'],
+                         key=store.priority_key)
+        self.assertEqual(ordered, ['testFailure', 'testNoRecord', 'testOldSuccess', 'testRecentSuccess'])
+
+
+if __name__ == '__main__':
+    unittest.main()
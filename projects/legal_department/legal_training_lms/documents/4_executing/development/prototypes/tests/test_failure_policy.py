@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+scripts/failure_policy.py のリトライするかどうかの判定（is_retryable）のテスト
+
+使い方:
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from failure_policy import INFRASTRUCTURE, TEST_FAILURE, classify_failure, is_retryable
+
+COMPLETION_TIMEOUT = '実行完了を検出できませんでした（タイムアウト: 300秒）'
+
+
+class IsRetryableTest(unittest.TestCase):
+
+    def test_completion_timeout_after_start_is_not_retried(self):
+        result = {'success': False, 'error': COMPLETION_TIMEOUT, 'timed_out': True}
+        self.assertEqual(classify_failure(result), INFRASTRUCTURE)
+        self.assertFalse(is_retryable(result))
+
+    def test_completion_timeout_before_start_is_retried(self):
+        result = {'success': False, 'error': COMPLETION_TIMEOUT, 'timed_out': True, 'not_started': True}
+        self.assertTrue(is_retryable(result))
+
+    def test_maximum_execution_time_is_test_failure(self):
+        for message in ('Exceeded maximum execution time', '最大実行時間を超えました'):
+            result = {'success': False, 'errors': [f'17:56:12エラー{message}']}
+            self.assertEqual(classify_failure(result), TEST_FAILURE)
+            self.assertFalse(is_retryable(result))
+
+    def test_function_select_failure_is_retried(self):
+        self.assertTrue(is_retryable({'success': False, 'error': '関数選択に失敗'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
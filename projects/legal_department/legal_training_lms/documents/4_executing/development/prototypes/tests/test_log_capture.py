@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+scripts/log_capture.py の今回の実行のレコードの取り出し（ExecutionLogCapture.text）のテスト
+
+使い方:
+    python3 -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from log_capture import ExecutionLogCapture
+
+CLICKED_AT = 1768294249.0
+
+
+def make_capture(records):
+    """実行ボタンをCLICKED_ATに押し、(クリックからの秒数, レベル, メッセージ)のレコードを集めたキャプチャ"""
+    capture = ExecutionLogCapture()
+    capture.started_at = CLICKED_AT
+    for offset, level, message in records:
+        record = {'time': CLICKED_AT + offset, 'level': level, 'message': message}
+        capture._records[(record['time'], level, message)] = record
+    return capture
+
+
+class CurrentExecutionTest(unittest.TestCase):
+
+    def test_previous_execution_within_clock_skew_is_excluded(self):
+        capture = make_capture([
+            (-20, 'NOTICE', '実行開始'),
+            (-19, 'INFO', '=== testSheetFunctions: 開始 ==='),
+            (-18, 'NOTICE', '実行完了'),
+            (1, 'NOTICE', '実行開始'),
+            (2, 'INFO', '=== testCalendarFunctions: 開始 ==='),
+            (3, 'INFO', '=== testCalendarFunctions: 完了 ==='),
+            (4, 'NOTICE', '実行完了'),
+        ])
+        text = capture.text()
+        self.assertNotIn('testSheetFunctions', text)
+        self.assertEqual(len(text.splitlines()), 4)
+        self.assertTrue(text.splitlines()[0].endswith('お知らせ実行開始'))
+
+    def test_no_completion_returns_empty_for_dom_fallback(self):
+        capture = make_capture([
+            (-20, 'NOTICE', '実行開始'),
+            (-18, 'NOTICE', '実行完了'),
+            (1, 'NOTICE', '実行開始'),
+            (2, 'INFO', '=== testCalendarFunctions: 開始 ==='),
+        ])
+        self.assertEqual(capture.text(), '')
+
+    def test_test_message_is_not_a_notice(self):
+        capture = make_capture([
+            (1, 'NOTICE', '実行開始'),
+            (2, 'INFO', 'イベント作成の実行完了'),
+            (3, 'INFO', '=== testCalendarFunctions: 完了 ==='),
+            (4, 'NOTICE', '実行完了'),
+        ])
+        self.assertEqual(len(capture.text().splitlines()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()